@@ -0,0 +1,132 @@
+import os
+import tempfile
+
+from dotenv import load_dotenv
+
+# Carrega variáveis de um arquivo .env (ou do indicado em ENV_FILE), se
+# existir; variáveis já definidas no ambiente têm precedência
+load_dotenv(os.getenv("ENV_FILE", ".env"))
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# URL de conexão com o banco (MySQL em produção). As credenciais ficam no
+# ambiente ou no .env (ver .env.example), nunca no código
+DATABASE_URL = os.getenv("DATABASE_URL", "mysql+pymysql://root@localhost:3306/estudeai_app")
+
+# Réplica somente leitura. Vazia: as leituras também vão para o primário
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL", "")
+
+# Shards dos dados dos usuários (decks, flashcards, progresso, revisões,
+# estatísticas, tombstones), separados por vírgula: o índice de cada URL é o
+# número gravado em `usuarios.shard` (ver app/shards.py), então URLs novas
+# entram no fim da lista. Vazia: um único shard, o próprio DATABASE_URL. As
+# tabelas globais (usuários e a fila de tarefas) ficam sempre no DATABASE_URL,
+# que normalmente também é o shard 0 (os usuários anteriores aos shards)
+SHARD_DATABASE_URLS = [url.strip() for url in os.getenv("SHARD_DATABASE_URLS", "").split(",") if url.strip()]
+# Índices dos shards que recebem os cadastros novos, separados por vírgula;
+# vazio: todos. Ex.: só o shard recém-adicionado, até ele se equilibrar
+NEW_USER_SHARDS = [int(index) for index in os.getenv("NEW_USER_SHARDS", "").split(",") if index.strip()]
+
+# Modo assíncrono: usa AsyncEngine/AsyncSession nos routers
+DB_ASYNC = _env_bool("DB_ASYNC")
+
+# URL do driver assíncrono; se vazia é derivada de DATABASE_URL
+# (pymysql -> aiomysql, sqlite -> aiosqlite)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")
+ASYNC_READ_DATABASE_URL = os.getenv("ASYNC_READ_DATABASE_URL", "")
+
+# Pool de conexões (valem para o primário e para a réplica)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Segundos até reciclar uma conexão; menor que o wait_timeout do MySQL
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+# Segundos esperando uma conexão livre no pool antes de falhar
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Segundos para abrir uma conexão nova com o banco
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+
+# Depois de uma escrita, as leituras do mesmo usuário vão para o primário
+# durante este tempo (segundos), para que ele veja o que acabou de gravar
+# mesmo com atraso de replicação
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+
+# Custo do bcrypt (log2 das iterações). Hashes com custo menor são
+# refeitos automaticamente no próximo login bem-sucedido.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Pool dedicado ao bcrypt: quantidade de threads e limite de tarefas
+# pendentes (em execução + na fila) antes de recusar com 503.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+# Dias que os tombstones do GET /sync são mantidos antes da compactação
+# (python -m app.manage compact-tombstones). Clientes que ficarem mais tempo
+# sem sincronizar recebem a biblioteca completa.
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("TOMBSTONE_RETENTION_DAYS", "90"))
+
+# Comandos SQL mais lentos que isto (ms) são registrados no logger
+# app.slow_query, com a rota que os emitiu
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+# Servidor de produção (python -m app.serve). WEB_CONCURRENCY é o nome usual
+# da quantidade de workers; cada worker tem o próprio pool de conexões
+# (até DB_POOL_SIZE + DB_MAX_OVERFLOW por engine)
+SERVER_HOST = os.getenv("HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("PORT", "8000"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+# Segundos que as requisições em andamento têm para terminar após SIGTERM
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+KEEPALIVE_TIMEOUT = int(os.getenv("KEEPALIVE_TIMEOUT", "5"))
+ACCESS_LOG = _env_bool("ACCESS_LOG")
+# IPs dos proxies cujos X-Forwarded-* são aceitos
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+# GET /health/ready consulta o banco no máximo uma vez a cada tantos segundos
+HEALTH_DB_CHECK_SECONDS = float(os.getenv("HEALTH_DB_CHECK_SECONDS", "10"))
+
+# Limite de requisições (app/utils/ratelimit.py), no formato
+# "<rajada>/<segundos>": até <rajada> seguidas, repostas ao longo de <segundos>
+RATE_LIMIT_ENABLED = _env_bool("RATE_LIMIT_ENABLED", True)
+# "memory" (por processo) ou "pacote.modulo:fabrica" para um armazenamento compartilhado
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+# Login e cadastro, por IP e por email
+RATE_LIMIT_AUTH_IP = os.getenv("RATE_LIMIT_AUTH_IP", "30/60")
+RATE_LIMIT_AUTH_EMAIL = os.getenv("RATE_LIMIT_AUTH_EMAIL", "10/300")
+# Escritas autenticadas (POST/PUT/DELETE), por usuário
+RATE_LIMIT_WRITES = os.getenv("RATE_LIMIT_WRITES", "120/60")
+
+# Tamanho máximo do arquivo aceito por POST /decks/import (bytes)
+MAX_IMPORT_BYTES = int(os.getenv("MAX_IMPORT_BYTES", str(50 * 1024 * 1024)))
+# Tamanho máximo da coleção descompactada de um .apkg (bytes): o zip pode
+# comprimir muito, então o limite do upload não protege o disco sozinho
+MAX_ANKI_COLLECTION_BYTES = int(os.getenv("MAX_ANKI_COLLECTION_BYTES", str(200 * 1024 * 1024)))
+
+# Respostas JSON maiores que isto (bytes) vão com gzip quando o cliente aceita
+# (GET /study/session); abaixo disso a compressão não compensa
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+
+# Tarefas em segundo plano (app/jobs.py). Threads por processo; com 0 o
+# processo só enfileira e outro processo executa. Cada thread usa uma
+# conexão do pool síncrono enquanto executa uma tarefa
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Segundos entre consultas à fila (tarefas criadas no mesmo processo acordam
+# os workers na hora; as de outros processos esperam até isto)
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+# Reserva de uma tarefa em execução, renovada a cada relato de andamento;
+# vencida (processo que caiu), a tarefa volta para a fila
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+# Espera antes da n-ésima nova tentativa: base * 2^(n-1), até o máximo
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "3600"))
+# Arquivos das tarefas (uploads de importação, exportações prontas); precisa
+# ser compartilhado pelos processos do nó
+JOB_FILES_DIR = os.getenv("JOB_FILES_DIR", os.path.join(tempfile.gettempdir(), "estudeai-jobs"))
+# Dias que tarefas terminadas (e os seus arquivos) são mantidas antes da
+# limpeza (python -m app.manage purge-jobs)
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "7"))
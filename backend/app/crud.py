@@ -0,0 +1,978 @@
+"""
+Operações de banco usadas pelos routers.
+
+Todas as funções recebem uma `Session` síncrona como primeiro argumento e
+retornam schemas já serializados. Assim elas podem ser chamadas tanto no modo
+síncrono quanto no assíncrono, via `await db.run_sync(funcao, ...)`
+(ver `app.database.get_session`).
+"""
+from datetime import date, datetime, timezone
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import search, stats
+from app.database import use_shard
+from app.models import Biblioteca, Deck, Flashcard, Progresso, Remocao, Revisao, Usuario
+from app.schemas import (
+    MAX_ERROS_IMPORTACAO,
+    DeckFullOut,
+    DeckImportError,
+    DeckImportOut,
+    DeckOut,
+    DeckPage,
+    DeckSummaryOut,
+    DeckSyncOut,
+    DueCardOut,
+    FlashcardBase,
+    FlashcardOut,
+    FlashcardPage,
+    FlashcardSearchHit,
+    FlashcardSearchPage,
+    FlashcardSyncOut,
+    ReviewBatchOut,
+    ReviewOut,
+    SyncOut,
+    UserOut,
+    UserStatsOut,
+)
+from app.utils import fast_json
+from app.shards import UserMoved, assign_shard
+from app.utils.pagination import decode_cursor, encode_cursor, paginate, parse_fields
+from app.utils.srs import ReviewState, schedule
+from app.utils.writes import insert_row, update_returning
+
+
+# =========================================================================================
+# USUÁRIOS
+# =========================================================================================
+def get_user_by_email(db: Session, email: str) -> Optional[Usuario]:
+    return db.query(Usuario).filter(Usuario.email == email).first()
+
+
+def create_user(db: Session, nome: str, email: str, senha_hash: str) -> Optional[UserOut]:
+    """
+    Cria o usuário no banco global e a biblioteca e as estatísticas no shard
+    dele; retorna None se o email já estiver cadastrado (índice único).
+    """
+    shard = assign_shard(email)
+    try:
+        user = insert_row(db, Usuario, {"nome": nome, "email": email, "senha": senha_hash, "shard": shard})
+    except IntegrityError:
+        db.rollback()
+        return None
+
+    use_shard(db, shard)
+    db.execute(insert(Biblioteca).values(usuario_id=user["id"]))
+    stats.create_empty(db, user["id"])
+    db.commit()
+    return UserOut.model_validate(user)
+
+
+def email_exists(db: Session, email: str) -> bool:
+    exists = db.query(Usuario.id).filter(Usuario.email == email).first() is not None
+    # Devolve a conexão ao pool antes do bcrypt, que pode demorar
+    db.rollback()
+    return exists
+
+
+def get_login_credentials(db: Session, email: str):
+    """Retorna (id, hash da senha) do usuário com esse email, ou None."""
+    row = db.query(Usuario.id, Usuario.senha).filter(Usuario.email == email).first()
+    # Devolve a conexão ao pool antes do bcrypt, que pode demorar
+    db.rollback()
+    return row
+
+
+def update_password_hash(db: Session, user_id: int, senha_hash: str):
+    """Grava o hash refeito com o custo atual do bcrypt."""
+    db.execute(
+        update(Usuario)
+        .where(Usuario.id == user_id)
+        .values(senha=senha_hash)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def list_users(db: Session) -> List[UserOut]:
+    return [UserOut.model_validate(u) for u in db.query(Usuario).all()]
+
+
+# =========================================================================================
+# VERSÕES (ETAGS E SINCRONIZAÇÃO)
+# =========================================================================================
+def _open_library(db: Session, user_id: int, step: int) -> int:
+    """
+    Cria a linha de `bibliotecas` de uma conta anterior à tabela, continuando
+    a sequência de `Usuario.versao_biblioteca` avançada em `step`. Se a linha
+    existe, o UPDATE que trouxe até aqui falhou pela marca de mudança de shard.
+    """
+    moving = db.query(Biblioteca.movida_para).filter(Biblioteca.usuario_id == user_id).first()
+    if moving is not None:
+        raise UserMoved(user_id, moving.movida_para)
+
+    legacy = db.query(Usuario.versao_biblioteca, Usuario.sequencia_compactada).filter(Usuario.id == user_id).one()
+    version = legacy.versao_biblioteca + step
+    db.execute(insert(Biblioteca).values(
+        usuario_id=user_id, versao=version, sequencia_compactada=legacy.sequencia_compactada
+    ))
+    return version
+
+
+def next_sequence(db: Session, user_id: int) -> int:
+    """
+    Avança a sequência de alterações do usuário (`bibliotecas.versao`) e
+    retorna o novo valor (sem commit), com UPDATE ... RETURNING quando o
+    dialeto suporta. Toda escrita em decks/flashcards começa por aqui: o
+    UPDATE na linha da biblioteca serializa as escritas concorrentes do
+    usuário, então a ordem das sequências é a ordem dos commits. Linhas novas
+    já são inseridas com a sequência, sem um UPDATE depois.
+
+    Falha com `UserMoved` se o usuário estiver mudando de shard.
+    """
+    row = update_returning(
+        db, Biblioteca, [Biblioteca.usuario_id == user_id, Biblioteca.movida_para.is_(None)],
+        {"versao": Biblioteca.versao + 1},
+        [Biblioteca.versao]
+    )
+    if row is None:
+        return _open_library(db, user_id, 1)
+    return row["versao"]
+
+
+def lock_library(db: Session, user_id: int):
+    """
+    Trava a linha da biblioteca até o commit, sem avançar a sequência, nas
+    escritas que não mudam decks/flashcards (revisões): elas também esperam
+    e falham (`UserMoved`) durante uma mudança de shard.
+    """
+    locked = db.execute(
+        update(Biblioteca)
+        .where(Biblioteca.usuario_id == user_id, Biblioteca.movida_para.is_(None))
+        .values(versao=Biblioteca.versao)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not locked:
+        _open_library(db, user_id, 0)
+
+
+def mark_changes(db: Session, sequence: int, deck_ids=(), flashcard_ids=()):
+    """Marca decks e flashcards já existentes com a sequência e incrementa a versão dos decks."""
+    if deck_ids:
+        db.execute(
+            update(Deck)
+            .where(Deck.id.in_(set(deck_ids)))
+            .values(versao=Deck.versao + 1, sequencia=sequence)
+            .execution_options(synchronize_session=False)
+        )
+    if flashcard_ids:
+        db.execute(
+            update(Flashcard)
+            .where(Flashcard.id.in_(set(flashcard_ids)))
+            .values(sequencia=sequence)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def touch_library(db: Session, user_id: int, deck_ids=(), flashcard_ids=()) -> int:
+    """`next_sequence` + `mark_changes` (sem commit); retorna a sequência."""
+    sequence = next_sequence(db, user_id)
+    mark_changes(db, sequence, deck_ids, flashcard_ids)
+    return sequence
+
+
+def record_removals(db: Session, user_id: int, entity: str, entity_ids: Iterable[int], sequence: int):
+    """Tombstones de decks/flashcards apagados, para o GET /sync, num único INSERT (sem commit)."""
+    rows = [
+        {"usuario_id": user_id, "entidade": entity, "entidade_id": entity_id, "sequencia": sequence}
+        for entity_id in entity_ids
+    ]
+    if rows:
+        db.execute(insert(Remocao), rows)
+
+
+def _library_state(db: Session, user_id: int):
+    """(versão, sequência compactada) da biblioteca do usuário."""
+    row = db.query(Biblioteca.versao, Biblioteca.sequencia_compactada).filter(
+        Biblioteca.usuario_id == user_id
+    ).first()
+    if row is None:
+        # Conta anterior à tabela `bibliotecas` que ainda não escreveu nada
+        row = db.query(Usuario.versao_biblioteca, Usuario.sequencia_compactada).filter(
+            Usuario.id == user_id
+        ).first()
+    return row
+
+
+def get_library_version(db: Session, user_id: int) -> Optional[int]:
+    row = _library_state(db, user_id)
+    return row[0] if row is not None else None
+
+
+def get_deck_version(db: Session, deck_id: int, user_id: int) -> Optional[Tuple[int, int]]:
+    """
+    (versao, sequencia) do deck, ou None se ele não existir ou não pertencer
+    ao usuário. A sequência vem da biblioteca e nunca se repete: um deck
+    apagado e recriado com o mesmo id não volta a uma ETag antiga.
+    """
+    row = db.query(Deck.versao, Deck.sequencia).filter(
+        Deck.id == deck_id,
+        Deck.usuario_id == user_id
+    ).first()
+    return tuple(row) if row is not None else None
+
+
+# =========================================================================================
+# DECKS
+# =========================================================================================
+def get_owned_deck(db: Session, deck_id: int, user_id: int) -> Optional[Deck]:
+    return db.query(Deck).filter(
+        Deck.id == deck_id,
+        Deck.usuario_id == user_id
+    ).first()
+
+
+def check_deck_ownership(db: Session, deck_id: int, user_id: int) -> Deck:
+    """Verifica se o Deck existe e pertence ao usuário logado."""
+    deck = get_owned_deck(db, deck_id, user_id)
+    if not deck:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Deck não encontrado ou não pertence ao usuário."
+        )
+    return deck
+
+
+def get_owned_deck_ids(db: Session, deck_ids, user_id: int) -> set:
+    """Retorna, numa única consulta, quais dos decks informados pertencem ao usuário."""
+    if not deck_ids:
+        return set()
+    rows = db.query(Deck.id).filter(
+        Deck.id.in_(set(deck_ids)),
+        Deck.usuario_id == user_id
+    ).all()
+    return {row.id for row in rows}
+
+
+def create_deck(db: Session, user_id: int, data: dict, flashcards: List[dict]) -> DeckFullOut:
+    """Cria o deck e, opcionalmente, seus flashcards na mesma transação."""
+    sequence = next_sequence(db, user_id)
+    new_deck = insert_row(db, Deck, {**data, "usuario_id": user_id, "sequencia": sequence})
+
+    created = bulk_insert_flashcards(
+        db,
+        user_id,
+        [{**card, "deck_id": new_deck["id"], "sequencia": sequence} for card in flashcards]
+    )
+    stats.bump(db, user_id, total_decks=1, total_cards=len(created))
+    db.commit()
+
+    return DeckFullOut(**DeckOut.model_validate(new_deck).model_dump(), flashcards=created)
+
+
+def _deck_columns():
+    return [getattr(Deck, name) for name in fast_json.DECK_COLUMNS]
+
+
+def _flashcard_columns():
+    return [getattr(Flashcard, name) for name in fast_json.FLASHCARD_COLUMNS]
+
+
+def list_decks(db: Session, user_id: int) -> bytes:
+    """Lista completa já em JSON (caminho rápido, ver `app.utils.fast_json`)."""
+    rows = db.execute(select(*_deck_columns()).where(Deck.usuario_id == user_id).order_by(Deck.id))
+    return fast_json.deck_list.dump_json(fast_json.as_dicts(rows, fast_json.DECK_COLUMNS))
+
+
+def list_decks_page(db: Session, user_id: int, limit: int, cursor: Optional[str], fields: Optional[str]) -> DeckPage:
+    columns = [getattr(Deck, name) for name in parse_fields(fields, DeckOut.model_fields)]
+    query = db.query(*columns).filter(Deck.usuario_id == user_id)
+    items, next_cursor = paginate(query, Deck.id, limit, cursor)
+    return DeckPage(items=items, next_cursor=next_cursor)
+
+
+def list_deck_summaries(db: Session, user_id: int, now: datetime) -> List[DeckSummaryOut]:
+    """
+    Decks do usuário com quantidade de cards, cards vencidos e data da última
+    revisão, numa única consulta: `progresso` (uma linha por card) é agregado
+    por deck só pelo índice ix_progresso_usuario_deck_resumo e o resultado é
+    juntado aos decks pelo índice (usuario_id, id).
+
+    Inclusive `card_count` vem de `progresso`, não de `flashcards`: cards
+    criados antes da tabela existir não são contados até que
+    `python -m app.manage backfill-progresso` tenha sido executado.
+    """
+    totals = db.query(
+        Progresso.deck_id.label("deck_id"),
+        func.count(Progresso.deck_id).label("card_count"),
+        func.sum(case((Progresso.due_at <= now, 1), else_=0)).label("due_count"),
+        func.max(Progresso.last_reviewed_at).label("last_studied_at"),
+    ).filter(Progresso.usuario_id == user_id).group_by(Progresso.deck_id).subquery()
+
+    rows = db.query(
+        Deck.id, Deck.usuario_id, Deck.titulo, Deck.descricao, Deck.criado_em,
+        func.coalesce(totals.c.card_count, 0).label("card_count"),
+        func.coalesce(totals.c.due_count, 0).label("due_count"),
+        totals.c.last_studied_at,
+    ).outerjoin(totals, totals.c.deck_id == Deck.id).filter(
+        Deck.usuario_id == user_id
+    ).order_by(Deck.id).all()
+
+    return [DeckSummaryOut.model_validate(dict(row._mapping)) for row in rows]
+
+
+def read_deck(db: Session, deck_id: int, user_id: int) -> Optional[bytes]:
+    """Deck com os seus flashcards já em JSON, ou None se não for do usuário."""
+    deck = db.execute(
+        select(*_deck_columns()).where(Deck.id == deck_id, Deck.usuario_id == user_id)
+    ).first()
+    if deck is None:
+        return None
+
+    cards = db.execute(select(*_flashcard_columns()).where(Flashcard.deck_id == deck_id).order_by(Flashcard.id))
+    return fast_json.deck_full.dump_json({
+        **dict(zip(fast_json.DECK_COLUMNS, deck)),
+        "flashcards": fast_json.as_dicts(cards, fast_json.FLASHCARD_COLUMNS),
+    })
+
+
+def update_deck(db: Session, deck_id: int, user_id: int, update_data: dict) -> Optional[DeckOut]:
+    """Um único UPDATE ... WHERE id e dono, que também verifica a propriedade."""
+    sequence = next_sequence(db, user_id)
+    deck = update_returning(
+        db, Deck, [Deck.id == deck_id, Deck.usuario_id == user_id],
+        {**update_data, "versao": Deck.versao + 1, "sequencia": sequence}
+    )
+    if deck is None:
+        db.rollback()
+        return None
+
+    db.commit()
+    return DeckOut.model_validate(deck)
+
+
+def delete_decks(db: Session, user_id: int, deck_ids: Iterable[int]) -> List[int]:
+    """
+    Apaga, dos decks informados, os que pertencem ao usuário e retorna os ids
+    apagados. O número de comandos não depende do tamanho dos decks: o banco
+    remove os flashcards e o progresso (ON DELETE CASCADE) e mantém o
+    histórico de revisões com flashcard_id NULL (ON DELETE SET NULL).
+    """
+    owned = get_owned_deck_ids(db, deck_ids, user_id)
+    if not owned:
+        return []
+
+    cards, studied = stats.deck_totals(db, user_id, owned)
+    db.execute(
+        delete(Deck)
+        .where(Deck.id.in_(owned), Deck.usuario_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+    stats.bump(db, user_id, total_decks=-len(owned), total_cards=-cards, cards_studied=-studied)
+    # Os cards dos decks não ganham tombstone próprio: o cliente remove junto com o deck
+    record_removals(db, user_id, "deck", sorted(owned), touch_library(db, user_id))
+    db.commit()
+    return sorted(owned)
+
+
+def delete_deck(db: Session, deck_id: int, user_id: int) -> bool:
+    return bool(delete_decks(db, user_id, [deck_id]))
+
+
+# =========================================================================================
+# FLASHCARDS
+# =========================================================================================
+def init_progress(db: Session, user_id: int, cards: List[FlashcardOut]):
+    """
+    Cria o estado de revisão dos cards novos (vencidos desde a criação),
+    para que a fila de estudo seja sempre um range scan em `progresso`.
+    """
+    if not cards:
+        return
+    db.execute(insert(Progresso), [
+        {"usuario_id": user_id, "flashcard_id": card.id, "deck_id": card.deck_id, "due_at": card.criado_em}
+        for card in cards
+    ])
+
+
+def bulk_insert_flashcards(db: Session, user_id: int, rows: List[dict]) -> List[FlashcardOut]:
+    """
+    Insere vários flashcards de uma vez, sem commit.
+    Usa INSERT ... RETURNING em lote quando o dialeto suporta;
+    caso contrário (MySQL), faz um único flush de todos os objetos.
+    Os resultados já são serializados aqui para evitar um SELECT
+    por card quando a sessão expirar os objetos no commit.
+    """
+    if not rows:
+        return []
+
+    if db.get_bind(Flashcard).dialect.insert_executemany_returning:
+        result = db.execute(insert(Flashcard).returning(Flashcard), rows)
+        flashcards = list(result.scalars())
+    else:
+        flashcards = [Flashcard(**row) for row in rows]
+        db.add_all(flashcards)
+        db.flush()
+
+    created = [FlashcardOut.model_validate(f) for f in flashcards]
+    init_progress(db, user_id, created)
+    return created
+
+
+def get_owned_flashcard(db: Session, flashcard_id: int, user_id: int) -> Optional[Flashcard]:
+    # Junta Flashcard com Deck para verificar a propriedade
+    return db.query(Flashcard).join(Deck).filter(
+        Flashcard.id == flashcard_id,
+        Deck.usuario_id == user_id
+    ).first()
+
+
+def create_flashcard(db: Session, user_id: int, data: dict) -> FlashcardOut:
+    sequence = next_sequence(db, user_id)
+    # CRÍTICO: o deck precisa pertencer ao usuário logado. O UPDATE que marca
+    # o deck com a sequência também é a verificação: nenhuma linha = não é dele
+    owned = db.execute(
+        update(Deck)
+        .where(Deck.id == data["deck_id"], Deck.usuario_id == user_id)
+        .values(versao=Deck.versao + 1, sequencia=sequence)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not owned:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Deck não encontrado ou não pertence ao usuário."
+        )
+
+    new_flashcard = FlashcardOut.model_validate(insert_row(db, Flashcard, {**data, "sequencia": sequence}))
+    init_progress(db, user_id, [new_flashcard])
+    stats.bump(db, user_id, total_cards=1)
+    db.commit()
+    return new_flashcard
+
+
+def create_flashcards_bulk(db: Session, user_id: int, cards: List[dict]):
+    """
+    Cria vários flashcards numa única transação.
+    Retorna (criados, erros); itens cujo deck não pertence ao usuário
+    vão para a lista de erros com o seu índice no lote.
+    """
+    owned = get_owned_deck_ids(db, [card["deck_id"] for card in cards], user_id)
+
+    rows, errors = [], []
+    for index, card in enumerate(cards):
+        if card["deck_id"] in owned:
+            rows.append(card)
+        else:
+            errors.append({
+                "index": index,
+                "deck_id": card["deck_id"],
+                "detail": "Deck não encontrado ou não pertence ao usuário."
+            })
+
+    created = []
+    if rows:
+        sequence = next_sequence(db, user_id)
+        created = bulk_insert_flashcards(db, user_id, [{**row, "sequencia": sequence} for row in rows])
+        mark_changes(db, sequence, {card.deck_id for card in created})
+        stats.bump(db, user_id, total_cards=len(created))
+    db.commit()
+    return created, errors
+
+
+def list_user_flashcards(db: Session, user_id: int) -> bytes:
+    # Faz um JOIN de Flashcard com Deck e filtra pelo usuario_id do Deck
+    rows = db.execute(
+        select(*_flashcard_columns())
+        .join(Deck, Flashcard.deck_id == Deck.id)
+        .where(Deck.usuario_id == user_id)
+        .order_by(Flashcard.id)
+    )
+    return fast_json.flashcard_list.dump_json(fast_json.as_dicts(rows, fast_json.FLASHCARD_COLUMNS))
+
+
+def list_user_flashcards_page(db: Session, user_id: int, limit: int, cursor: Optional[str], fields: Optional[str]) -> FlashcardPage:
+    columns = [getattr(Flashcard, name) for name in parse_fields(fields, FlashcardOut.model_fields)]
+    query = db.query(*columns).join(Deck, Flashcard.deck_id == Deck.id).filter(Deck.usuario_id == user_id)
+    items, next_cursor = paginate(query, Flashcard.id, limit, cursor)
+    return FlashcardPage(items=items, next_cursor=next_cursor)
+
+
+def list_deck_flashcards(db: Session, deck_id: int, user_id: int) -> bytes:
+    check_deck_ownership(db, deck_id, user_id)
+
+    rows = db.execute(select(*_flashcard_columns()).where(Flashcard.deck_id == deck_id).order_by(Flashcard.id))
+    return fast_json.flashcard_list.dump_json(fast_json.as_dicts(rows, fast_json.FLASHCARD_COLUMNS))
+
+
+def list_deck_flashcards_page(db: Session, deck_id: int, user_id: int, limit: int, cursor: Optional[str], fields: Optional[str]) -> FlashcardPage:
+    check_deck_ownership(db, deck_id, user_id)
+
+    columns = [getattr(Flashcard, name) for name in parse_fields(fields, FlashcardOut.model_fields)]
+    query = db.query(*columns).filter(Flashcard.deck_id == deck_id)
+    items, next_cursor = paginate(query, Flashcard.id, limit, cursor)
+    return FlashcardPage(items=items, next_cursor=next_cursor)
+
+
+def search_flashcards(db: Session, user_id: int, query: str, limit: int, cursor: Optional[str]) -> FlashcardSearchPage:
+    """
+    Busca textual nos cards do usuário, por relevância (ver `app.search`).
+    O cursor guarda a posição na lista ordenada por relevância.
+    """
+    offset = decode_cursor(cursor) if cursor else 0
+    backend = search.get_backend(db.get_bind(Flashcard).dialect.name)
+
+    rows = backend.search(db, user_id, search.parse_terms(query), limit + 1, offset)
+    next_cursor = encode_cursor(offset + limit) if len(rows) > limit else None
+
+    return FlashcardSearchPage(
+        items=[FlashcardSearchHit.model_validate(dict(row._mapping)) for row in rows[:limit]],
+        next_cursor=next_cursor
+    )
+
+
+def read_flashcard(db: Session, flashcard_id: int, user_id: int) -> Optional[FlashcardOut]:
+    flashcard = get_owned_flashcard(db, flashcard_id, user_id)
+    return FlashcardOut.model_validate(flashcard) if flashcard else None
+
+
+def update_flashcard(db: Session, flashcard_id: int, user_id: int, update_data: dict) -> Optional[FlashcardOut]:
+    """Um único UPDATE ... WHERE id e deck do usuário (a propriedade via subconsulta em Deck)."""
+    sequence = next_sequence(db, user_id)
+    flashcard = update_returning(
+        db, Flashcard,
+        [Flashcard.id == flashcard_id, Flashcard.deck_id.in_(select(Deck.id).where(Deck.usuario_id == user_id))],
+        {**update_data, "sequencia": sequence}
+    )
+    if flashcard is None:
+        db.rollback()
+        return None
+
+    mark_changes(db, sequence, [flashcard["deck_id"]])
+    db.commit()
+    return FlashcardOut.model_validate(flashcard)
+
+
+def delete_flashcards(db: Session, user_id: int, flashcard_ids: Iterable[int]) -> List[int]:
+    """
+    Apaga, dos flashcards informados, os que estão em decks do usuário e
+    retorna os ids apagados. A propriedade e o progresso de todos os cards
+    vêm numa única consulta (JOIN com Deck) e a remoção é um único DELETE;
+    o progresso sai junto pelo ON DELETE CASCADE.
+    """
+    flashcard_ids = set(flashcard_ids)
+    if not flashcard_ids:
+        return []
+
+    rows = db.query(
+        Flashcard.id,
+        Flashcard.deck_id,
+        Progresso.last_reviewed_at.isnot(None).label("studied"),
+    ).join(Deck, Flashcard.deck_id == Deck.id).outerjoin(
+        Progresso, (Progresso.flashcard_id == Flashcard.id) & (Progresso.usuario_id == user_id)
+    ).filter(
+        Flashcard.id.in_(flashcard_ids),
+        Deck.usuario_id == user_id
+    ).all()
+    if not rows:
+        return []
+
+    deleted = sorted(row.id for row in rows)
+    db.execute(
+        delete(Flashcard)
+        .where(Flashcard.id.in_(deleted))
+        .execution_options(synchronize_session=False)
+    )
+    stats.bump(db, user_id, total_cards=-len(deleted), cards_studied=-sum(1 for row in rows if row.studied))
+    sequence = touch_library(db, user_id, {row.deck_id for row in rows})
+    record_removals(db, user_id, "flashcard", deleted, sequence)
+    db.commit()
+    return deleted
+
+
+def delete_flashcard(db: Session, flashcard_id: int, user_id: int) -> bool:
+    return bool(delete_flashcards(db, user_id, [flashcard_id]))
+
+
+# =========================================================================================
+# ESTUDO (REVISÃO ESPAÇADA)
+# =========================================================================================
+def _study_cards_query(db: Session, user_id: int):
+    """Cards com o estado de revisão, partindo de `progresso` (colunas de `DueCardOut`)."""
+    return db.query(
+        Flashcard.id, Flashcard.deck_id, Flashcard.pergunta, Flashcard.resposta, Flashcard.criado_em,
+        Progresso.due_at, Progresso.ease, Progresso.interval_days, Progresso.repetitions, Progresso.lapses,
+    ).join(Flashcard, Flashcard.id == Progresso.flashcard_id).filter(
+        Progresso.usuario_id == user_id,
+    )
+
+
+def list_due_cards(db: Session, user_id: int, deck_id: Optional[int], limit: int, now: datetime) -> List[DueCardOut]:
+    """
+    Próximos cards vencidos, do mais atrasado para o mais recente.
+    Usa os índices (usuario_id, due_at) / (usuario_id, deck_id, due_at, id, ...)
+    e só depois busca os flashcards pela chave primária.
+    """
+    query = _study_cards_query(db, user_id).filter(Progresso.due_at <= now)
+    if deck_id is not None:
+        query = query.filter(Progresso.deck_id == deck_id)
+
+    rows = query.order_by(Progresso.due_at, Progresso.id).limit(limit).all()
+    return [DueCardOut.model_validate(dict(row._mapping)) for row in rows]
+
+
+def read_study_session(db: Session, deck_id: int, user_id: int, limit: int, now: datetime) -> Optional[dict]:
+    """
+    Deck (com os totais de `DeckSummaryOut`) e os primeiros `limit` cards na
+    ordem de estudo: vencidos primeiro (do mais atrasado), depois os que vencem
+    antes. Duas consultas, ambas pelo índice (usuario_id, deck_id, due_at, id, ...):
+    a do deck também verifica a propriedade. None se o deck não for do usuário.
+    O JSON é montado pela rota (que acrescenta o token da sessão).
+    """
+    deck = db.query(
+        *_deck_columns(),
+        func.count(Progresso.id),
+        func.coalesce(func.sum(case((Progresso.due_at <= now, 1), else_=0)), 0),
+        func.max(Progresso.last_reviewed_at),
+    ).outerjoin(
+        Progresso, (Progresso.usuario_id == user_id) & (Progresso.deck_id == Deck.id)
+    ).filter(
+        Deck.id == deck_id,
+        Deck.usuario_id == user_id
+    ).group_by(Deck.id).first()
+    if deck is None:
+        return None
+
+    cards = _study_cards_query(db, user_id).filter(
+        Progresso.deck_id == deck_id
+    ).order_by(Progresso.due_at, Progresso.id).limit(limit)
+    return {
+        "deck": dict(zip(fast_json.DECK_SUMMARY_COLUMNS, deck)),
+        "cards": fast_json.as_dicts(cards, fast_json.DUE_CARD_COLUMNS),
+    }
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """As colunas DateTime guardam UTC sem fuso; converte datas com fuso vindas do cliente."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def apply_review(db: Session, progress: Progresso, rating: str, answered_at: datetime) -> bool:
+    """Aplica o SM-2 ao estado do card (sem commit); retorna True se foi a primeira revisão."""
+    first_review = progress.last_reviewed_at is None
+    new_state = schedule(
+        ReviewState(
+            ease=progress.ease,
+            interval_days=progress.interval_days,
+            repetitions=progress.repetitions,
+            lapses=progress.lapses,
+            due_at=progress.due_at,
+            last_reviewed_at=progress.last_reviewed_at,
+        ),
+        rating,
+        answered_at,
+    )
+    progress.ease = new_state.ease
+    progress.interval_days = new_state.interval_days
+    progress.repetitions = new_state.repetitions
+    progress.lapses = new_state.lapses
+    progress.due_at = new_state.due_at
+    progress.last_reviewed_at = new_state.last_reviewed_at
+    return first_review
+
+
+def record_review(db: Session, user_id: int, flashcard_id: int, rating: str, answered_at: datetime) -> Optional[ReviewOut]:
+    progress = db.query(Progresso).filter(
+        Progresso.usuario_id == user_id,
+        Progresso.flashcard_id == flashcard_id
+    ).first()
+    if progress is None:
+        return None
+
+    lock_library(db, user_id)
+    answered_at = to_utc_naive(answered_at)
+    first_review = apply_review(db, progress, rating, answered_at)
+    db.add(Revisao(usuario_id=user_id, flashcard_id=flashcard_id, rating=rating, answered_at=answered_at))
+    stats.record_reviews(db, user_id, [rating], [answered_at.date()], int(first_review))
+    result = ReviewOut.model_validate(progress)
+    db.commit()
+    return result
+
+
+def record_reviews_batch(db: Session, user_id: int, events: List[dict], session_deck_id: Optional[int] = None) -> ReviewBatchOut:
+    """
+    Registra um lote de respostas numa única transação.
+    - `client_event_id` repetido (no lote ou já gravado) é ignorado, então reenviar é seguro;
+    - a propriedade de todos os cards é verificada com um único JOIN em Deck.usuario_id;
+      com `session_deck_id` (token de GET /study/session, que já verificou o deck)
+      os cards desse deck vêm direto de `progresso`, sem o JOIN;
+    - as respostas são aplicadas em ordem de `answered_at`.
+    A biblioteca é travada antes de procurar os eventos já gravados: dois envios
+    simultâneos do mesmo lote se enfileiram e o segundo vê o primeiro. Se a
+    restrição única ainda assim disparar, a transação é refeita e os eventos
+    gravados pelo outro envio voltam como duplicados.
+    """
+    try:
+        return _record_reviews_batch(db, user_id, events, session_deck_id)
+    except IntegrityError:
+        db.rollback()
+        return _record_reviews_batch(db, user_id, events, session_deck_id)
+
+
+def _record_reviews_batch(db: Session, user_id: int, events: List[dict], session_deck_id: Optional[int]) -> ReviewBatchOut:
+    lock_library(db, user_id)
+
+    duplicates, fresh, seen = [], [], set()
+    for event in events:
+        if event["client_event_id"] in seen:
+            duplicates.append(event["client_event_id"])
+        else:
+            seen.add(event["client_event_id"])
+            fresh.append(event)
+
+    stored = {
+        row.client_event_id for row in db.query(Revisao.client_event_id).filter(
+            Revisao.usuario_id == user_id,
+            Revisao.client_event_id.in_(seen)
+        )
+    }
+    duplicates += [e["client_event_id"] for e in fresh if e["client_event_id"] in stored]
+    fresh = [e for e in fresh if e["client_event_id"] not in stored]
+
+    card_ids = {e["card_id"] for e in fresh}
+    progress_by_card = {}
+    if card_ids and session_deck_id is not None:
+        progress_by_card = {
+            p.flashcard_id: p for p in db.query(Progresso).filter(
+                Progresso.usuario_id == user_id,
+                Progresso.deck_id == session_deck_id,
+                Progresso.flashcard_id.in_(card_ids)
+            )
+        }
+    # Cards fora da sessão (ou sem sessão): verificação completa
+    pending = card_ids - progress_by_card.keys()
+    if pending:
+        progress_by_card.update({
+            p.flashcard_id: p for p in db.query(Progresso)
+            .join(Flashcard, Flashcard.id == Progresso.flashcard_id)
+            .join(Deck, Deck.id == Flashcard.deck_id)
+            .filter(
+                Deck.usuario_id == user_id,
+                Progresso.usuario_id == user_id,
+                Progresso.flashcard_id.in_(pending)
+            )
+        })
+
+    rejected, rows, first_reviews = [], [], 0
+    for event in sorted(fresh, key=lambda e: to_utc_naive(e["answered_at"])):
+        progress = progress_by_card.get(event["card_id"])
+        if progress is None:
+            rejected.append({
+                "client_event_id": event["client_event_id"],
+                "card_id": event["card_id"],
+                "detail": "Flashcard não encontrado ou não pertence ao usuário."
+            })
+            continue
+
+        answered_at = to_utc_naive(event["answered_at"])
+        first_reviews += apply_review(db, progress, event["rating"], answered_at)
+        rows.append({
+            "usuario_id": user_id,
+            "flashcard_id": event["card_id"],
+            "rating": event["rating"],
+            "answered_at": answered_at,
+            "client_event_id": event["client_event_id"],
+            "criado_em": datetime.utcnow(),
+        })
+
+    if rows:
+        db.execute(insert(Revisao), rows)
+        stats.record_reviews(
+            db,
+            user_id,
+            [row["rating"] for row in rows],
+            [row["answered_at"].date() for row in rows],
+            first_reviews
+        )
+    db.commit()
+
+    return ReviewBatchOut(accepted=len(rows), duplicates=duplicates, rejected=rejected)
+
+
+# =========================================================================================
+# EXPORTAÇÃO
+# =========================================================================================
+def iter_user_library(db: Session, user_id: int, after_id: Optional[int] = None, batch_size: int = 1000) -> Iterator[dict]:
+    """
+    Percorre a biblioteca do usuário com cursor no servidor (yield_per),
+    sem carregar tudo em memória: primeiro os decks, depois os flashcards
+    em ordem de id. Com `after_id`, retoma a partir do flashcard seguinte
+    e omite os decks (que já foram enviados antes dos cards).
+    """
+    if after_id is None:
+        decks = db.execute(
+            select(Deck.id, Deck.titulo, Deck.descricao, Deck.criado_em)
+            .where(Deck.usuario_id == user_id)
+            .order_by(Deck.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for row in decks:
+            yield {"type": "deck", **row._mapping}
+
+    query = (
+        select(Flashcard.id, Flashcard.deck_id, Flashcard.pergunta, Flashcard.resposta, Flashcard.criado_em)
+        .join(Deck, Flashcard.deck_id == Deck.id)
+        .where(Deck.usuario_id == user_id)
+        .order_by(Flashcard.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if after_id is not None:
+        query = query.where(Flashcard.id > after_id)
+
+    for row in db.execute(query):
+        yield {"type": "flashcard", **row._mapping}
+
+
+# =========================================================================================
+# IMPORTAÇÃO
+# =========================================================================================
+# Cards inseridos por comando na importação (executemany, sem RETURNING)
+IMPORT_CHUNK_SIZE = 5000
+
+
+def _import_error(exc: ValidationError) -> str:
+    return "; ".join(f"{error['loc'][0]}: {error['msg']}" for error in exc.errors())
+
+
+def import_flashcards(db: Session, user_id: int, rows: Iterable, deck_id: Optional[int], deck_data: dict) -> DeckImportOut:
+    """
+    Importa `(linha, pergunta, resposta)` num deck existente (`deck_id`) ou
+    num deck novo (`deck_data`), numa única transação.
+
+    As linhas são validadas com os limites de `FlashcardBase` e inseridas em
+    lotes de IMPORT_CHUNK_SIZE, sem carregar objetos do ORM. Todos os cards
+    recebem a mesma sequência de alteração, que depois seleciona os cards
+    novos para criar o estado de revisão com um único INSERT ... SELECT.
+    """
+    new_deck = deck_id is None
+    sequence = next_sequence(db, user_id)
+    if new_deck:
+        deck = insert_row(db, Deck, {**deck_data, "usuario_id": user_id, "sequencia": sequence})
+    else:
+        deck = update_returning(
+            db, Deck, [Deck.id == deck_id, Deck.usuario_id == user_id],
+            {"versao": Deck.versao + 1, "sequencia": sequence}
+        )
+        if deck is None:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Deck não encontrado ou não pertence ao usuário."
+            )
+    now = datetime.utcnow()
+
+    imported, failed, errors, chunk = 0, 0, [], []
+    for line, pergunta, resposta in rows:
+        try:
+            if not pergunta or not resposta:
+                raise ValueError("pergunta e resposta são obrigatórias")
+            card = FlashcardBase(pergunta=pergunta, resposta=resposta)
+        except (ValidationError, ValueError) as exc:
+            failed += 1
+            if len(errors) < MAX_ERROS_IMPORTACAO:
+                detail = _import_error(exc) if isinstance(exc, ValidationError) else str(exc)
+                errors.append(DeckImportError(line=line, detail=detail))
+            continue
+
+        chunk.append({
+            "deck_id": deck["id"],
+            "pergunta": card.pergunta,
+            "resposta": card.resposta,
+            "criado_em": now,
+            "atualizado_em": now,
+            "sequencia": sequence,
+        })
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            db.execute(insert(Flashcard), chunk)
+            imported += len(chunk)
+            chunk = []
+
+    if chunk:
+        db.execute(insert(Flashcard), chunk)
+        imported += len(chunk)
+
+    if imported:
+        db.execute(insert(Progresso).from_select(
+            ["usuario_id", "flashcard_id", "deck_id", "due_at"],
+            select(literal(user_id), Flashcard.id, Flashcard.deck_id, Flashcard.criado_em).where(
+                Flashcard.deck_id == deck["id"],
+                Flashcard.sequencia == sequence,
+            )
+        ))
+    stats.bump(db, user_id, total_decks=1 if new_deck else 0, total_cards=imported)
+
+    db.commit()
+    return DeckImportOut(deck=DeckOut.model_validate(deck), imported=imported, failed=failed, errors=errors)
+
+
+# =========================================================================================
+# SINCRONIZAÇÃO
+# =========================================================================================
+def get_changes(db: Session, user_id: int, since: Optional[int]) -> SyncOut:
+    """
+    Decks e flashcards criados/alterados depois da sequência `since`, mais os
+    tombstones do que foi apagado. Toda alteração num card também marca o seu
+    deck, então basta procurar cards nos decks alterados: o custo é
+    proporcional ao número de alterações, não ao tamanho da biblioteca.
+
+    Sem `since` (ou com um cursor anterior à última compactação dos
+    tombstones) devolve a biblioteca completa com `full=True`.
+    """
+    # Lida antes das linhas: alterações que chegarem depois serão reenviadas
+    # na próxima sincronização (o cliente aplica como upsert)
+    cursor, compacted = _library_state(db, user_id)
+    full = since is None or since < compacted
+
+    deck_query = db.query(Deck).filter(Deck.usuario_id == user_id)
+    if not full:
+        deck_query = deck_query.filter(Deck.sequencia > since)
+    decks = deck_query.order_by(Deck.id).all()
+
+    if full:
+        flashcards = db.query(Flashcard).join(Deck).filter(Deck.usuario_id == user_id).order_by(Flashcard.id).all()
+        removals = []
+    else:
+        flashcards = db.query(Flashcard).filter(
+            Flashcard.deck_id.in_([deck.id for deck in decks]),
+            Flashcard.sequencia > since
+        ).order_by(Flashcard.id).all() if decks else []
+        removals = db.query(Remocao.entidade, Remocao.entidade_id).filter(
+            Remocao.usuario_id == user_id,
+            Remocao.sequencia > since
+        ).all()
+
+    return SyncOut(
+        cursor=cursor,
+        full=full,
+        decks=[DeckSyncOut.model_validate(d) for d in decks],
+        flashcards=[FlashcardSyncOut.model_validate(f) for f in flashcards],
+        deleted={
+            "decks": [r.entidade_id for r in removals if r.entidade == "deck"],
+            "flashcards": [r.entidade_id for r in removals if r.entidade == "flashcard"],
+        },
+    )
+
+
+# =========================================================================================
+# PROGRESSO
+# =========================================================================================
+def get_user_stats(db: Session, user_id: int, today: date) -> UserStatsOut:
+    """Lê os contadores mantidos por `app.stats` (ver o módulo)."""
+    return UserStatsOut(**stats.read(db, user_id, today))
@@ -1,48 +1,143 @@
-from fastapi import Depends, HTTPException, status
+import logging
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer # <-- Importação necessária
-from sqlalchemy.orm import Session
+from sqlalchemy import event
 from jose import jwt, JWTError
 
 # Importações necessárias (Ajuste conforme seus arquivos)
-from app.database import get_db
-from app.utils.security import SECRET_KEY, ALGORITHM 
+from app import database
+from app.database import get_session, open_session
+from app.utils.security import SECRET_KEY, ALGORITHM
+from app.utils import auth_cache
+from app.utils.auth_cache import Principal, invalidate_user
 from app.models import Usuario
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.ratelimit import AUTH_IP, WRITES, rate_limiter
+
+logger = logging.getLogger(__name__)
 
 # CORREÇÃO CRÍTICA: Definir a variável ANTES de usá-la
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Não foi possível validar as credenciais",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def _decode_token(token: str) -> str:
+    """Valida o JWT (usando o cache de tokens já verificados) e retorna o `sub`."""
+    user_id = auth_cache.token_cache.get(token)
+    if user_id is not None:
+        return user_id
+
     try:
-        # LOG 1: Tenta decodificar o token
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        
-        # LOG 2: Verifica o ID extraído
-        print(f"DEBUG_AUTH: Token decodificado. ID do Usuário (sub): {user_id}")
-        
-        if user_id is None:
-            print("DEBUG_AUTH: Falha - ID do usuário é None.")
-            raise credentials_exception
-            
     except JWTError:
-        # LOG 3: ERRO de decodificação (Chave errada ou expiração)
-        print("DEBUG_AUTH: Falha - JWTError (Chave Incorreta/Token Expirado).")
-        raise credentials_exception
-        
-    # Consulta o usuário no banco de dados
-    from app.models import Usuario
-    user = db.query(Usuario).filter(Usuario.id == int(user_id)).first()
-    
+        logger.debug("auth: token rejeitado", extra={"reason": "jwt_error"})
+        raise _credentials_exception()
+
+    user_id = payload.get("sub")
+    if user_id is None:
+        logger.debug("auth: token rejeitado", extra={"reason": "missing_sub"})
+        raise _credentials_exception()
+
+    expires_at = payload.get("exp")
+    if expires_at is not None:
+        auth_cache.token_cache.set(token, user_id, float(expires_at))
+
+    return user_id
+
+
+def _load_user(db, user_id: int):
+    # Consulta o usuário no banco de dados (apenas as colunas necessárias)
+    return db.query(
+        Usuario.id, Usuario.nome, Usuario.email, Usuario.criado_em, Usuario.shard
+    ).filter(Usuario.id == user_id).first()
+
+
+# Métodos que não alteram dados; os demais marcam o usuário em `recent_writes`
+SAFE_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+
+async def get_current_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db = Depends(get_session),
+) -> Principal:
+    """
+    Retorna o usuário autenticado como `Principal` (id, nome, email,
+    criado_em, shard) e liga a sessão da requisição ao shard dele.
+    Com os caches aquecidos não executa nenhuma consulta ao banco.
+    """
+    user_id = int(_decode_token(token))
+
+    if request.method not in SAFE_METHODS:
+        rate_limiter.hit(WRITES, user_id)
+        if database.has_replica():
+            database.recent_writes.mark(user_id)
+
+    principal = auth_cache.principal_cache.get(user_id)
+    if principal is not None:
+        database.use_shard(db, principal.shard)
+        return principal
+
+    user = await db.run_sync(_load_user, user_id)
+
     if user is None:
-        # LOG 4: ERRO de DB (Usuário não existe)
-        print(f"DEBUG_AUTH: Falha - Usuário com ID {user_id} não encontrado no DB.")
-        raise credentials_exception
-        
-    print(f"DEBUG_AUTH: Sucesso. Usuário {user.nome} autenticado.")
-    return user
\ No newline at end of file
+        logger.debug("auth: usuário não encontrado", extra={"user_id": user_id})
+        raise _credentials_exception()
+
+    principal = Principal.from_usuario(user)
+    auth_cache.principal_cache.set(principal)
+    database.use_shard(db, principal.shard)
+    logger.debug("auth: usuário autenticado", extra={"user_id": user_id})
+    return principal
+
+
+async def limit_auth_ip(request: Request):
+    """Limite por IP das rotas de login e cadastro (cada chamada roda bcrypt)."""
+    rate_limiter.hit(AUTH_IP, request.client.host if request.client else None)
+
+
+async def get_read_session(current_user: Principal = Depends(get_current_user)):
+    """
+    Sessão para leituras: vai para a réplica, exceto logo depois de uma
+    escrita do mesmo usuário (REPLICA_STICKY_SECONDS), quando fica no primário
+    para que ele leia o que acabou de gravar.
+    """
+    replica = not database.recent_writes.is_recent(current_user.id)
+    async with open_session(replica=replica) as db:
+        database.use_shard(db, current_user.shard)
+        yield db
+
+
+class PageParams:
+    """
+    Parâmetros de paginação das rotas de listagem.
+    Sem `limit`, `cursor` e `fields` a rota devolve a lista completa
+    (comportamento antigo, usado pelas telas atuais do app).
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Itens por página; ativa a paginação"),
+        cursor: Optional[str] = Query(None, description="Valor de next_cursor da página anterior"),
+        fields: Optional[str] = Query(None, description="Campos separados por vírgula, ex.: id,pergunta"),
+    ):
+        self.limit = limit or DEFAULT_PAGE_SIZE
+        self.cursor = cursor
+        self.fields = fields
+        self.enabled = any(value is not None for value in (limit, cursor, fields))
+
+
+# Mantém o cache coerente quando um usuário é alterado ou removido pelo ORM
+@event.listens_for(Usuario, "after_update")
+@event.listens_for(Usuario, "after_delete")
+def _invalidate_principal(mapper, connection, target):
+    invalidate_user(target.id)
@@ -0,0 +1,144 @@
+"""
+Leitura de arquivos de flashcards para POST /decks/import.
+
+Formatos:
+  - CSV/TSV: uma linha por card, pergunta na 1ª coluna e resposta na 2ª
+    (colunas extras são ignoradas). O separador (tab, ";" ou ",") é
+    detectado na primeira linha, que é pulada se for um cabeçalho;
+  - Anki (.apkg): zip com a coleção SQLite (collection.anki21 ou
+    collection.anki2); de cada nota vêm os dois primeiros campos, sem HTML.
+
+Os leitores recebem um arquivo binário já gravado (a rota copia o corpo da
+requisição para um arquivo temporário, em disco acima de 1 MiB) e produzem
+`(linha, pergunta, resposta)` um a um: a memória usada não depende do
+tamanho do arquivo.
+"""
+import codecs
+import csv
+import html
+import re
+import sqlite3
+import tempfile
+import zipfile
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from app.config import MAX_ANKI_COLLECTION_BYTES
+
+ImportRow = Tuple[int, str, str]
+
+# Primeira linha tratada como cabeçalho (comparação sem maiúsculas)
+HEADERS = {("pergunta", "resposta"), ("question", "answer"), ("front", "back"), ("frente", "verso")}
+
+# Coleções do Anki, da mais nova para a mais antiga. A collection.anki21b
+# (Anki >= 2.1.50, compactada com zstd) não é suportada; esses pacotes
+# costumam trazer também uma collection.anki2 de compatibilidade.
+ANKI_COLLECTIONS = ("collection.anki21", "collection.anki2")
+
+_ZIP_MAGIC = b"PK\x03\x04"
+_BREAK = re.compile(r"<br\s*/?>|</div>|</p>", re.IGNORECASE)
+_TAG = re.compile(r"<[^>]+>")
+_SOUND = re.compile(r"\[sound:[^\]]*\]")
+
+
+class ImportFormatError(ValueError):
+    """Arquivo que não pode ser lido no formato indicado."""
+
+
+class ImportTooLargeError(ImportFormatError):
+    """Conteúdo descompactado maior que o permitido (a rota responde 413)."""
+
+
+def detect_format(file: BinaryIO, declared: Optional[str] = None) -> str:
+    if declared:
+        return declared
+    magic = file.read(len(_ZIP_MAGIC))
+    file.seek(0)
+    return "apkg" if magic == _ZIP_MAGIC else "csv"
+
+
+def _sniff_delimiter(first_line: str) -> str:
+    if "\t" in first_line:
+        return "\t"
+    if first_line.count(";") > first_line.count(","):
+        return ";"
+    return ","
+
+
+def read_delimited(file: BinaryIO, delimiter: Optional[str] = None) -> Iterator[ImportRow]:
+    """CSV/TSV em UTF-8 (com ou sem BOM); bytes inválidos viram U+FFFD."""
+    text = codecs.getreader("utf-8-sig")(file, errors="replace")
+    first = text.readline()
+    if delimiter is None:
+        delimiter = _sniff_delimiter(first)
+
+    def lines():
+        yield first
+        yield from text
+
+    reader = csv.reader(lines(), delimiter=delimiter)
+    try:
+        for index, row in enumerate(reader):
+            if index == 0 and tuple(cell.strip().lower() for cell in row[:2]) in HEADERS:
+                continue
+            if not any(cell.strip() for cell in row):
+                continue
+            yield reader.line_num, row[0].strip(), row[1].strip() if len(row) > 1 else ""
+    except csv.Error as exc:
+        # Ex.: campo entre aspas que nunca fecha (passa do limite do módulo csv)
+        raise ImportFormatError(f"Linha {reader.line_num}: {exc}")
+
+
+def _anki_text(field: str) -> str:
+    field = _SOUND.sub("", field)
+    field = _BREAK.sub("\n", field)
+    field = _TAG.sub("", field)
+    text = html.unescape(field).replace("\xa0", " ")
+    return "\n".join(line.strip() for line in text.splitlines()).strip()
+
+
+def read_apkg(file: BinaryIO) -> Iterator[ImportRow]:
+    try:
+        package = zipfile.ZipFile(file)
+    except zipfile.BadZipFile:
+        raise ImportFormatError("Arquivo .apkg inválido (não é um zip).")
+
+    with package, tempfile.TemporaryDirectory() as workdir:
+        names = set(package.namelist())
+        member = next((name for name in ANKI_COLLECTIONS if name in names), None)
+        if member is None:
+            raise ImportFormatError("Pacote do Anki sem coleção compatível (collection.anki2/anki21).")
+
+        # O SQLite precisa de um caminho: copia a coleção em blocos. O
+        # tamanho declarado no zip é conferido antes, e a cópia para ao
+        # passar do limite mesmo que ele minta (zip bomb)
+        too_large = ImportTooLargeError(
+            f"Coleção do Anki maior que {MAX_ANKI_COLLECTION_BYTES // (1024 * 1024)} MiB descompactada."
+        )
+        if package.getinfo(member).file_size > MAX_ANKI_COLLECTION_BYTES:
+            raise too_large
+        path = f"{workdir}/collection.db"
+        with package.open(member) as source, open(path, "wb") as target:
+            size = 0
+            while chunk := source.read(1 << 20):
+                size += len(chunk)
+                if size > MAX_ANKI_COLLECTION_BYTES:
+                    raise too_large
+                target.write(chunk)
+
+        connection = sqlite3.connect(path)
+        try:
+            try:
+                notes = connection.execute("SELECT flds FROM notes ORDER BY id")
+            except sqlite3.DatabaseError:
+                raise ImportFormatError("Coleção do Anki ilegível.")
+            for index, (fields,) in enumerate(notes, start=1):
+                parts = fields.split("\x1f")
+                yield index, _anki_text(parts[0]), _anki_text(parts[1]) if len(parts) > 1 else ""
+        finally:
+            connection.close()
+
+
+def read_rows(file: BinaryIO, file_format: str) -> Iterator[ImportRow]:
+    if file_format == "apkg":
+        return read_apkg(file)
+    return read_delimited(file, "\t" if file_format == "tsv" else None)
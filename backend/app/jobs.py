@@ -0,0 +1,441 @@
+"""
+Fila de tarefas em segundo plano, sem broker externo.
+
+Trabalho pesado (importações grandes, exportação, deleções em lote,
+recálculo de estatísticas) não precisa prender a requisição, nem uma thread
+e uma conexão do servidor, até terminar: a rota grava a tarefa na tabela
+`tarefas` e responde 202 com o id; GET /jobs/{id} acompanha o andamento.
+
+Cada processo do servidor sobe no lifespan JOB_WORKERS threads que pegam as
+tarefas liberadas (maior prioridade primeiro, depois a mais antiga). A
+reserva é um UPDATE condicional (status "pendente" -> "executando"), então
+os N processos de `python -m app.serve` dividem a mesma fila sem executar
+uma tarefa duas vezes. A reserva vale por JOB_LEASE_SECONDS e é renovada a
+cada `progress()`; se o processo cair, a tarefa volta para a fila quando o
+prazo vencer.
+
+Uma falha é repetida até `max_tentativas`, esperando
+JOB_RETRY_BASE_SECONDS * 2^(tentativa - 1) (até JOB_RETRY_MAX_SECONDS).
+`PermanentJobError` encerra a tarefa sem novas tentativas (ex.: arquivo
+inválido, deck de outro usuário).
+
+Os tipos de tarefa são funções registradas com `@handler("tipo")`, que
+recebem uma sessão síncrona, o `JobContext` e os parâmetros gravados na
+tarefa, e retornam o resultado (dict serializável em JSON).
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app import crud, database, shards, stats
+from app.config import (
+    JOB_FILES_DIR,
+    JOB_LEASE_SECONDS,
+    JOB_POLL_SECONDS,
+    JOB_RETRY_BASE_SECONDS,
+    JOB_RETRY_MAX_SECONDS,
+    JOB_WORKERS,
+)
+from app.importers import ImportFormatError, read_rows
+from app.models import Tarefa
+from app.schemas import JobOut
+from app.utils import metrics
+from app.utils.export import gzip_chunks, ndjson_chunks
+from app.utils.writes import insert_row
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pendente"
+RUNNING = "executando"
+SUCCEEDED = "concluida"
+FAILED = "falhou"
+
+# Tamanho máximo gravado em `erro`
+MAX_ERROR_LENGTH = 1000
+
+jobs_finished = metrics.REGISTRY.register(metrics.Counter(
+    "jobs_finished_total", "Execuções de tarefas em segundo plano, por tipo e resultado.", ("tipo", "status"),
+))
+
+
+class PermanentJobError(Exception):
+    """Falha que não adianta repetir; a mensagem vai para o campo `erro`."""
+
+
+@dataclass(frozen=True)
+class JobType:
+    name: str
+    fn: Callable
+    priority: int
+    max_attempts: int
+    # Chamada com os parâmetros quando a tarefa termina de vez (sucesso ou última falha)
+    cleanup: Optional[Callable] = None
+
+
+HANDLERS: Dict[str, JobType] = {}
+
+
+def handler(name: str, priority: int = 0, max_attempts: int = 3, cleanup: Optional[Callable] = None):
+    """Registra a função como o tipo de tarefa `name`."""
+    def register(fn):
+        HANDLERS[name] = JobType(name, fn, priority, max_attempts, cleanup)
+        return fn
+    return register
+
+
+def _lease_deadline() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=JOB_LEASE_SECONDS)
+
+
+class JobContext:
+    """Identificação da tarefa em execução e relato de andamento."""
+
+    # Intervalo mínimo (segundos) entre gravações de andamento
+    progress_interval = 1.0
+
+    def __init__(self, job_id: int, user_id: int, attempt: int):
+        self.job_id = job_id
+        self.user_id = user_id
+        self.attempt = attempt
+        # Tarefas curtas terminam sem gravar andamento nenhum
+        self._reported_at = time.monotonic()
+        # No SQLite (um escritor por vez) a gravação esperaria a transação da
+        # própria tarefa: só o relato final (`force`, após o commit) é gravado
+        self._progress_enabled = database.engine.dialect.name != "sqlite"
+
+    def progress(self, done: int, total: Optional[int] = None, force: bool = False):
+        """
+        Grava `concluidos`/`total` (no máximo uma vez por `progress_interval`,
+        salvo `force`) e renova a reserva. A gravação usa uma sessão própria:
+        fica visível enquanto a transação da tarefa continua aberta.
+        """
+        now = time.monotonic()
+        if not force and (not self._progress_enabled or now - self._reported_at < self.progress_interval):
+            return
+        self._reported_at = now
+        with database.SessionLocal() as db:
+            db.execute(
+                update(Tarefa)
+                .where(Tarefa.id == self.job_id, Tarefa.status == RUNNING)
+                .values(concluidos=done, total=total, bloqueada_ate=_lease_deadline())
+            )
+            db.commit()
+
+
+# =========================================================================================
+# ENFILEIRAR E CONSULTAR (CHAMADAS PELAS ROTAS VIA run_sync)
+# =========================================================================================
+def enqueue(db: Session, user_id: int, kind: str, params: Optional[dict] = None, priority: Optional[int] = None) -> JobOut:
+    """Grava a tarefa (commit) e acorda os workers deste processo."""
+    job_type = HANDLERS[kind]
+    job = insert_row(db, Tarefa, {
+        "usuario_id": user_id,
+        "tipo": kind,
+        "parametros": params or {},
+        "prioridade": job_type.priority if priority is None else priority,
+        "max_tentativas": job_type.max_attempts,
+    })
+    db.commit()
+    job_pool.notify()
+    return JobOut.model_validate(job)
+
+
+def read_job(db: Session, job_id: int, user_id: int) -> Optional[JobOut]:
+    job = db.execute(
+        select(Tarefa).where(Tarefa.id == job_id, Tarefa.usuario_id == user_id)
+    ).scalar_one_or_none()
+    return JobOut.model_validate(job) if job is not None else None
+
+
+def accepted(job: JobOut) -> JSONResponse:
+    """202 com a tarefa e o endereço para acompanhá-la."""
+    return JSONResponse(
+        status_code=202,
+        content=job.model_dump(mode="json"),
+        headers={"Location": f"/jobs/{job.id}"},
+    )
+
+
+def job_file(name: str) -> str:
+    """Caminho de um arquivo de tarefa em JOB_FILES_DIR (criado se faltar)."""
+    os.makedirs(JOB_FILES_DIR, exist_ok=True)
+    return os.path.join(JOB_FILES_DIR, name)
+
+
+def new_upload_file():
+    """Arquivo em JOB_FILES_DIR para o corpo de uma requisição que vira tarefa."""
+    os.makedirs(JOB_FILES_DIR, exist_ok=True)
+    return tempfile.NamedTemporaryFile(dir=JOB_FILES_DIR, prefix="upload-", delete=False)
+
+
+def remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# =========================================================================================
+# WORKERS
+# =========================================================================================
+class JobWorkerPool:
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        poll_interval: float = JOB_POLL_SECONDS,
+        retry_base: float = JOB_RETRY_BASE_SECONDS,
+        retry_max: float = JOB_RETRY_MAX_SECONDS,
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._threads = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._running = 0
+        self._lock = threading.Lock()
+        self._recovered_at = None
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def start(self):
+        if self._threads or self.workers <= 0:
+            return
+        self._stopping.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def notify(self):
+        """Há tarefa nova: os workers consultam a fila sem esperar o intervalo."""
+        self._wakeup.set()
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """
+        Para de pegar tarefas e espera as em execução por até `timeout`
+        segundos. As que não terminarem voltam para a fila quando a reserva vencer.
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                ran = self.run_once()
+            except Exception:
+                logger.exception("jobs: erro ao consultar a fila")
+                ran = False
+            if not ran and not self._stopping.is_set():
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def run_once(self) -> bool:
+        """Executa a próxima tarefa liberada, se houver. Retorna se executou."""
+        with database.SessionLocal() as db:
+            self._recover_expired(db)
+            job = self._claim(db)
+        if job is None:
+            return False
+
+        with self._lock:
+            self._running += 1
+        try:
+            self._execute(job)
+        finally:
+            with self._lock:
+                self._running -= 1
+        return True
+
+    def _recover_expired(self, db: Session):
+        # No máximo uma vez por reserva: é raro haver o que recuperar
+        now = time.monotonic()
+        if self._recovered_at is not None and now - self._recovered_at < min(JOB_LEASE_SECONDS, 60):
+            return
+        self._recovered_at = now
+
+        expired = [Tarefa.status == RUNNING, Tarefa.bloqueada_ate < datetime.utcnow()]
+        db.execute(
+            update(Tarefa)
+            .where(*expired, Tarefa.tentativas >= Tarefa.max_tentativas)
+            .values(status=FAILED, erro="Interrompida (o processo que a executava parou).",
+                    finalizado_em=datetime.utcnow(), bloqueada_ate=None)
+        )
+        db.execute(update(Tarefa).where(*expired).values(status=PENDING, bloqueada_ate=None))
+        db.commit()
+
+    def _claim(self, db: Session) -> Optional[Tarefa]:
+        # Outro worker pode reservar a mesma candidata antes: tenta a seguinte
+        for _ in range(5):
+            now = datetime.utcnow()
+            job = db.execute(
+                select(Tarefa)
+                .where(Tarefa.status == PENDING, Tarefa.executar_apos <= now)
+                .order_by(Tarefa.prioridade.desc(), Tarefa.id)
+                .limit(1)
+            ).scalar_one_or_none()
+            if job is None:
+                db.commit()
+                return None
+
+            result = db.execute(
+                update(Tarefa)
+                .where(Tarefa.id == job.id, Tarefa.status == PENDING)
+                .values(status=RUNNING, tentativas=Tarefa.tentativas + 1,
+                        iniciado_em=now, bloqueada_ate=_lease_deadline())
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            if result.rowcount == 1:
+                job.tentativas += 1
+                return job
+        return None
+
+    def _execute(self, job: Tarefa):
+        job_type = HANDLERS.get(job.tipo)
+        params = job.parametros or {}
+        context = JobContext(job.id, job.usuario_id, job.tentativas)
+        started = time.perf_counter()
+        try:
+            if job_type is None:
+                raise PermanentJobError(f"Tipo de tarefa desconhecido: {job.tipo}.")
+            with database.SessionLocal() as db:
+                # Lido a cada execução: o usuário pode ter mudado de shard
+                # (UserMoved na tentativa anterior)
+                database.use_shard(db, shards.user_shard(db, job.usuario_id))
+                result = job_type.fn(db, context, **params)
+        except PermanentJobError as exc:
+            self._finish(job, FAILED, error=str(exc))
+        except Exception as exc:
+            logger.warning("jobs: tarefa %s (%s) falhou na tentativa %s", job.id, job.tipo, job.tentativas, exc_info=True)
+            if job.tentativas < job.max_tentativas:
+                self._retry(job, f"{type(exc).__name__}: {exc}")
+                return
+            self._finish(job, FAILED, error=f"{type(exc).__name__}: {exc}")
+        else:
+            self._finish(job, SUCCEEDED, result=result)
+            logger.info("jobs: tarefa %s (%s) concluída em %.0f ms", job.id, job.tipo, (time.perf_counter() - started) * 1000)
+
+        if job_type is not None and job_type.cleanup is not None:
+            try:
+                job_type.cleanup(**params)
+            except Exception:
+                logger.warning("jobs: falha na limpeza da tarefa %s", job.id, exc_info=True)
+
+    def _retry(self, job: Tarefa, error: str):
+        delay = min(self.retry_max, self.retry_base * 2 ** (job.tentativas - 1))
+        with database.SessionLocal() as db:
+            db.execute(
+                update(Tarefa)
+                .where(Tarefa.id == job.id, Tarefa.status == RUNNING)
+                .values(status=PENDING, erro=error[:MAX_ERROR_LENGTH], bloqueada_ate=None,
+                        executar_apos=datetime.utcnow() + timedelta(seconds=delay))
+            )
+            db.commit()
+        jobs_finished.inc(job.tipo, "retry")
+
+    def _finish(self, job: Tarefa, status: str, result: Optional[dict] = None, error: Optional[str] = None):
+        with database.SessionLocal() as db:
+            db.execute(
+                update(Tarefa)
+                .where(Tarefa.id == job.id, Tarefa.status == RUNNING)
+                .values(status=status, resultado=result, erro=error[:MAX_ERROR_LENGTH] if error else None,
+                        bloqueada_ate=None, finalizado_em=datetime.utcnow())
+            )
+            db.commit()
+        jobs_finished.inc(job.tipo, status)
+
+
+# Instância do processo: iniciada e parada no lifespan do app
+job_pool = JobWorkerPool()
+
+metrics.REGISTRY.register(metrics.Gauge(
+    "jobs_running", "Tarefas em segundo plano em execução neste processo.",
+    collect=lambda: {(): job_pool.running},
+))
+
+
+# =========================================================================================
+# TIPOS DE TAREFA
+# =========================================================================================
+@handler("import_deck", priority=10, cleanup=lambda path, **_: remove_file(path))
+def import_deck(db: Session, job: JobContext, path: str, file_format: str, deck_id: Optional[int], deck_data: dict):
+    """POST /decks/import?background=true: o arquivo já foi gravado em `path`."""
+    with open(path, "rb") as file:
+        def rows():
+            for count, row in enumerate(read_rows(file, file_format), start=1):
+                job.progress(count)
+                yield row
+
+        try:
+            result = crud.import_flashcards(db, job.user_id, rows(), deck_id, deck_data)
+        except ImportFormatError as exc:
+            raise PermanentJobError(str(exc))
+        except HTTPException as exc:
+            raise PermanentJobError(exc.detail)
+    job.progress(result.imported + result.failed, result.imported + result.failed, force=True)
+    return result.model_dump(mode="json")
+
+
+@handler("delete_decks", priority=5)
+def delete_decks(db: Session, job: JobContext, deck_ids: list):
+    """POST /decks/bulk-delete?background=true."""
+    deleted = crud.delete_decks(db, job.user_id, deck_ids)
+    return {"deleted": deleted, "not_found": sorted(set(deck_ids) - set(deleted))}
+
+
+@handler("recount_stats")
+def recount_stats(db: Session, job: JobContext):
+    """POST /users/stats/recount: refaz os contadores a partir das tabelas de origem."""
+    corrected = stats.rebuild(db, job.user_id)
+    db.commit()
+    return {"corrected": corrected}
+
+
+def export_path(job_id: int, compress: bool) -> str:
+    return job_file(f"export-{job_id}.ndjson" + (".gz" if compress else ""))
+
+
+@handler("export_library")
+def export_library(db: Session, job: JobContext, compress: bool = True):
+    """POST /users/me/export: NDJSON em arquivo, baixado por GET /jobs/{id}/file."""
+    path = export_path(job.job_id, compress)
+    records = 0
+
+    def rows():
+        nonlocal records
+        for row in crud.iter_user_library(db, job.user_id):
+            records += 1
+            job.progress(records)
+            yield row
+
+    chunks = ndjson_chunks(rows())
+    if compress:
+        chunks = gzip_chunks(chunks)
+    # Grava ao lado e renomeia: um download nunca vê o arquivo pela metade
+    partial = f"{path}.partial"
+    with open(partial, "wb") as file:
+        for chunk in chunks:
+            file.write(chunk)
+    os.replace(partial, path)
+
+    job.progress(records, records, force=True)
+    return {"records": records, "bytes": os.path.getsize(path), "compress": compress}
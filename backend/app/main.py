@@ -1,8 +1,38 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, deck, flashcard, progresso, usuarios
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from app import database, warmup
+from app.config import GRACEFUL_TIMEOUT
+from app.utils import metrics
+from app.jobs import job_pool
+from app.shards import UserMoved
+from app.utils.auth_cache import invalidate_user
+from app.utils.hasher import PasswordHasherBusy, password_hasher
+from app.utils.pagination import InvalidPageParams
+from app.utils.ratelimit import RateLimitExceeded
+from app.routers import auth, deck, flashcard, health, jobs, progresso, reviews, study, sync, usuarios
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Conexões e threads prontas antes de o worker aceitar tráfego
+    await warmup.warm_up()
+    # Tarefas em segundo plano (app/jobs.py): threads próprias, fora do threadpool das rotas
+    job_pool.start()
+    yield
+    warmup.state.shutting_down = True
+    await run_in_threadpool(job_pool.shutdown, GRACEFUL_TIMEOUT)
+    password_hasher.shutdown()
+    # Fecha as conexões dos pools assíncronos (primário e shards) ao desligar o servidor
+    if database.async_engine is not None:
+        for async_engine in dict.fromkeys([database.async_engine, *database.async_shard_engines]):
+            await async_engine.dispose()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://localhost:19000",
@@ -20,10 +50,66 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Latência por rota e uso do banco por requisição (ver app/utils/metrics.py)
+app.add_middleware(metrics.MetricsMiddleware)
+
+metrics.REGISTRY.register(metrics.Gauge(
+    "password_hasher_pending", "Tarefas de bcrypt em execução ou na fila.",
+    collect=lambda: {(): password_hasher.pending},
+))
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Métricas no formato texto do Prometheus."""
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+# Pool de bcrypt cheio: falha rápido em vez de enfileirar indefinidamente
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Servidor ocupado, tente novamente em instantes."},
+        headers={"Retry-After": "1"},
+    )
+
+
+# Balde vazio (app/utils/ratelimit.py): o cliente sabe quando tentar de novo
+@app.exception_handler(RateLimitExceeded)
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Muitas requisições, tente novamente mais tarde."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+# Usuário mudando de shard (app/shards.py): a escrita é recusada até a cópia
+# terminar. O shard em cache é descartado para a próxima tentativa ir ao novo
+@app.exception_handler(UserMoved)
+async def user_moved_handler(request: Request, exc: UserMoved):
+    invalidate_user(exc.user_id)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Seus dados estão sendo movidos, tente novamente em instantes."},
+        headers={"Retry-After": "5"},
+    )
+
+
+@app.exception_handler(InvalidPageParams)
+async def invalid_page_params_handler(request: Request, exc: InvalidPageParams):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
 
 app.include_router(auth.router)
 app.include_router(deck.router)
 app.include_router(flashcard.router)
 app.include_router(usuarios.router)
 app.include_router(progresso.router)
+app.include_router(study.router)
+app.include_router(reviews.router)
+app.include_router(sync.router)
+app.include_router(jobs.router)
+app.include_router(health.router)
 
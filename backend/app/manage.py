@@ -0,0 +1,262 @@
+"""
+Comandos de manutenção do banco.
+
+Uso (a partir de backend/):
+    python -m app.manage create-tables
+    python -m app.manage add-columns
+    python -m app.manage update-foreign-keys
+    python -m app.manage backfill-progresso
+    python -m app.manage rebuild-stats
+    python -m app.manage compact-tombstones
+    python -m app.manage rebuild-search-index
+    python -m app.manage purge-jobs
+    python -m app.manage move-user <usuario_id> <shard>
+
+Os comandos de esquema e de dados dos usuários passam por todos os shards
+(SHARD_DATABASE_URLS).
+"""
+import argparse
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, inspect, select, text, update
+from sqlalchemy.schema import CreateColumn
+
+from app import database, jobs, search, shards, stats
+from app.config import JOB_RETENTION_DAYS, TOMBSTONE_RETENTION_DAYS
+from app.database import Base, SessionLocal, engine, use_shard
+from app.models import Biblioteca, Deck, Flashcard, Progresso, Remocao, Tarefa, Usuario
+
+
+def _engines():
+    """O primário e os shards que ficam em outros bancos (cada banco uma vez)."""
+    return list(dict.fromkeys([engine, *database.shard_engines]))
+
+
+def _shard_sessions():
+    """Uma sessão ligada a cada shard, em ordem."""
+    for shard in range(len(database.shard_engines)):
+        db = SessionLocal()
+        use_shard(db, shard)
+        try:
+            yield db
+        finally:
+            db.close()
+
+
+def create_tables():
+    """Cria as tabelas que ainda não existem (não altera as existentes)."""
+    Base.metadata.create_all(engine)
+    for shard_engine in _engines()[1:]:
+        shards.create_tables(shard_engine)
+
+
+def add_columns():
+    """
+    Adiciona às tabelas existentes as colunas e os índices novos dos modelos
+    (ALTER TABLE ... ADD COLUMN). Colunas NOT NULL precisam de server_default.
+    """
+    for each in _engines():
+        _add_columns(each)
+
+
+def _add_columns(engine):
+    existing_tables = set(inspect(engine).get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+                print(f"{table.name}.{column.name} adicionada.")
+
+            indexes = {index["name"] for index in inspect(conn).get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(conn)
+                    print(f"índice {index.name} criado.")
+
+
+def update_foreign_keys():
+    """
+    Recria as chaves estrangeiras cujo ON DELETE difere do modelo (ex.: o
+    ON DELETE CASCADE de flashcards e progresso). No SQLite não há ALTER de
+    constraints: bancos antigos precisam ser recriados (create-tables).
+    """
+    if engine.dialect.name != "mysql":
+        print(f"Não suportado em '{engine.dialect.name}': recrie as tabelas para atualizar as chaves.")
+        return
+    for each in _engines():
+        _update_foreign_keys(each)
+
+
+def _update_foreign_keys(engine):
+    existing_tables = set(inspect(engine).get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            current = {
+                (tuple(fk["constrained_columns"]), fk["referred_table"]): fk
+                for fk in inspect(conn).get_foreign_keys(table.name)
+            }
+            for constraint in table.foreign_key_constraints:
+                key = (tuple(constraint.column_keys), constraint.referred_table.name)
+                found = current.get(key)
+                wanted = (constraint.ondelete or "").upper()
+                if found is None or (found["options"].get("ondelete") or "").upper() == wanted:
+                    continue
+
+                columns = ", ".join(constraint.column_keys)
+                referred = ", ".join(element.column.name for element in constraint.elements)
+                on_delete = f" ON DELETE {wanted}" if wanted else ""
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} DROP FOREIGN KEY {found['name']}, "
+                    f"ADD CONSTRAINT {found['name']} FOREIGN KEY ({columns}) "
+                    f"REFERENCES {constraint.referred_table.name} ({referred}){on_delete}"
+                ))
+                print(f"{table.name}.{columns}: ON DELETE {wanted or 'NO ACTION'}.")
+
+
+def backfill_progresso():
+    """Cria o estado de revisão dos flashcards que ainda não têm um."""
+    for db in _shard_sessions():
+        missing = (
+            select(Deck.usuario_id, Flashcard.id, Flashcard.deck_id, Flashcard.criado_em)
+            .join(Deck, Flashcard.deck_id == Deck.id)
+            .outerjoin(Progresso, Progresso.flashcard_id == Flashcard.id)
+            .where(Progresso.id.is_(None))
+        )
+        result = db.execute(
+            insert(Progresso).from_select(["usuario_id", "flashcard_id", "deck_id", "due_at"], missing)
+        )
+        db.commit()
+        print(f"{result.rowcount} registros de progresso criados.")
+
+
+def rebuild_stats():
+    """
+    Recalcula as estatísticas de todos os usuários a partir das tabelas de
+    origem e corrige as linhas que divergirem dos contadores incrementais.
+    """
+    db = SessionLocal()
+    try:
+        users = db.query(Usuario.id, Usuario.shard).order_by(Usuario.id).all()
+        drifted = 0
+        for user_id, shard in users:
+            use_shard(db, shard)
+            if stats.rebuild(db, user_id):
+                drifted += 1
+                print(f"usuário {user_id}: estatísticas corrigidas")
+                db.commit()
+        print(f"{len(users)} usuários verificados, {drifted} corrigidos.")
+    finally:
+        db.close()
+
+
+def compact_tombstones():
+    """
+    Apaga os tombstones mais antigos que TOMBSTONE_RETENTION_DAYS e registra,
+    por usuário, a maior sequência apagada: cursores do /sync anteriores a ela
+    passam a receber a biblioteca completa.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+    for db in _shard_sessions():
+        compacted = db.query(Remocao.usuario_id, func.max(Remocao.sequencia)).filter(
+            Remocao.removido_em < cutoff
+        ).group_by(Remocao.usuario_id).all()
+
+        libraries = {
+            row.usuario_id for row in db.query(Biblioteca.usuario_id).filter(
+                Biblioteca.usuario_id.in_([user_id for user_id, _ in compacted])
+            )
+        }
+        for user_id, sequence in compacted:
+            # Sem a linha de `bibliotecas` (conta antiga), a sequência ainda está em `usuarios`
+            model, key, column = (
+                (Biblioteca, Biblioteca.usuario_id, Biblioteca.sequencia_compactada) if user_id in libraries
+                else (Usuario, Usuario.id, Usuario.sequencia_compactada)
+            )
+            db.execute(
+                update(model)
+                .where(key == user_id, column < sequence)
+                .values(sequencia_compactada=sequence)
+            )
+        result = db.execute(delete(Remocao).where(Remocao.removido_em < cutoff))
+        db.commit()
+        print(f"{result.rowcount} tombstones removidos ({len(compacted)} usuários).")
+
+
+def rebuild_search_index():
+    """Cria (se faltar) e reconstrói o índice da busca textual de flashcards."""
+    for each in _engines():
+        backend = search.get_backend(each.dialect.name)
+        with each.begin() as conn:
+            backend.install(conn)
+            backend.rebuild(conn)
+    print("Índice de busca reconstruído.")
+
+
+def purge_jobs():
+    """
+    Apaga as tarefas terminadas há mais de JOB_RETENTION_DAYS e os arquivos
+    delas (exportações prontas, uploads de importações que falharam).
+    """
+    cutoff = datetime.utcnow() - timedelta(days=JOB_RETENTION_DAYS)
+    finished = [Tarefa.status.in_([jobs.SUCCEEDED, jobs.FAILED]), Tarefa.finalizado_em < cutoff]
+    db = SessionLocal()
+    try:
+        files = 0
+        for job in db.execute(select(Tarefa.id, Tarefa.tipo, Tarefa.parametros).where(*finished)):
+            params = job.parametros or {}
+            if job.tipo == "export_library":
+                paths = [jobs.export_path(job.id, params.get("compress", True))]
+            else:
+                paths = [params["path"]] if "path" in params else []
+            for path in paths:
+                if os.path.exists(path):
+                    jobs.remove_file(path)
+                    files += 1
+        result = db.execute(delete(Tarefa).where(*finished))
+        db.commit()
+        print(f"{result.rowcount} tarefas removidas ({files} arquivos).")
+    finally:
+        db.close()
+
+
+def move_user(user_id: str, shard: str):
+    """
+    Move os dados de um usuário para outro shard (ver app/shards.py). Leva
+    pelo menos PRINCIPAL_CACHE_TTL segundos; interrompido, pode ser repetido.
+    """
+    copied = shards.move_user(int(user_id), int(shard))
+    print(f"Usuário {user_id} movido para o shard {shard}: " + ", ".join(f"{n} {t}" for t, n in copied.items()) + ".")
+
+
+COMMANDS = {
+    "create-tables": create_tables,
+    "add-columns": add_columns,
+    "update-foreign-keys": update_foreign_keys,
+    "backfill-progresso": backfill_progresso,
+    "rebuild-stats": rebuild_stats,
+    "compact-tombstones": compact_tombstones,
+    "rebuild-search-index": rebuild_search_index,
+    "purge-jobs": purge_jobs,
+    "move-user": move_user,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("arguments", nargs="*", help="argumentos do comando (move-user: <usuario_id> <shard>)")
+    args = parser.parse_args()
+    COMMANDS[args.command](*args.arguments)
+
+
+if __name__ == "__main__":
+    main()
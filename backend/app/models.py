@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, ForeignKey, Index, JSON, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -10,7 +10,38 @@ class Usuario(Base):
     nome = Column(String(120))
     email = Column(String(255), unique=True, index=True, nullable=False)
     senha = Column(String(255), nullable=False)
-    criado_em = Column(DateTime(timezone=True), server_default=func.now())
+    # Default local também (além do servidor): o INSERT já leva o valor e a
+    # resposta não precisa relê-lo no MySQL, que não tem RETURNING
+    criado_em = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
+
+    # Shard dos dados do usuário: índice em SHARD_DATABASE_URLS (app/shards.py)
+    shard = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Sequência de alterações de contas anteriores à tabela `bibliotecas`:
+    # copiada para ela na primeira escrita (ver crud.next_sequence)
+    versao_biblioteca = Column(Integer, nullable=False, default=1, server_default="1")
+    sequencia_compactada = Column(Integer, nullable=False, default=0, server_default="0")
+
+# BIBLIOTECA (sequência de alterações do usuário; fica no shard dele, junto
+# com os decks, para que cada escrita seja uma transação num único banco)
+class Biblioteca(Base):
+    __tablename__ = "bibliotecas"
+
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), primary_key=True)
+
+    # Incrementada a cada escrita em decks/flashcards do usuário (ETag das
+    # listagens e cursor do GET /sync)
+    versao = Column(Integer, nullable=False, default=1, server_default="1")
+    # Maior sequência cujas remoções já foram compactadas; cursores anteriores
+    # a ela recebem a biblioteca completa no /sync
+    sequencia_compactada = Column(Integer, nullable=False, default=0, server_default="0")
+    # Shard para onde o usuário está sendo (ou foi) movido: com ele
+    # preenchido, as escritas neste shard são recusadas
+    movida_para = Column(Integer, nullable=True)
+
+    def __repr__(self):
+        return f"<Biblioteca(usuario_id={self.usuario_id}, versao={self.versao})>"
+
 
 # DECK
 class Deck(Base):
@@ -18,17 +49,33 @@ class Deck(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     
-    # CHAVE ESTRANGEIRA PARA USUÁRIO (usuario_id)
-    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False, index=True)
+    # CHAVE ESTRANGEIRA PARA USUÁRIO (usuario_id); indexada por ix_decks_usuario_lista
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
     
     titulo = Column(String(255), nullable=False)
     descricao = Column(String(500), nullable=True)
     
     criado_em = Column(DateTime, default=datetime.utcnow)
+
+    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Incrementada quando o deck ou qualquer um dos seus flashcards muda (ETag)
+    versao = Column(Integer, nullable=False, default=1, server_default="1")
+    # Sequência do usuário na última alteração do deck ou de um dos seus cards
+    sequencia = Column(Integer, nullable=False, default=0, server_default="0")
     
     # RELACIONAMENTO: Um Deck pode ter muitos Flashcards
     # 'cascade' garante que, se o deck for deletado, os flashcards também sejam.
-    flashcards = relationship("Flashcard", back_populates="deck", cascade="all, delete-orphan")
+    # Quem apaga é o banco (ON DELETE CASCADE): com passive_deletes o ORM não
+    # carrega os cards do deck só para emitir um DELETE por card.
+    flashcards = relationship("Flashcard", back_populates="deck", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # GET /decks/ e /decks/summary: decks do usuário já na ordem de id
+        Index("ix_decks_usuario_lista", "usuario_id", "id"),
+        # GET /sync: decks alterados depois do cursor
+        Index("ix_decks_usuario_sequencia", "usuario_id", "sequencia"),
+    )
 
     def __repr__(self):
         return f"<Deck(id={self.id}, titulo='{self.titulo}', usuario_id={self.usuario_id})>"
@@ -39,15 +86,189 @@ class Flashcard(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     # CHAVE ESTRANGEIRA PARA DECK (deck_id)
-    deck_id = Column(Integer, ForeignKey("decks.id"), nullable=False, index=True)
+    deck_id = Column(Integer, ForeignKey("decks.id", ondelete="CASCADE"), nullable=False, index=True)
     
     pergunta = Column(String(500), nullable=False)
     resposta = Column(String(1000), nullable=False)
     
     criado_em = Column(DateTime, default=datetime.utcnow)
+    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Sequência do usuário na última alteração do card (GET /sync)
+    sequencia = Column(Integer, nullable=False, default=0, server_default="0")
     
     # RELACIONAMENTO: Um Flashcard pertence a um Deck
     deck = relationship("Deck", back_populates="flashcards")
 
+    # Estado de revisão do card (removido junto com o card, pelo banco)
+    progresso = relationship("Progresso", cascade="all, delete-orphan", passive_deletes=True)
+    # Histórico de respostas: mantido ao apagar o card (flashcard_id vira NULL, pelo banco)
+    revisoes = relationship("Revisao", passive_deletes=True)
+
+    __table_args__ = (
+        # GET /sync: cards alterados de um deck alterado
+        Index("ix_flashcards_deck_sequencia", "deck_id", "sequencia"),
+    )
+
+    def __repr__(self):
+        return f"<Flashcard(id={self.id}, deck_id={self.deck_id}, pergunta='{self.pergunta[:30]}...')>"
+
+
+# PROGRESSO (estado de revisão espaçada de cada card)
+class Progresso(Base):
+    __tablename__ = "progresso"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    flashcard_id = Column(Integer, ForeignKey("flashcards.id", ondelete="CASCADE"), nullable=False)
+    # Copiado do flashcard para filtrar a fila por deck sem JOIN
+    deck_id = Column(Integer, ForeignKey("decks.id", ondelete="CASCADE"), nullable=False)
+
+    ease = Column(Float, nullable=False, default=2.5)
+    interval_days = Column(Float, nullable=False, default=0)
+    repetitions = Column(Integer, nullable=False, default=0)
+    lapses = Column(Integer, nullable=False, default=0)
+
+    due_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_reviewed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("usuario_id", "flashcard_id", name="uq_progresso_usuario_flashcard"),
+        # Fila de revisão: range scan por (usuário, vencimento), com ou sem deck.
+        # O índice por deck também cobre o resumo dos decks (GET /decks/summary),
+        # que agrega contagem, vencidos e última revisão sem ler a tabela; `id`
+        # vem antes de last_reviewed_at para manter a ordem (due_at, id) da fila.
+        Index("ix_progresso_usuario_due", "usuario_id", "due_at"),
+        Index("ix_progresso_usuario_deck_resumo", "usuario_id", "deck_id", "due_at", "id", "last_reviewed_at"),
+        # ON DELETE CASCADE: o banco procura as linhas filhas de cada card/deck
+        # apagado por estas colunas (o MySQL já cria esses índices para as FKs;
+        # no SQLite, sem eles, cada card apagado varre a tabela inteira)
+        Index("ix_progresso_flashcard", "flashcard_id"),
+        Index("ix_progresso_deck", "deck_id"),
+    )
+
+    def __repr__(self):
+        return f"<Progresso(usuario_id={self.usuario_id}, flashcard_id={self.flashcard_id}, due_at={self.due_at})>"
+
+
+# REVISÕES (histórico de respostas; client_event_id evita duplicatas de reenvios)
+class Revisao(Base):
+    __tablename__ = "revisoes"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    flashcard_id = Column(Integer, ForeignKey("flashcards.id", ondelete="SET NULL"), nullable=True, index=True)
+
+    rating = Column(String(20), nullable=False)
+    answered_at = Column(DateTime, nullable=False)
+    client_event_id = Column(String(64), nullable=True)
+
+    criado_em = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("usuario_id", "client_event_id", name="uq_revisoes_usuario_evento"),
+        Index("ix_revisoes_usuario_answered", "usuario_id", "answered_at"),
+    )
+
+    def __repr__(self):
+        return f"<Revisao(usuario_id={self.usuario_id}, flashcard_id={self.flashcard_id}, rating='{self.rating}')>"
+
+
+# ESTATÍSTICAS (contadores mantidos incrementalmente nas mesmas transações
+# que criam/apagam decks e cards e registram revisões)
+class EstatisticaUsuario(Base):
+    __tablename__ = "estatisticas_usuario"
+
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), primary_key=True)
+
+    total_decks = Column(Integer, nullable=False, default=0)
+    total_cards = Column(Integer, nullable=False, default=0)
+    # cards existentes que já foram revisados ao menos uma vez
+    cards_studied = Column(Integer, nullable=False, default=0)
+
+    correct = Column(Integer, nullable=False, default=0)
+    needs_review = Column(Integer, nullable=False, default=0)
+    wrong = Column(Integer, nullable=False, default=0)
+
+    streak_days = Column(Integer, nullable=False, default=0)
+    last_study_day = Column(Date, nullable=True)
+
+    def __repr__(self):
+        return f"<EstatisticaUsuario(usuario_id={self.usuario_id}, total_cards={self.total_cards})>"
+
+
+# ATIVIDADE DIÁRIA (quantidade de revisões por usuário e dia, em UTC)
+class AtividadeDiaria(Base):
+    __tablename__ = "atividade_diaria"
+
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    reviews = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<AtividadeDiaria(usuario_id={self.usuario_id}, dia={self.dia}, reviews={self.reviews})>"
+
+
+# REMOÇÕES (tombstones para o GET /sync; as antigas são apagadas pelo
+# comando `python -m app.manage compact-tombstones`)
+class Remocao(Base):
+    __tablename__ = "remocoes"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    entidade = Column(String(20), nullable=False)  # "deck" ou "flashcard"
+    entidade_id = Column(Integer, nullable=False)
+    sequencia = Column(Integer, nullable=False)
+
+    removido_em = Column(DateTime, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        Index("ix_remocoes_usuario_sequencia", "usuario_id", "sequencia"),
+    )
+
+    def __repr__(self):
+        return f"<Remocao(usuario_id={self.usuario_id}, entidade='{self.entidade}', entidade_id={self.entidade_id})>"
+
+
+# TAREFAS EM SEGUNDO PLANO (fila de app/jobs.py; andamento em GET /jobs/{id})
+class Tarefa(Base):
+    __tablename__ = "tarefas"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    usuario_id = Column(Integer, ForeignKey("usuarios.id", ondelete="CASCADE"), nullable=False, index=True)
+    tipo = Column(String(50), nullable=False)
+    # "pendente", "executando", "concluida" ou "falhou"
+    status = Column(String(20), nullable=False, default="pendente", server_default="pendente")
+    # Maior primeiro; na mesma prioridade, a mais antiga
+    prioridade = Column(Integer, nullable=False, default=0, server_default="0")
+
+    parametros = Column(JSON, nullable=True)
+    resultado = Column(JSON, nullable=True)
+    erro = Column(String(1000), nullable=True)
+
+    # Andamento relatado pela tarefa (total NULL: desconhecido)
+    concluidos = Column(Integer, nullable=False, default=0, server_default="0")
+    total = Column(Integer, nullable=True)
+
+    tentativas = Column(Integer, nullable=False, default=0, server_default="0")
+    max_tentativas = Column(Integer, nullable=False, default=3, server_default="3")
+    # Não executar antes disto (novas tentativas esperam aqui)
+    executar_apos = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Prazo da reserva do worker que está executando
+    bloqueada_ate = Column(DateTime, nullable=True)
+
+    criado_em = Column(DateTime, default=datetime.utcnow)
+    iniciado_em = Column(DateTime, nullable=True)
+    finalizado_em = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Próxima tarefa: pendentes já liberadas
+        Index("ix_tarefas_fila", "status", "executar_apos"),
+    )
+
     def __repr__(self):
-        return f"<Flashcard(id={self.id}, deck_id={self.deck_id}, pergunta='{self.pergunta[:30]}...')>"
\ No newline at end of file
+        return f"<Tarefa(id={self.id}, tipo='{self.tipo}', status='{self.status}')>"
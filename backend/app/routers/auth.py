@@ -1,39 +1,47 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app import schemas, models
-from app.database import get_db
-from app.utils.security import hash_password, verify_password, create_access_token
-from app.dependencies import get_current_user # <--- IMPORTAÇÃO CRÍTICA
+from app import schemas, models, crud
+from app.database import get_session
+from app.utils.security import create_access_token
+from app.utils.hasher import password_hasher
+from app.dependencies import get_current_user, limit_auth_ip # <--- IMPORTAÇÃO CRÍTICA
+from app.utils.ratelimit import AUTH_EMAIL, rate_limiter
 
 # O router está prefixado com "/auth", então esta rota será acessível em /auth/...
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-@router.post("/register", response_model=schemas.UserOut)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+@router.post("/register", response_model=schemas.UserOut, dependencies=[Depends(limit_auth_ip)])
+async def register(user: schemas.UserCreate, db = Depends(get_session)):
     """Cria um novo utilizador e retorna as suas informações."""
-    existing = db.query(models.Usuario).filter(models.Usuario.email == user.email).first()
+    rate_limiter.hit(AUTH_EMAIL, user.email.lower())
+    existing = await db.run_sync(crud.email_exists, user.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email já cadastrado.")
-    
-    user_obj = models.Usuario(
-        nome=user.nome,
-        email=user.email,
-        # A senha é hasheada antes de ser salva
-        senha=hash_password(user.senha)
-    )
-    db.add(user_obj)
-    db.commit()
-    db.refresh(user_obj)
+
+    # A senha é hasheada antes de ser salva (no pool dedicado: bcrypt é lento)
+    senha_hash = await password_hasher.hash(user.senha)
+
+    user_obj = await db.run_sync(crud.create_user, user.nome, user.email, senha_hash)
+    if user_obj is None:
+        raise HTTPException(status_code=400, detail="Email já cadastrado.")
     return user_obj
 
-@router.post("/login", response_model=schemas.Token)
-def login(req: schemas.LoginRequest, db: Session = Depends(get_db)):
+@router.post("/login", response_model=schemas.Token, dependencies=[Depends(limit_auth_ip)])
+async def login(req: schemas.LoginRequest, db = Depends(get_session)):
     """Autentica o utilizador e retorna um token de acesso."""
-    user = db.query(models.Usuario).filter(models.Usuario.email == req.email).first()
-    
-    if not user or not verify_password(req.senha, user.senha):
+    rate_limiter.hit(AUTH_EMAIL, req.email.lower())
+    user = await db.run_sync(crud.get_login_credentials, req.email)
+
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciais inválidas")
-        
+
+    valid, new_hash = await password_hasher.verify_and_update(req.senha, user.senha)
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciais inválidas")
+
+    # Hash com custo antigo: regrava com o custo atual
+    if new_hash:
+        await db.run_sync(crud.update_password_hash, user.id, new_hash)
+
     # Usa o ID do utilizador (ID) como 'subject' (sub) no token
     token = create_access_token({"sub": str(user.id)})
     return {"access_token": token, "token_type": "bearer"}
@@ -42,12 +50,11 @@ def login(req: schemas.LoginRequest, db: Session = Depends(get_db)):
 # --- NOVO ENDPOINT /users/me ---
 
 @router.get("/users/me", response_model=schemas.UserOut)
-def read_users_me(current_user: models.Usuario = Depends(get_current_user)):
+async def read_users_me(current_user: models.Usuario = Depends(get_current_user)):
     """
     Obtém informações sobre o utilizador autenticado a partir do token.
     A dependência get_current_user já validou o token e buscou o utilizador.
     """
-    # O objeto retornado (current_user) é do tipo models.Usuario, 
-    # e o FastAPI o serializa usando o esquema schemas.UserOut,
-    # que inclui o campo 'nome'.
-    return current_user
\ No newline at end of file
+    # O objeto retornado (current_user) é um Principal com id, nome, email e criado_em,
+    # e o FastAPI o serializa usando o esquema schemas.UserOut.
+    return current_user
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import tempfile
+from datetime import datetime
 
-from app.schemas import DeckCreate, DeckOut, DeckUpdate, DeckFullOut
-from app.models import Deck, Usuario
-from app.database import get_db
-from app.dependencies import get_current_user
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from typing import List, Literal, Optional, Union
+
+from app.config import MAX_IMPORT_BYTES
+from app.importers import ImportFormatError, ImportTooLargeError, detect_format, read_rows
+from app.schemas import BulkDeleteOut, DeckBulkDelete, DeckCreate, DeckOut, DeckUpdate, DeckFullOut, DeckImportOut, DeckPage, DeckSummaryOut, JobOut
+from app.models import Usuario
+from app.database import get_session
+from app.dependencies import get_current_user, get_read_session, PageParams
+from app import crud, jobs
+from app.utils.etag import etag_matches, make_etag, not_modified, set_etag
+from app.utils.fast_json import json_response
 
 router = APIRouter(
     prefix="/decks",
@@ -15,96 +22,231 @@ router = APIRouter(
 # =========================================================================================
 # CRIAÇÃO
 # =========================================================================================
-@router.post("/", response_model=DeckOut, status_code=status.HTTP_201_CREATED)
-def create_deck(
+@router.post("/", response_model=DeckFullOut, status_code=status.HTTP_201_CREATED)
+async def create_deck(
     deck: DeckCreate,
-    db: Session = Depends(get_db),
+    db = Depends(get_session),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Cria um novo deck e associa ao usuário autenticado."""
-    
-    new_deck = Deck(
-        **deck.model_dump(),
-        usuario_id=current_user.id
+    """
+    Cria um novo deck e associa ao usuário autenticado.
+    Se `flashcards` for enviado, os cards são inseridos em lote na mesma transação.
+    """
+
+    return await db.run_sync(
+        crud.create_deck,
+        current_user.id,
+        deck.model_dump(exclude={"flashcards"}),
+        [card.model_dump() for card in deck.flashcards or []]
     )
-    
-    db.add(new_deck)
-    db.commit()
-    db.refresh(new_deck)
-    
-    return new_deck
+
+
+# =========================================================================================
+# IMPORTAÇÃO (CSV/TSV E ANKI)
+# =========================================================================================
+# Até este tamanho o upload fica em memória; acima, vai para um arquivo temporário
+IMPORT_SPOOL_BYTES = 1024 * 1024
+
+
+async def _spool_body(request: Request, file=None):
+    """
+    Copia o corpo da requisição, em blocos, para `file` (por padrão um
+    arquivo temporário) e o retorna posicionado no início.
+    """
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Arquivo maior que {MAX_IMPORT_BYTES // (1024 * 1024)} MiB."
+    )
+    if int(request.headers.get("content-length") or 0) > MAX_IMPORT_BYTES:
+        raise too_large
+
+    if file is None:
+        file = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_IMPORT_BYTES:
+            file.close()
+            raise too_large
+        file.write(chunk)
+    file.seek(0)
+    return file
+
+
+async def _enqueue_import(request: Request, db, user_id: int, declared_format: Optional[str], deck_id, deck_data: dict):
+    # O arquivo fica em JOB_FILES_DIR até a tarefa terminar (ela o apaga)
+    file = jobs.new_upload_file()
+    try:
+        await _spool_body(request, file)
+        file_format = detect_format(file, declared_format)
+    except BaseException:
+        file.close()
+        jobs.remove_file(file.name)
+        raise
+    file.close()
+
+    try:
+        return await db.run_sync(jobs.enqueue, user_id, "import_deck", {
+            "path": file.name,
+            "file_format": file_format,
+            "deck_id": deck_id,
+            "deck_data": deck_data,
+        })
+    except BaseException:
+        jobs.remove_file(file.name)
+        raise
+
+
+@router.post(
+    "/import",
+    response_model=DeckImportOut,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobOut, "description": "Com background=true"}},
+)
+async def import_deck(
+    request: Request,
+    deck_id: Optional[int] = Query(None, description="Deck existente; sem ele um deck novo é criado"),
+    titulo: str = Query("Deck importado", max_length=255, description="Título do deck novo"),
+    descricao: Optional[str] = Query(None, max_length=500),
+    format: Optional[Literal["csv", "tsv", "apkg"]] = Query(None, description="Detectado pelo conteúdo se omitido"),
+    background: bool = Query(False, description="Responde 202 com uma tarefa (GET /jobs/{id}) em vez de esperar"),
+    db = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Importa flashcards de um arquivo enviado como corpo da requisição
+    (CSV/TSV com pergunta e resposta, ou pacote .apkg do Anki).
+    Linhas inválidas não interrompem a importação: voltam em `errors`
+    (até 100, com o número da linha) e são contadas em `failed`.
+    Com `background=true` a importação vira uma tarefa e o mesmo resultado
+    aparece em `resultado` ao consultá-la.
+    """
+    deck_data = {"titulo": titulo, "descricao": descricao}
+    if background:
+        return jobs.accepted(await _enqueue_import(request, db, current_user.id, format, deck_id, deck_data))
+
+    file = await _spool_body(request)
+    try:
+        rows = read_rows(file, detect_format(file, format))
+        return await db.run_sync(
+            crud.import_flashcards,
+            current_user.id,
+            rows,
+            deck_id,
+            deck_data,
+        )
+    except ImportTooLargeError as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc))
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    finally:
+        file.close()
 
 
 # =========================================================================================
 # LISTAR TODOS OS DECKS DO USUÁRIO
 # =========================================================================================
-@router.get("/", response_model=List[DeckOut])
-def read_all_decks(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=Union[List[DeckOut], DeckPage], response_model_exclude_unset=True)
+async def read_all_decks(
+    response: Response,
+    page: PageParams = Depends(),
+    if_none_match: Optional[str] = Header(None),
+    db = Depends(get_read_session),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Retorna todos os decks criados pelo usuário autenticado."""
-    
-    decks = db.query(Deck).filter(Deck.usuario_id == current_user.id).all()
-    return decks
+    """
+    Retorna os decks criados pelo usuário autenticado.
+    Com `limit`/`cursor`/`fields` responde paginado ({items, next_cursor});
+    sem eles, a lista completa.
+    Responde 304 se o `If-None-Match` ainda corresponder à versão da biblioteca.
+    """
+
+    version = await db.run_sync(crud.get_library_version, current_user.id)
+    etag = make_etag("decks", current_user.id, version, page.enabled, page.limit, page.cursor, page.fields)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    if page.enabled:
+        return await db.run_sync(crud.list_decks_page, current_user.id, page.limit, page.cursor, page.fields)
+
+    return json_response(await db.run_sync(crud.list_decks, current_user.id), etag)
+
+
+# =========================================================================================
+# RESUMO DOS DECKS (TELA INICIAL)
+# =========================================================================================
+@router.get("/summary", response_model=List[DeckSummaryOut])
+async def read_deck_summaries(
+    db = Depends(get_read_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Retorna os decks do usuário com `card_count`, `due_count` (cards vencidos
+    agora) e `last_studied_at`, calculados numa única consulta agrupada.
+    """
+
+    return await db.run_sync(crud.list_deck_summaries, current_user.id, datetime.utcnow())
 
 
 # =========================================================================================
 # LER UM DECK ESPECÍFICO
 # =========================================================================================
 @router.get("/{deck_id}", response_model=DeckFullOut)
-def read_deck(
+async def read_deck(
     deck_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db = Depends(get_read_session),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Retorna um deck específico garantindo que pertença ao usuário."""
-    
-    deck = db.query(Deck).filter(
-        Deck.id == deck_id,
-        Deck.usuario_id == current_user.id
-    ).first()
-    
+    """
+    Retorna um deck específico garantindo que pertença ao usuário.
+    Responde 304 se o `If-None-Match` ainda corresponder à versão do deck.
+    """
+
+    version = await db.run_sync(crud.get_deck_version, deck_id, current_user.id)
+    deck = None
+    if version is not None:
+        etag = make_etag("deck", current_user.id, deck_id, *version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        deck = await db.run_sync(crud.read_deck, deck_id, current_user.id)
+
     if not deck:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Deck não encontrado ou você não tem permissão para acessá-lo."
         )
-        
-    return deck
+
+    return json_response(deck, etag)
 
 
 # =========================================================================================
 # ATUALIZAÇÃO
 # =========================================================================================
 @router.put("/{deck_id}", response_model=DeckOut)
-def update_deck(
+async def update_deck(
     deck_id: int,
     deck_update: DeckUpdate,
-    db: Session = Depends(get_db),
+    db = Depends(get_session),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Atualiza um deck garantindo que pertença ao usuário."""
-    
-    deck = db.query(Deck).filter(
-        Deck.id == deck_id,
-        Deck.usuario_id == current_user.id
-    ).first()
-    
+
+    deck = await db.run_sync(
+        crud.update_deck,
+        deck_id,
+        current_user.id,
+        deck_update.model_dump(exclude_unset=True)
+    )
+
     if not deck:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Deck não encontrado ou você não tem permissão para editá-lo."
         )
 
-    update_data = deck_update.model_dump(exclude_unset=True)
-    
-    for key, value in update_data.items():
-        setattr(deck, key, value)
-    
-    db.commit()
-    db.refresh(deck)
-    
     return deck
 
 
@@ -112,24 +254,47 @@ def update_deck(
 # DELEÇÃO
 # =========================================================================================
 @router.delete("/{deck_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_deck(
+async def delete_deck(
     deck_id: int,
-    db: Session = Depends(get_db),
+    db = Depends(get_session),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Deleta um deck garantindo que pertença ao usuário."""
-    
-    deck = db.query(Deck).filter(
-        Deck.id == deck_id,
-        Deck.usuario_id == current_user.id
-    ).first()
-    
-    if not deck:
+
+    deleted = await db.run_sync(crud.delete_deck, deck_id, current_user.id)
+
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Deck não encontrado ou você não tem permissão para deletá-lo."
         )
 
-    db.delete(deck)
-    db.commit()
     return None
+
+
+# =========================================================================================
+# DELEÇÃO EM LOTE
+# =========================================================================================
+@router.post(
+    "/bulk-delete",
+    response_model=BulkDeleteOut,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobOut, "description": "Com background=true"}},
+)
+async def delete_decks_bulk(
+    payload: DeckBulkDelete,
+    background: bool = Query(False, description="Responde 202 com uma tarefa (GET /jobs/{id}) em vez de esperar"),
+    db = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Deleta vários decks (com os seus flashcards) numa única transação.
+    Ids que não existem ou não pertencem ao usuário voltam em `not_found`.
+    Com `background=true` a deleção vira uma tarefa (para decks muito
+    grandes) e o mesmo resultado aparece em `resultado` ao consultá-la.
+    """
+
+    if background:
+        return jobs.accepted(await db.run_sync(jobs.enqueue, current_user.id, "delete_decks", {"deck_ids": payload.ids}))
+
+    deleted = await db.run_sync(crud.delete_decks, current_user.id, payload.ids)
+    return {"deleted": deleted, "not_found": sorted(set(payload.ids) - set(deleted))}
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from typing import List, Optional, Union
 
 # Importações necessárias (ajuste as importações de acordo com a localização real dos seus arquivos)
-from app.schemas import FlashcardCreate, FlashcardOut, FlashcardUpdate, UserOut
-from app.models import Flashcard, Deck
-from app.database import get_db
-from app.dependencies import get_current_user 
+from app.schemas import MAX_FLASHCARDS_POR_LOTE, BulkDeleteOut, FlashcardCreate, FlashcardOut, FlashcardUpdate, UserOut, FlashcardBulkCreate, FlashcardBulkOut, FlashcardPage, FlashcardSearchPage
+from app.database import get_session
+from app.dependencies import get_current_user, get_read_session, PageParams
+from app import crud
+from app.utils.etag import etag_matches, make_etag, not_modified, set_etag
+from app.utils.fast_json import json_response
+from app.utils.pagination import MAX_PAGE_SIZE
 
 router = APIRouter(
     prefix="/flashcards",
@@ -14,147 +16,201 @@ router = APIRouter(
     dependencies=[Depends(get_current_user)] # Protege todas as rotas
 )
 
-# Função auxiliar para verificar a propriedade do Deck
-def check_deck_ownership(db: Session, deck_id: int, user_id: int):
-    """Verifica se o Deck existe e pertence ao usuário logado."""
-    deck = db.query(Deck).filter(
-        Deck.id == deck_id, 
-        Deck.usuario_id == user_id
-    ).first()
-    if not deck:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Deck não encontrado ou não pertence ao usuário."
-        )
-    return deck
-
 # CRIAÇÃO
 @router.post("/", response_model=FlashcardOut, status_code=status.HTTP_201_CREATED)
-def create_flashcard(
-    flashcard: FlashcardCreate, 
-    db: Session = Depends(get_db),
+async def create_flashcard(
+    flashcard: FlashcardCreate,
+    db = Depends(get_session),
     current_user: UserOut = Depends(get_current_user)
 ):
     """Cria um novo flashcard, garantindo que o deck pertença ao usuário."""
-    
-    # CRÍTICO: Verifica se o deck_id fornecido pertence ao usuário logado
-    check_deck_ownership(db, flashcard.deck_id, current_user.id)
-    
-    new_flashcard = Flashcard(**flashcard.model_dump())
-    
-    db.add(new_flashcard)
-    db.commit()
-    db.refresh(new_flashcard)
-    
-    return new_flashcard
+
+    return await db.run_sync(crud.create_flashcard, current_user.id, flashcard.model_dump())
+
+# CRIAÇÃO EM LOTE
+@router.post("/bulk", response_model=FlashcardBulkOut, status_code=status.HTTP_201_CREATED)
+async def create_flashcards_bulk(
+    payload: FlashcardBulkCreate,
+    response: Response,
+    db = Depends(get_session),
+    current_user: UserOut = Depends(get_current_user)
+):
+    """
+    Cria vários flashcards numa única transação.
+    A propriedade dos decks é verificada com uma só consulta; itens cujo deck
+    não pertence ao usuário são reportados em `errors` pelo índice no lote.
+    Responde 201 se todos foram criados, 207 se só parte e 422 se nenhum.
+    """
+
+    created, errors = await db.run_sync(
+        crud.create_flashcards_bulk,
+        current_user.id,
+        [card.model_dump() for card in payload.flashcards]
+    )
+
+    if errors:
+        response.status_code = status.HTTP_207_MULTI_STATUS if created else status.HTTP_422_UNPROCESSABLE_ENTITY
+    return {"created": created, "errors": errors}
 
 # LEITURA DE TODOS (Apenas flashcards em decks do usuário)
-@router.get("/all", response_model=List[FlashcardOut])
-def read_all_flashcards(
-    db: Session = Depends(get_db),
+@router.get("/all", response_model=Union[List[FlashcardOut], FlashcardPage], response_model_exclude_unset=True)
+async def read_all_flashcards(
+    page: PageParams = Depends(),
+    db = Depends(get_read_session),
     current_user: UserOut = Depends(get_current_user)
 ):
-    """Retorna todos os flashcards associados a decks que pertencem ao usuário autenticado."""
-    
-    # Faz um JOIN de Flashcard com Deck e filtra pelo usuario_id do Deck
-    flashcards = db.query(Flashcard).join(Deck).filter(
-        Deck.usuario_id == current_user.id
-    ).all()
-    
-    return flashcards
+    """
+    Retorna os flashcards associados a decks que pertencem ao usuário autenticado.
+    Com `limit`/`cursor`/`fields` responde paginado; sem eles, a lista completa.
+    """
+
+    if page.enabled:
+        return await db.run_sync(crud.list_user_flashcards_page, current_user.id, page.limit, page.cursor, page.fields)
+
+    return json_response(await db.run_sync(crud.list_user_flashcards, current_user.id))
 
 # LEITURA DE FLASHCARDS POR DECK ID
-@router.get("/deck/{deck_id}", response_model=List[FlashcardOut])
-def read_flashcards_by_deck(
+@router.get("/deck/{deck_id}", response_model=Union[List[FlashcardOut], FlashcardPage], response_model_exclude_unset=True)
+async def read_flashcards_by_deck(
     deck_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(),
+    if_none_match: Optional[str] = Header(None),
+    db = Depends(get_read_session),
     current_user: UserOut = Depends(get_current_user)
 ):
-    """Retorna todos os flashcards de um deck específico, garantindo a propriedade."""
+    """
+    Retorna os flashcards de um deck específico, garantindo a propriedade.
+    Com `limit`/`cursor`/`fields` responde paginado; sem eles, a lista completa.
+    Responde 304 se o `If-None-Match` ainda corresponder à versão do deck.
+    """
 
-    # Verifica a propriedade do deck 
-    check_deck_ownership(db, deck_id, current_user.id)
+    version = await db.run_sync(crud.get_deck_version, deck_id, current_user.id)
+    etag = None
+    if version is not None:
+        etag = make_etag("deck-flashcards", current_user.id, deck_id, *version, page.enabled, page.limit, page.cursor, page.fields)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+    # Deck inexistente ou de outro usuário: as funções abaixo respondem 404
+
+    if page.enabled:
+        return await db.run_sync(
+            crud.list_deck_flashcards_page, deck_id, current_user.id, page.limit, page.cursor, page.fields
+        )
+
+    return json_response(await db.run_sync(crud.list_deck_flashcards, deck_id, current_user.id), etag)
+
+
+# BUSCA TEXTUAL
+@router.get("/search", response_model=FlashcardSearchPage)
+async def search_flashcards(
+    q: str = Query(..., min_length=1, max_length=200, description="Texto buscado na pergunta e na resposta"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Valor de next_cursor da página anterior"),
+    db = Depends(get_read_session),
+    current_user: UserOut = Depends(get_current_user)
+):
+    """
+    Busca nos flashcards dos decks do usuário, do mais para o menos relevante.
+    Ignora acentos e trata a última palavra como prefixo ("fotoss" encontra
+    "fotossíntese"); palavras curtas demais para o índice são buscadas com LIKE.
+    """
 
-    # Consulta os flashcards que pertencem a esse deck
-    flashcards = db.query(Flashcard).filter(Flashcard.deck_id == deck_id).all()
-    
-    return flashcards
+    return await db.run_sync(crud.search_flashcards, current_user.id, q, limit, cursor)
 
 
 # LEITURA DE UM ESPECÍFICO
 @router.get("/{flashcard_id}", response_model=FlashcardOut)
-def read_flashcard(
+async def read_flashcard(
     flashcard_id: int,
-    db: Session = Depends(get_db),
+    db = Depends(get_read_session),
     current_user: UserOut = Depends(get_current_user)
 ):
     """Retorna um flashcard específico, verificando se o deck pertence ao usuário."""
-    
-    # Junta Flashcard com Deck para verificar a propriedade
-    flashcard = db.query(Flashcard).join(Deck).filter(
-        Flashcard.id == flashcard_id,
-        Deck.usuario_id == current_user.id
-    ).first()
-    
+
+    flashcard = await db.run_sync(crud.read_flashcard, flashcard_id, current_user.id)
+
     if not flashcard:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Flashcard não encontrado ou você não tem permissão para acessá-lo."
         )
-        
+
     return flashcard
 
 # ATUALIZAÇÃO
 @router.put("/{flashcard_id}", response_model=FlashcardOut)
-def update_flashcard(
+async def update_flashcard(
     flashcard_id: int,
     flashcard_update: FlashcardUpdate,
-    db: Session = Depends(get_db),
+    db = Depends(get_session),
     current_user: UserOut = Depends(get_current_user)
 ):
     """Atualiza um flashcard existente, garantindo que o deck pertença ao usuário."""
-    
-    flashcard = db.query(Flashcard).join(Deck).filter(
-        Flashcard.id == flashcard_id,
-        Deck.usuario_id == current_user.id
-    ).first()
-    
+
+    flashcard = await db.run_sync(
+        crud.update_flashcard,
+        flashcard_id,
+        current_user.id,
+        flashcard_update.model_dump(exclude_unset=True)
+    )
+
     if not flashcard:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Flashcard não encontrado ou você não tem permissão para editá-lo."
         )
 
-    update_data = flashcard_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(flashcard, key, value)
-    
-    db.commit()
-    db.refresh(flashcard)
-    
     return flashcard
 
 # DELEÇÃO
 @router.delete("/{flashcard_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_flashcard(
+async def delete_flashcard(
     flashcard_id: int,
-    db: Session = Depends(get_db),
+    db = Depends(get_session),
     current_user: UserOut = Depends(get_current_user)
 ):
     """Deleta um flashcard, garantindo que o deck pertença ao usuário."""
-    
-    flashcard = db.query(Flashcard).join(Deck).filter(
-        Flashcard.id == flashcard_id,
-        Deck.usuario_id == current_user.id
-    ).first()
-    
-    if not flashcard:
+
+    deleted = await db.run_sync(crud.delete_flashcard, flashcard_id, current_user.id)
+
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Flashcard não encontrado ou você não tem permissão para deletá-lo."
         )
 
-    db.delete(flashcard)
-    db.commit()
-    
-    return None
\ No newline at end of file
+    return None
+
+# DELEÇÃO EM LOTE
+def parse_ids(values: List[str]) -> List[int]:
+    """`?ids=1,2,3` (ou `?ids=1&ids=2`) -> [1, 2, 3]."""
+    try:
+        ids = [int(part) for value in values for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="`ids` deve ser uma lista de inteiros separados por vírgula."
+        )
+    if not ids or len(ids) > MAX_FLASHCARDS_POR_LOTE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Informe de 1 a {MAX_FLASHCARDS_POR_LOTE} ids."
+        )
+    return ids
+
+@router.delete("", response_model=BulkDeleteOut)
+async def delete_flashcards_bulk(
+    ids: List[str] = Query(..., description="ids dos flashcards, separados por vírgula"),
+    db = Depends(get_session),
+    current_user: UserOut = Depends(get_current_user)
+):
+    """
+    Deleta vários flashcards numa única transação.
+    Ids que não existem ou estão em decks de outro usuário voltam em `not_found`.
+    """
+
+    requested = parse_ids(ids)
+    deleted = await db.run_sync(crud.delete_flashcards, current_user.id, requested)
+    return {"deleted": deleted, "not_found": sorted(set(requested) - set(deleted))}
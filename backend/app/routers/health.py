@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.warmup import state
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"],
+)
+
+
+# =========================================================================================
+# LIVENESS: O PROCESSO ESTÁ RESPONDENDO (NUNCA CONSULTA O BANCO)
+# =========================================================================================
+@router.get("/live")
+async def live():
+    return {"status": "ok"}
+
+
+# =========================================================================================
+# READINESS: AQUECIDO, NÃO ESTÁ DESLIGANDO E O BANCO RESPONDE (VERIFICAÇÃO EM CACHE)
+# =========================================================================================
+@router.get("/ready")
+async def ready():
+    if state.shutting_down:
+        return JSONResponse(status_code=503, content={"status": "shutting_down"})
+    if not state.warmed_up:
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    if not await state.database_ok():
+        return JSONResponse(status_code=503, content={"status": "database_unavailable"})
+    return {"status": "ready"}
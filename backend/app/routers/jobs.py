@@ -0,0 +1,74 @@
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app import jobs
+from app.database import get_session
+from app.dependencies import get_current_user
+from app.models import Usuario
+from app.schemas import JobOut
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["Tarefas"],
+)
+
+
+async def _owned_job(job_id: int, db, current_user: Usuario) -> JobOut:
+    # No primário: o status muda sem escrita do usuário, a réplica pode estar atrasada
+    job = await db.run_sync(jobs.read_job, job_id, current_user.id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tarefa não encontrada ou você não tem permissão para acessá-la."
+        )
+    return job
+
+
+# =========================================================================================
+# ANDAMENTO DE UMA TAREFA
+# =========================================================================================
+@router.get("/{job_id}", response_model=JobOut)
+async def read_job(
+    job_id: int,
+    db = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Status (`pendente`, `executando`, `concluida`, `falhou`), andamento
+    (`concluidos` de `total`, que pode ser nulo) e, ao terminar, `resultado` ou `erro`.
+    Uma tarefa com falha temporária volta a `pendente` até `executar_apos`.
+    """
+
+    return await _owned_job(job_id, db, current_user)
+
+
+# =========================================================================================
+# ARQUIVO GERADO (EXPORTAÇÃO)
+# =========================================================================================
+@router.get("/{job_id}/file")
+async def download_job_file(
+    job_id: int,
+    db = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Baixa o arquivo de uma exportação concluída."""
+
+    job = await _owned_job(job_id, db, current_user)
+    if job.tipo != "export_library" or job.status != jobs.SUCCEEDED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A tarefa não tem arquivo para baixar (ainda não concluída ou não é uma exportação)."
+        )
+
+    compress = job.resultado["compress"]
+    path = jobs.export_path(job.id, compress)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Arquivo expirado.")
+
+    return FileResponse(
+        path,
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        filename="estudeai-export.ndjson" + (".gz" if compress else ""),
+    )
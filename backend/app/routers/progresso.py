@@ -1,44 +1,29 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from app.database import get_db
-from app.dependencies import get_current_user
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, status
+from app import crud, jobs
+from app.database import get_session
+from app.dependencies import get_current_user, get_read_session
+from app.schemas import JobOut, UserStatsOut
 
 router = APIRouter(
     prefix="/users",
     tags=["progresso"]
 )
 
-@router.get("/stats")
-def get_user_stats(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    return {
-        "total_decks": db.execute(
-            text("""
-                SELECT COUNT(*) 
-                FROM decks 
-                WHERE usuario_id = :id
-            """),
-            {"id": current_user.id}
-        ).scalar(),
+@router.get("/stats", response_model=UserStatsOut)
+async def get_user_stats(db = Depends(get_read_session), current_user=Depends(get_current_user)):
+    """
+    Contadores do usuário, atividade dos últimos 7 dias (UTC) e sequência de dias estudados.
+    Os valores são mantidos a cada escrita; aqui é só uma leitura por chave primária.
+    """
+    return await db.run_sync(crud.get_user_stats, current_user.id, datetime.utcnow().date())
 
-        # flashcards do usuário via DECK
-        "total_cards": db.execute(
-            text("""
-                SELECT COUNT(*)
-                FROM flashcards f
-                JOIN decks d ON f.deck_id = d.id
-                WHERE d.usuario_id = :id
-            """),
-            {"id": current_user.id}
-        ).scalar(),
 
-        # progresso do usuário permanece o mesmo
-        "total_cards_studied": db.execute(
-            text("""
-                SELECT COUNT(*) 
-                FROM progresso 
-                WHERE usuario_id = :id
-            """),
-            {"id": current_user.id}
-        ).scalar(),
-    }
+@router.post("/stats/recount", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED)
+async def recount_user_stats(db = Depends(get_session), current_user=Depends(get_current_user)):
+    """
+    Agenda o recálculo dos contadores a partir das tabelas de origem
+    (corrige divergências dos incrementais). Acompanhe em GET /jobs/{id}.
+    """
+    return jobs.accepted(await db.run_sync(jobs.enqueue, current_user.id, "recount_stats"))
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+
+from app import crud
+from app.database import get_session
+from app.dependencies import get_current_user
+from app.models import Usuario
+from app.schemas import ReviewBatch, ReviewBatchOut
+from app.utils.security import read_study_session_token
+
+router = APIRouter(
+    prefix="/reviews",
+    tags=["Estudo"],
+)
+
+
+# =========================================================================================
+# ENVIO EM LOTE (SESSÕES OFFLINE)
+# =========================================================================================
+@router.post("/batch", response_model=ReviewBatchOut)
+async def submit_reviews_batch(
+    batch: ReviewBatch,
+    db = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Recebe várias respostas de estudo de uma vez.
+    Eventos com `client_event_id` já recebido são ignorados, então o app
+    pode reenviar o mesmo lote com segurança após uma falha de rede.
+    `session` (de GET /study/session) é opcional; inválido ou expirado, é ignorado.
+    """
+
+    session_deck_id = read_study_session_token(batch.session, current_user.id) if batch.session else None
+    try:
+        return await db.run_sync(
+            crud.record_reviews_batch,
+            current_user.id,
+            [event.model_dump() for event in batch.events],
+            session_deck_id
+        )
+    except IntegrityError:
+        # O crud já refaz a transação uma vez; só chega aqui se o conflito se repetir
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Lote enviado em paralelo por outra requisição. Tente novamente."
+        )
@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+
+from app import crud
+from app.database import get_session
+from app.dependencies import get_current_user, get_read_session
+from app.models import Usuario
+from app.schemas import MAX_CARDS_POR_SESSAO, DueCardOut, ReviewCreate, ReviewOut, StudySessionOut
+from app.utils import fast_json
+from app.utils.security import create_study_session_token
+
+router = APIRouter(
+    prefix="/study",
+    tags=["Estudo"],
+)
+
+
+# =========================================================================================
+# FILA DE CARDS VENCIDOS
+# =========================================================================================
+@router.get("/due", response_model=List[DueCardOut])
+async def read_due_cards(
+    deck_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=200),
+    db = Depends(get_read_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Retorna os próximos cards a revisar (vencidos), na ordem de vencimento."""
+
+    return await db.run_sync(crud.list_due_cards, current_user.id, deck_id, limit, datetime.utcnow())
+
+
+# =========================================================================================
+# SESSÃO DE ESTUDO: DECK + CARDS + TOKEN NUMA ÚNICA REQUISIÇÃO
+# =========================================================================================
+@router.get("/session/{deck_id}", response_model=StudySessionOut)
+async def read_study_session(
+    deck_id: int,
+    request: Request,
+    limit: int = Query(100, ge=1, le=MAX_CARDS_POR_SESSAO),
+    db = Depends(get_read_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Abre uma sessão de estudo: dados do deck com os totais, até `limit` cards
+    na ordem de estudo (vencidos primeiro) e o token `session`, a ser enviado
+    com as respostas em POST /reviews/batch. Comprimido com gzip quando grande.
+    """
+
+    session = await db.run_sync(crud.read_study_session, deck_id, current_user.id, limit, datetime.utcnow())
+
+    if session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Deck não encontrado ou você não tem permissão para acessá-lo."
+        )
+
+    session["session"] = create_study_session_token(current_user.id, deck_id)
+    return fast_json.gzip_json_response(request, fast_json.study_session.dump_json(session))
+
+
+# =========================================================================================
+# REGISTRAR UMA RESPOSTA
+# =========================================================================================
+@router.post("/review", response_model=ReviewOut)
+async def review_card(
+    review: ReviewCreate,
+    db = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Aplica a resposta ao agendamento do card e retorna o novo vencimento."""
+
+    result = await db.run_sync(
+        crud.record_review,
+        current_user.id,
+        review.flashcard_id,
+        review.rating,
+        review.answered_at or datetime.utcnow()
+    )
+
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Flashcard não encontrado ou você não tem permissão para acessá-lo."
+        )
+
+    return result
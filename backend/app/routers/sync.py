@@ -0,0 +1,34 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app import crud
+from app.dependencies import get_current_user, get_read_session
+from app.models import Usuario
+from app.schemas import SyncOut
+
+router = APIRouter(
+    prefix="/sync",
+    tags=["Sincronização"],
+)
+
+
+# =========================================================================================
+# ALTERAÇÕES DESDE O ÚLTIMO CURSOR
+# =========================================================================================
+@router.get("", response_model=SyncOut)
+async def read_changes(
+    since: Optional[int] = Query(None, ge=0, description="Valor de `cursor` da sincronização anterior"),
+    db = Depends(get_read_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Retorna o que mudou na biblioteca desde `since`: decks e flashcards
+    criados ou alterados e os ids apagados em `deleted`.
+    Sem `since`, ou se o cursor for antigo demais, devolve tudo com `full=true`.
+    O cliente aplica primeiro as remoções e depois os upserts. Cards de um
+    deck apagado não aparecem em `deleted.flashcards`; devem ser removidos
+    junto com o deck.
+    """
+
+    return await db.run_sync(crud.get_changes, current_user.id, since)
@@ -1,17 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
+from typing import Optional
 
-from app.schemas import UserCreate, UserOut, LoginRequest, Token
+from app import crud, jobs
+from app.schemas import JobOut, UserCreate, UserOut, LoginRequest, Token
 from app.models import Usuario
-from app.database import get_db
-from app.dependencies import get_current_user
-from app.utils.security import (
-    verify_password,
-    get_password_hash,
-    create_access_token
-)
+from app import database
+from app.database import get_session
+from app.dependencies import get_current_user, limit_auth_ip
+from app.utils.security import create_access_token
+from app.utils.hasher import password_hasher
+from app.utils.ratelimit import AUTH_EMAIL, rate_limiter
+from app.utils.export import ndjson_chunks, gzip_chunks
 
 router = APIRouter(
     prefix="/users",
@@ -22,27 +24,26 @@ router = APIRouter(
 # =========================
 #   REGISTAR USUÁRIO
 # =========================
-@router.post("/", response_model=UserOut, status_code=201)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
+@router.post("/", response_model=UserOut, status_code=201, dependencies=[Depends(limit_auth_ip)])
+async def register_user(user: UserCreate, db = Depends(get_session)):
+    rate_limiter.hit(AUTH_EMAIL, user.email.lower())
 
     # Verifica se email já existe
-    existe = db.query(Usuario).filter(Usuario.email == user.email).first()
+    existe = await db.run_sync(crud.email_exists, user.email)
     if existe:
         raise HTTPException(
             status_code=400,
             detail="O email já está registado."
         )
 
-    # Cria usuário com hash de senha
-    novo = Usuario(
-        nome=user.nome,
-        email=user.email,
-        senha=get_password_hash(user.senha)
-    )
-
-    db.add(novo)
-    db.commit()
-    db.refresh(novo)
+    # Cria usuário com hash de senha (no pool dedicado: bcrypt é lento)
+    senha_hash = await password_hasher.hash(user.senha)
+    novo = await db.run_sync(crud.create_user, user.nome, user.email, senha_hash)
+    if novo is None:
+        raise HTTPException(
+            status_code=400,
+            detail="O email já está registado."
+        )
 
     return novo
 
@@ -50,17 +51,23 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
 # =========================
 #   LOGIN / GERAR TOKEN
 # =========================
-@router.post("/login", response_model=Token)
-def login(form: LoginRequest, db: Session = Depends(get_db)):
+@router.post("/login", response_model=Token, dependencies=[Depends(limit_auth_ip)])
+async def login(form: LoginRequest, db = Depends(get_session)):
+    rate_limiter.hit(AUTH_EMAIL, form.email.lower())
 
-    usuario = db.query(Usuario).filter(Usuario.email == form.email).first()
+    usuario = await db.run_sync(crud.get_login_credentials, form.email)
 
     if not usuario:
         raise HTTPException(status_code=400, detail="Credenciais inválidas")
 
-    if not verify_password(form.senha, usuario.senha):
+    valid, new_hash = await password_hasher.verify_and_update(form.senha, usuario.senha)
+    if not valid:
         raise HTTPException(status_code=400, detail="Credenciais inválidas")
 
+    # Hash com custo antigo: regrava com o custo atual
+    if new_hash:
+        await db.run_sync(crud.update_password_hash, usuario.id, new_hash)
+
     # Criar token JWT
     access_token = create_access_token(
         data={"sub": str(usuario.id)},
@@ -77,13 +84,66 @@ def login(form: LoginRequest, db: Session = Depends(get_db)):
 #  ROTA /me — USUÁRIO LOGADO
 # =========================
 @router.get("/me", response_model=UserOut)
-def read_users_me(current_user: Usuario = Depends(get_current_user)):
+async def read_users_me(current_user: Usuario = Depends(get_current_user)):
     return current_user
 
 
+# =========================
+#  EXPORTAR BIBLIOTECA (NDJSON)
+# =========================
+def _export_stream(user_id: int, shard: int, after_id: Optional[int], compress: bool):
+    # A sessão pertence ao gerador: a resposta continua sendo enviada
+    # depois que as dependências da rota já foram finalizadas. Como as demais
+    # leituras, usa a réplica, salvo logo após uma escrita do usuário.
+    if database.recent_writes.is_recent(user_id):
+        db = database.SessionLocal()
+    else:
+        db = database.ReadSessionLocal()
+    database.use_shard(db, shard)
+    try:
+        chunks = ndjson_chunks(crud.iter_user_library(db, user_id, after_id))
+        if compress:
+            chunks = gzip_chunks(chunks)
+        yield from chunks
+    finally:
+        db.close()
+
+
+@router.get("/me/export")
+async def export_library(
+    after_id: Optional[int] = Query(None, ge=0, description="Retoma após este flashcard (omite os decks)"),
+    compress: bool = Query(False, description="Compacta a saída com gzip"),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Exporta decks e flashcards do usuário como NDJSON (uma linha por registro),
+    em streaming: a memória usada não depende do tamanho da biblioteca.
+    Se o download cair, repita a chamada com `after_id` = último id de flashcard recebido.
+    """
+    filename = "estudeai-export.ndjson" + (".gz" if compress else "")
+    return StreamingResponse(
+        _export_stream(current_user.id, current_user.shard, after_id, compress),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/me/export", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED)
+async def export_library_background(
+    compress: bool = Query(True, description="Compacta o arquivo com gzip"),
+    db = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Gera a mesma exportação do GET /users/me/export como tarefa em segundo
+    plano; quando `status` = `concluida`, baixe em GET /jobs/{id}/file.
+    """
+    return jobs.accepted(await db.run_sync(jobs.enqueue, current_user.id, "export_library", {"compress": compress}))
+
+
 # =========================
 #  LISTAR USUÁRIOS (debug)
 # =========================
 @router.get("/", response_model=list[UserOut])
-def listar_usuarios(db: Session = Depends(get_db)):
-    return db.query(Usuario).all()
+async def listar_usuarios(db = Depends(get_session)):
+    return await db.run_sync(crud.list_users)
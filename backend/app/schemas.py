@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Optional, List
+from datetime import date, datetime
+from typing import Optional, List, Literal
 
 class UserCreate(BaseModel):
     nome: str
@@ -36,11 +36,53 @@ class FlashcardOut(BaseModel):
     class Config:
         from_attributes = True
 
-class FlashcardCreate(BaseModel):
-    deck_id: int 
+class FlashcardBase(BaseModel):
     pergunta: str = Field(..., max_length=500)
     resposta: str = Field(..., max_length=1000)
 
+class FlashcardCreate(FlashcardBase):
+    deck_id: int 
+
+# Limite de cards aceitos numa única requisição de criação em lote
+MAX_FLASHCARDS_POR_LOTE = 500
+
+class FlashcardBulkCreate(BaseModel):
+    flashcards: List[FlashcardCreate] = Field(..., min_length=1, max_length=MAX_FLASHCARDS_POR_LOTE)
+
+# Versão com todos os campos opcionais, usada quando o cliente pede `fields=`
+class FlashcardPartialOut(BaseModel):
+    id: int
+    deck_id: Optional[int] = None
+    pergunta: Optional[str] = None
+    resposta: Optional[str] = None
+    criado_em: Optional[datetime] = None
+
+class FlashcardPage(BaseModel):
+    items: List[FlashcardPartialOut]
+    next_cursor: Optional[str] = None
+
+class FlashcardSearchHit(FlashcardOut):
+    score: float
+
+class FlashcardSearchPage(BaseModel):
+    items: List[FlashcardSearchHit]
+    next_cursor: Optional[str] = None
+
+class FlashcardBulkError(BaseModel):
+    index: int
+    deck_id: int
+    detail: str
+
+class FlashcardBulkOut(BaseModel):
+    created: List[FlashcardOut] = []
+    errors: List[FlashcardBulkError] = []
+
+# Remoção em lote (DELETE /flashcards?ids=... e POST /decks/bulk-delete):
+# ids inexistentes ou de outro usuário voltam em `not_found`
+class BulkDeleteOut(BaseModel):
+    deleted: List[int] = []
+    not_found: List[int] = []
+
 class FlashcardUpdate(BaseModel):
     pergunta: Optional[str] = Field(None, max_length=500)
     resposta: Optional[str] = Field(None, max_length=1000)
@@ -50,6 +92,13 @@ class FlashcardUpdate(BaseModel):
 class DeckCreate(BaseModel):
     titulo: str = Field(..., max_length=255)
     descricao: Optional[str] = Field(None, max_length=500)
+    # Flashcards opcionais criados junto com o deck, na mesma transação
+    flashcards: Optional[List[FlashcardBase]] = Field(None, max_length=MAX_FLASHCARDS_POR_LOTE)
+
+MAX_DECKS_POR_LOTE = 100
+
+class DeckBulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_DECKS_POR_LOTE)
 
 class DeckOut(BaseModel):
     id: int
@@ -61,16 +110,168 @@ class DeckOut(BaseModel):
     class Config:
         from_attributes = True
 
+class DeckPartialOut(BaseModel):
+    id: int
+    usuario_id: Optional[int] = None
+    titulo: Optional[str] = None
+    descricao: Optional[str] = None
+    criado_em: Optional[datetime] = None
+
+class DeckPage(BaseModel):
+    items: List[DeckPartialOut]
+    next_cursor: Optional[str] = None
+
 class DeckFullOut(DeckOut):
     flashcards: List[FlashcardOut] = []
     
     class Config:
         from_attributes = True
 
+# Deck com os totais usados na tela inicial
+class DeckSummaryOut(DeckOut):
+    card_count: int
+    due_count: int
+    last_studied_at: Optional[datetime] = None
+
+# Erros de linha detalhados na resposta de uma importação (os demais só contam)
+MAX_ERROS_IMPORTACAO = 100
+
+class DeckImportError(BaseModel):
+    line: int
+    detail: str
+
+class DeckImportOut(BaseModel):
+    deck: DeckOut
+    imported: int
+    failed: int
+    errors: List[DeckImportError] = []
+
 class DeckUpdate(BaseModel):
     titulo: Optional[str] = Field(None, max_length=255)
     descricao: Optional[str] = Field(None, max_length=500)
 
+# --- Schemas de Estudo (revisão espaçada) ---
+
+ReviewRating = Literal["errei", "dificil", "facil", "muito-facil"]
+
+class DueCardOut(FlashcardOut):
+    due_at: datetime
+    ease: float
+    interval_days: float
+    repetitions: int
+    lapses: int
+
+# Tudo que a tela de estudo precisa numa única requisição
+MAX_CARDS_POR_SESSAO = 500
+
+class StudySessionOut(BaseModel):
+    deck: DeckSummaryOut
+    cards: List[DueCardOut]
+    session: str
+
+class ReviewCreate(BaseModel):
+    flashcard_id: int
+    rating: ReviewRating
+    answered_at: Optional[datetime] = None
+
+# Limite de respostas aceitas num único envio em lote
+MAX_REVISOES_POR_LOTE = 1000
+
+class ReviewEvent(BaseModel):
+    card_id: int
+    rating: ReviewRating
+    answered_at: datetime
+    client_event_id: str = Field(..., min_length=1, max_length=64)
+
+class ReviewBatch(BaseModel):
+    events: List[ReviewEvent] = Field(..., min_length=1, max_length=MAX_REVISOES_POR_LOTE)
+    # Token de GET /study/session; opcional (sessões antigas ou expiradas também são aceitas)
+    session: Optional[str] = None
+
+class ReviewBatchError(BaseModel):
+    client_event_id: str
+    card_id: int
+    detail: str
+
+class ReviewBatchOut(BaseModel):
+    accepted: int
+    duplicates: List[str] = []
+    rejected: List[ReviewBatchError] = []
+
+class ReviewOut(BaseModel):
+    flashcard_id: int
+    due_at: datetime
+    ease: float
+    interval_days: float
+    repetitions: int
+    lapses: int
+
+    class Config:
+        from_attributes = True
+
+# --- Schemas de Sincronização ---
+
+class DeckSyncOut(DeckOut):
+    atualizado_em: Optional[datetime] = None
+
+class FlashcardSyncOut(FlashcardOut):
+    atualizado_em: Optional[datetime] = None
+
+class SyncDeleted(BaseModel):
+    decks: List[int] = []
+    flashcards: List[int] = []
+
+class SyncOut(BaseModel):
+    # Enviar como `since` na próxima sincronização
+    cursor: int
+    # True quando a resposta é a biblioteca completa (substitui a cópia local)
+    full: bool
+    decks: List[DeckSyncOut]
+    flashcards: List[FlashcardSyncOut]
+    deleted: SyncDeleted
+
+# --- Schemas de Estatísticas ---
+
+class DailyActivityOut(BaseModel):
+    day: str
+    date: date
+    count: int
+    is_today: bool
+
+class UserStatsOut(BaseModel):
+    total_decks: int
+    total_cards: int
+    total_cards_studied: int
+    correct: int
+    needs_review: int
+    wrong: int
+    accuracy_rate: float
+    streak_days: int
+    weekly_activity: List[DailyActivityOut]
+
+# --- Schemas de Tarefas em segundo plano ---
+
+JobStatus = Literal["pendente", "executando", "concluida", "falhou"]
+
+class JobOut(BaseModel):
+    id: int
+    tipo: str
+    status: JobStatus
+    prioridade: int
+    concluidos: int
+    total: Optional[int] = None
+    tentativas: int
+    max_tentativas: int
+    resultado: Optional[dict] = None
+    erro: Optional[str] = None
+    criado_em: datetime
+    executar_apos: datetime
+    iniciado_em: Optional[datetime] = None
+    finalizado_em: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 # Schema auxiliar para o payload do token
 class TokenData(BaseModel):
     sub: Optional[str] = None
\ No newline at end of file
@@ -0,0 +1,277 @@
+"""
+Busca textual nos flashcards (pergunta + resposta).
+
+Cada banco usa o seu próprio índice invertido, mantido pelo próprio banco a
+cada INSERT/UPDATE/DELETE em `flashcards`:
+  - MySQL: índice FULLTEXT em (pergunta, resposta), consultado com
+    MATCH ... AGAINST em BOOLEAN MODE. A insensibilidade a acentos vem da
+    collation da coluna (utf8mb4_0900_ai_ci / utf8mb4_unicode_ci);
+  - SQLite: tabela virtual FTS5 com conteúdo externo e triggers, tokenizer
+    unicode61 com remove_diacritics e índices de prefixo de 2 a 4 letras.
+    O `deck_id` também é indexado: o filtro pelos decks do usuário entra na
+    própria expressão do MATCH, então o FTS5 só percorre (e ranqueia) os
+    cards do usuário, e não os de todos os usuários que contêm o termo.
+
+As rotas usam só `get_backend(dialeto).search(...)`; a consulta do usuário
+é reduzida a palavras obrigatórias e a última é tratada como prefixo
+(busca enquanto digita). Palavras curtas demais para o índice (MySQL não
+indexa menos de 3 letras; o FTS5 só tem prefixos a partir de 2) viram
+filtros LIKE sobre os cards do usuário. Só os MAX_CANDIDATES cards mais
+relevantes são paginados.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import DDL, event, text
+from sqlalchemy.orm import Session
+
+from app.models import Flashcard
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Máximo de palavras consideradas numa busca
+MAX_TERMS = 8
+
+# Máximo de resultados de uma busca: os mais relevantes são escolhidos no
+# próprio índice e só eles são juntados aos cards e paginados (a paginação
+# para aí; termos tão comuns assim pedem uma busca mais específica)
+MAX_CANDIDATES = 1000
+
+
+def parse_terms(query: str) -> List[str]:
+    """Palavras da busca, sem os operadores de cada sintaxe de full-text."""
+    return _WORD.findall(query.lower())[:MAX_TERMS]
+
+
+def like_filters(terms: List[str], columns: Tuple[str, str]) -> Tuple[str, dict]:
+    """Condições `(pergunta LIKE ... OR resposta LIKE ...)` para cada termo e os seus parâmetros."""
+    conditions, params = [], {}
+    for index, term in enumerate(terms):
+        name = f"like_{index}"
+        params[name] = "%" + term.replace("!", "!!").replace("_", "!_").replace("%", "!%") + "%"
+        conditions.append(" OR ".join(f"{column} LIKE :{name} ESCAPE '!'" for column in columns))
+    return "".join(f" AND ({condition})" for condition in conditions), params
+
+
+class SearchBackend:
+    """Interface comum das implementações de busca."""
+
+    # Tamanho mínimo de uma palavra inteira e do prefixo (a última) para usar o índice
+    MIN_TERM_LENGTH = 1
+    MIN_PREFIX_LENGTH = 1
+
+    def split_terms(self, terms: List[str]) -> Tuple[List[str], Optional[str], List[str]]:
+        """(palavras inteiras e prefixo buscados no índice, palavras curtas buscadas com LIKE)."""
+        if not terms:
+            return [], None, []
+        words, prefix = terms[:-1], terms[-1]
+        short = [word for word in words if len(word) < self.MIN_TERM_LENGTH]
+        words = [word for word in words if len(word) >= self.MIN_TERM_LENGTH]
+        if len(prefix) < self.MIN_PREFIX_LENGTH:
+            short.append(prefix)
+            prefix = None
+        return words, prefix, short
+
+    def search_short(self, db: Session, user_id: int, terms: List[str], limit: int, offset: int):
+        """
+        Busca sem nenhuma palavra indexável: LIKE nos cards do usuário (pelo
+        índice de decks por usuário e o de flashcards por deck), em ordem de id.
+        """
+        filters, params = like_filters(terms, ("f.pergunta", "f.resposta"))
+        return db.execute(
+            text(f"""
+                SELECT f.id, f.deck_id, f.pergunta, f.resposta, f.criado_em, 0.0 AS score
+                FROM decks d
+                JOIN flashcards f ON f.deck_id = d.id
+                WHERE d.usuario_id = :user_id{filters}
+                ORDER BY f.id
+                LIMIT :limit OFFSET :offset
+            """),
+            {**params, "user_id": user_id, "limit": limit, "offset": offset}
+        ).all()
+
+    def install(self, connection):
+        """Cria o índice (idempotente)."""
+        raise NotImplementedError
+
+    def rebuild(self, connection):
+        """Reconstrói o índice a partir da tabela `flashcards`."""
+        raise NotImplementedError
+
+    def search(self, db: Session, user_id: int, terms: List[str], limit: int, offset: int):
+        """
+        Linhas (id, deck_id, pergunta, resposta, criado_em, score) dos cards do
+        usuário que contêm todos os termos (o último como prefixo), da mais
+        para a menos relevante.
+        """
+        raise NotImplementedError
+
+
+class MySQLFulltextBackend(SearchBackend):
+    CREATE_INDEX = "ALTER TABLE flashcards ADD FULLTEXT INDEX ft_flashcards_texto (pergunta, resposta)"
+
+    # Com o innodb_ft_min_token_size padrão, palavras menores não são indexadas
+    # e exigi-las com "+" faria a busca nunca encontrar nada
+    MIN_TOKEN_SIZE = 3
+    MIN_TERM_LENGTH = MIN_TOKEN_SIZE
+    MIN_PREFIX_LENGTH = MIN_TOKEN_SIZE
+
+    def install(self, connection):
+        exists = connection.execute(text("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE()
+              AND table_name = 'flashcards'
+              AND index_name = 'ft_flashcards_texto'
+        """)).scalar()
+        if not exists:
+            connection.exec_driver_sql(self.CREATE_INDEX)
+
+    def rebuild(self, connection):
+        # O InnoDB mantém o FULLTEXT sozinho; OPTIMIZE reorganiza o índice
+        connection.execute(text("OPTIMIZE TABLE flashcards"))
+
+    def search(self, db, user_id, terms, limit, offset):
+        words, prefix, short = self.split_terms(terms)
+        if not words and prefix is None:
+            return self.search_short(db, user_id, short, limit, offset) if short else []
+
+        # O FULLTEXT do InnoDB não combina com outros índices: os decks do
+        # usuário entram como semijoin. Os MAX_CANDIDATES de maior score são
+        # escolhidos antes do JOIN com as colunas completas
+        filters, params = like_filters(short, ("f.pergunta", "f.resposta"))
+        return db.execute(
+            text(f"""
+                SELECT f.id, f.deck_id, f.pergunta, f.resposta, f.criado_em, c.score
+                FROM (
+                    SELECT f.id, MATCH(f.pergunta, f.resposta) AGAINST (:q IN BOOLEAN MODE) AS score
+                    FROM flashcards f
+                    WHERE MATCH(f.pergunta, f.resposta) AGAINST (:q IN BOOLEAN MODE)
+                      AND f.deck_id IN (SELECT d.id FROM decks d WHERE d.usuario_id = :user_id){filters}
+                    ORDER BY score DESC, f.id
+                    LIMIT :candidates
+                ) AS c
+                JOIN flashcards f ON f.id = c.id
+                ORDER BY c.score DESC, f.id
+                LIMIT :limit OFFSET :offset
+            """),
+            {
+                **params,
+                "q": " ".join([f"+{word}" for word in words] + ([f"+{prefix}*"] if prefix else [])),
+                "user_id": user_id,
+                "candidates": MAX_CANDIDATES,
+                "limit": limit,
+                "offset": offset,
+            }
+        ).all()
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    # Os prefixos indexados começam em 2 letras; com 1 a busca percorreria todos os termos
+    MIN_PREFIX_LENGTH = 2
+
+    STATEMENTS = [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS flashcards_fts USING fts5(
+            pergunta, resposta, deck_id,
+            content='flashcards', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3 4'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS flashcards_fts_ai AFTER INSERT ON flashcards BEGIN
+            INSERT INTO flashcards_fts(rowid, pergunta, resposta, deck_id)
+            VALUES (new.id, new.pergunta, new.resposta, new.deck_id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS flashcards_fts_ad AFTER DELETE ON flashcards BEGIN
+            INSERT INTO flashcards_fts(flashcards_fts, rowid, pergunta, resposta, deck_id)
+            VALUES ('delete', old.id, old.pergunta, old.resposta, old.deck_id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS flashcards_fts_au AFTER UPDATE OF pergunta, resposta, deck_id ON flashcards BEGIN
+            INSERT INTO flashcards_fts(flashcards_fts, rowid, pergunta, resposta, deck_id)
+            VALUES ('delete', old.id, old.pergunta, old.resposta, old.deck_id);
+            INSERT INTO flashcards_fts(rowid, pergunta, resposta, deck_id)
+            VALUES (new.id, new.pergunta, new.resposta, new.deck_id);
+        END
+        """,
+    ]
+
+    TRIGGERS = ("flashcards_fts_ai", "flashcards_fts_ad", "flashcards_fts_au")
+
+    def install(self, connection):
+        # Índice de uma versão anterior (sem a coluna deck_id): recria e repopula
+        columns = [row[1] for row in connection.exec_driver_sql("PRAGMA table_info(flashcards_fts)")]
+        outdated = bool(columns) and "deck_id" not in columns
+        if outdated:
+            for trigger in self.TRIGGERS:
+                connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+            connection.exec_driver_sql("DROP TABLE flashcards_fts")
+
+        for statement in self.STATEMENTS:
+            connection.exec_driver_sql(statement)
+        if outdated:
+            self.rebuild(connection)
+
+    def rebuild(self, connection):
+        connection.exec_driver_sql("INSERT INTO flashcards_fts(flashcards_fts) VALUES ('rebuild')")
+
+    def search(self, db, user_id, terms, limit, offset):
+        words, prefix, short = self.split_terms(terms)
+        if not words and prefix is None:
+            return self.search_short(db, user_id, short, limit, offset) if short else []
+
+        # A expressão do MATCH já exige um dos decks do usuário (deck_id : ...),
+        # então bm25 (peso 0 para deck_id) só é calculado para os cards dele;
+        # os MAX_CANDIDATES mais relevantes são escolhidos antes do JOIN.
+        # bm25() é menor para os mais relevantes; o score exposto é o oposto
+        text_query = " ".join([f'"{word}"' for word in words] + ([f'"{prefix}"*'] if prefix else []))
+        filters, params = like_filters(short, ("flashcards_fts.pergunta", "flashcards_fts.resposta"))
+        return db.execute(
+            text(f"""
+                SELECT f.id, f.deck_id, f.pergunta, f.resposta, f.criado_em, -c.rank AS score
+                FROM (
+                    SELECT flashcards_fts.rowid AS id, bm25(flashcards_fts, 1.0, 1.0, 0.0) AS rank
+                    FROM flashcards_fts
+                    WHERE flashcards_fts MATCH '{{pergunta resposta}} : (' || :q || ') AND deck_id : ('
+                        || coalesce((SELECT group_concat(d.id, ' OR ') FROM decks d WHERE d.usuario_id = :user_id), '0')
+                        || ')'{filters}
+                    ORDER BY rank, id
+                    LIMIT :candidates
+                ) AS c
+                JOIN flashcards f ON f.id = c.id
+                ORDER BY c.rank, f.id
+                LIMIT :limit OFFSET :offset
+            """),
+            {
+                **params,
+                "q": text_query,
+                "user_id": user_id,
+                "candidates": MAX_CANDIDATES,
+                "limit": limit,
+                "offset": offset,
+            }
+        ).all()
+
+
+BACKENDS = {
+    "mysql": MySQLFulltextBackend(),
+    "sqlite": SQLiteFTS5Backend(),
+}
+
+
+def get_backend(dialect_name: str) -> SearchBackend:
+    try:
+        return BACKENDS[dialect_name]
+    except KeyError:
+        raise NotImplementedError(f"Busca textual não suportada no banco '{dialect_name}'.")
+
+
+# O índice é criado junto com a tabela (create_all / create-tables); em bancos
+# já existentes, use `python -m app.manage rebuild-search-index`
+event.listen(Flashcard.__table__, "after_create", DDL(MySQLFulltextBackend.CREATE_INDEX).execute_if(dialect="mysql"))
+for _statement in SQLiteFTS5Backend.STATEMENTS:
+    event.listen(Flashcard.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
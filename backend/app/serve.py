@@ -0,0 +1,66 @@
+"""
+Servidor de produção.
+
+Sobe `WEB_CONCURRENCY` workers do uvicorn (padrão: um por CPU) atrás do
+mesmo socket. O loop e o parser HTTP ficam em "auto": uvloop e httptools
+quando instalados (estão no requirements.txt), asyncio e h11 caso contrário.
+Cada worker aquece o pool do banco e o do bcrypt no startup antes de
+aceitar conexões (ver app/warmup.py). No SIGTERM o uvicorn para de aceitar
+conexões e espera as requisições em andamento por até GRACEFUL_TIMEOUT
+segundos.
+
+Uso (a partir de backend/):
+    python -m app.serve
+    python -m app.serve --workers 4 --port 8080
+
+Para desenvolvimento continue usando `uvicorn app.main:app --reload`.
+"""
+import argparse
+import copy
+
+import uvicorn
+from uvicorn.config import LOGGING_CONFIG
+
+from app.config import (
+    ACCESS_LOG,
+    FORWARDED_ALLOW_IPS,
+    GRACEFUL_TIMEOUT,
+    KEEPALIVE_TIMEOUT,
+    SERVER_HOST,
+    SERVER_PORT,
+    WEB_CONCURRENCY,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    args = parser.parse_args()
+
+    # Os workers são processos novos: a configuração de log vai junto para
+    # eles, incluindo os loggers do app (warmup, app.slow_query, ...)
+    log_config = copy.deepcopy(LOGGING_CONFIG)
+    log_config["loggers"]["app"] = {"handlers": ["default"], "level": "INFO", "propagate": False}
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=max(1, args.workers),
+        loop="auto",
+        http="auto",
+        # Falha no startup derruba o worker em vez de servir sem aquecer
+        lifespan="on",
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+        timeout_keep_alive=KEEPALIVE_TIMEOUT,
+        access_log=ACCESS_LOG,
+        log_config=log_config,
+        proxy_headers=True,
+        forwarded_allow_ips=FORWARDED_ALLOW_IPS,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Particionamento horizontal dos dados por usuário.
+
+Cada usuário tem um shard (`usuarios.shard`, índice em SHARD_DATABASE_URLS)
+onde ficam os seus decks, flashcards, progresso, revisões, estatísticas,
+tombstones e a linha de `bibliotecas` (a sequência de alterações). As
+tabelas globais (`usuarios` e `tarefas`, app.database.GLOBAL_TABLES) ficam
+só no DATABASE_URL. As consultas não mudam: `get_current_user` liga a sessão
+da requisição ao shard do usuário (`database.use_shard`) e a
+`ShardedSession` escolhe o engine pela tabela de cada comando.
+
+Toda escrita de uma requisição cai num único banco: a sequência de
+alterações mora no shard, junto com o que ela versiona. Os ids são gerados
+por shard, então só são únicos dentro do mesmo usuário (como todas as
+consultas já filtram pelo dono, isso não muda nada para a API).
+
+Mudar um usuário de shard (`python -m app.manage move-user <id> <shard>`):
+  1. marca a linha de `bibliotecas` na origem com `movida_para`: daí em
+     diante as escritas lá falham com `UserMoved` (503 com Retry-After);
+  2. copia as linhas para o destino com ids novos e a sequência avançada
+     como se os tombstones tivessem sido compactados: no próximo GET /sync
+     os clientes recebem a biblioteca completa. Os decks copiados recebem
+     essa sequência nova, então nenhuma ETag guardada antes da mudança
+     revalida um deck no destino (o mesmo id pode ser outro deck, ou o
+     mesmo com flashcards de ids novos);
+  3. grava o shard novo em `usuarios` e espera PRINCIPAL_CACHE_TTL (os
+     processos com o shard antigo em cache ainda leem a origem);
+  4. apaga as linhas da origem, menos a marca.
+Se o comando for interrompido, basta repeti-lo: a cópia recomeça do zero.
+"""
+import logging
+import time
+import zlib
+from typing import List, Optional
+
+from sqlalchemy import delete, insert, inspect, or_, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from app import database, search
+from app.config import NEW_USER_SHARDS
+from app.database import GLOBAL_TABLES, Base
+from app.models import (
+    AtividadeDiaria,
+    Biblioteca,
+    Deck,
+    EstatisticaUsuario,
+    Flashcard,
+    Progresso,
+    Remocao,
+    Revisao,
+    Usuario,
+)
+from app.utils.auth_cache import PRINCIPAL_CACHE_TTL, invalidate_user
+
+logger = logging.getLogger(__name__)
+
+
+class UserMoved(Exception):
+    """Escrita num shard de onde o usuário está saindo (ou já saiu)."""
+
+    def __init__(self, user_id: int, shard: int):
+        super().__init__(f"Usuário {user_id} está sendo movido para o shard {shard}.")
+        self.user_id = user_id
+        self.shard = shard
+
+
+def assign_shard(email: str) -> int:
+    """Shard de um cadastro novo: hash do email entre os NEW_USER_SHARDS (ou todos)."""
+    candidates = NEW_USER_SHARDS or range(len(database.shard_engines))
+    return candidates[zlib.crc32(email.lower().encode("utf-8")) % len(candidates)]
+
+
+def user_shard(db: Session, user_id: int) -> Optional[int]:
+    return db.query(Usuario.shard).filter(Usuario.id == user_id).scalar()
+
+
+def create_tables(engine):
+    """
+    Cria, num shard fora do DATABASE_URL, as tabelas dos usuários que ainda
+    não existem, sem as chaves estrangeiras para as tabelas globais (que
+    ficam em outro banco), e o índice da busca textual.
+    """
+    existing = set(inspect(engine).get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name in GLOBAL_TABLES or table.name in existing:
+                continue
+            local = [fk for fk in table.foreign_key_constraints if fk.referred_table.name not in GLOBAL_TABLES]
+            conn.execute(CreateTable(table, include_foreign_key_constraints=local))
+            for index in table.indexes:
+                index.create(conn)
+        search.get_backend(engine.dialect.name).install(conn)
+
+
+# =========================================================================================
+# MUDANÇA DE SHARD
+# =========================================================================================
+def _without_id(row) -> dict:
+    return {key: value for key, value in row.items() if key != "id"}
+
+
+def _insert_ids(db: Session, model, rows: List[dict]) -> List[int]:
+    """INSERT em lote; retorna os ids gerados na ordem de `rows`."""
+    if not rows:
+        return []
+    if db.get_bind(model).dialect.insert_executemany_returning_sort_by_parameter_order:
+        return list(db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows).scalars())
+
+    # MySQL: o flush do ORM lê o id de cada linha
+    objects = [model(**row) for row in rows]
+    db.add_all(objects)
+    db.flush()
+    ids = [obj.id for obj in objects]
+    for obj in objects:
+        db.expunge(obj)
+    return ids
+
+
+def _fence(db: Session, user_id: int, target: int):
+    """Marca a biblioteca na origem (com commit) e retorna a sequência dela."""
+    fenced = db.execute(
+        update(Biblioteca)
+        .where(
+            Biblioteca.usuario_id == user_id,
+            or_(Biblioteca.movida_para.is_(None), Biblioteca.movida_para == target)
+        )
+        .values(movida_para=target)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not fenced:
+        moving = db.query(Biblioteca.movida_para).filter(Biblioteca.usuario_id == user_id).first()
+        if moving is not None:
+            raise ValueError(f"Usuário {user_id} já está sendo movido para o shard {moving.movida_para}.")
+        # Conta anterior à tabela `bibliotecas`
+        legacy = db.query(Usuario.versao_biblioteca, Usuario.sequencia_compactada).filter(Usuario.id == user_id).one()
+        db.execute(insert(Biblioteca).values(
+            usuario_id=user_id, versao=legacy.versao_biblioteca,
+            sequencia_compactada=legacy.sequencia_compactada, movida_para=target
+        ))
+    db.commit()
+    return db.query(Biblioteca.versao).filter(Biblioteca.usuario_id == user_id).scalar()
+
+
+def _delete_user_rows(db: Session, user_id: int, keep_fence: bool = False):
+    """Apaga as linhas do usuário no shard da sessão (sem commit)."""
+    # Revisões e progresso antes dos decks: a cascata só apaga os flashcards
+    for model in (Revisao, Progresso, Deck, EstatisticaUsuario, AtividadeDiaria, Remocao):
+        db.execute(delete(model).where(model.usuario_id == user_id).execution_options(synchronize_session=False))
+    if not keep_fence:
+        db.execute(delete(Biblioteca).where(Biblioteca.usuario_id == user_id))
+
+
+def _copy_library(source: Session, target: Session, user_id: int, sequence: int, batch_size: int) -> dict:
+    """
+    Copia as linhas do usuário com ids novos (sem commit), os decks com a
+    `sequence` da biblioteca no destino; retorna quantas de cada tabela.
+    """
+    decks = source.execute(
+        select(Deck.__table__).where(Deck.usuario_id == user_id).order_by(Deck.id)
+    ).mappings().all()
+    rows = [{**_without_id(row), "sequencia": sequence} for row in decks]
+    deck_ids = dict(zip((row["id"] for row in decks), _insert_ids(target, Deck, rows)))
+
+    card_ids = {}
+    cards = source.execute(
+        select(Flashcard.__table__)
+        .join(Deck.__table__, Flashcard.deck_id == Deck.id)
+        .where(Deck.usuario_id == user_id)
+        .order_by(Flashcard.id)
+        .execution_options(yield_per=batch_size)
+    ).mappings()
+    for batch in cards.partitions():
+        rows = [{**_without_id(row), "deck_id": deck_ids[row["deck_id"]]} for row in batch]
+        card_ids.update(zip((row["id"] for row in batch), _insert_ids(target, Flashcard, rows)))
+
+    copied = {"decks": len(deck_ids), "flashcards": len(card_ids), "progresso": 0, "revisoes": 0}
+    remap = {
+        Progresso: lambda row: {
+            **_without_id(row), "flashcard_id": card_ids[row["flashcard_id"]], "deck_id": deck_ids[row["deck_id"]],
+        },
+        # Respostas de cards já apagados ficam com flashcard_id NULL
+        Revisao: lambda row: {**_without_id(row), "flashcard_id": card_ids.get(row["flashcard_id"])},
+    }
+    for model, convert in remap.items():
+        rows = source.execute(
+            select(model.__table__).where(model.usuario_id == user_id).execution_options(yield_per=batch_size)
+        ).mappings()
+        for batch in rows.partitions():
+            target.execute(insert(model), [convert(row) for row in batch])
+            copied[model.__tablename__] += len(batch)
+
+    # Chaves naturais (usuario_id, dia): copiadas como estão. Os tombstones
+    # não: o destino começa com a biblioteca completa no /sync
+    for model in (EstatisticaUsuario, AtividadeDiaria):
+        rows = [dict(row) for row in source.execute(select(model.__table__).where(model.usuario_id == user_id)).mappings()]
+        if rows:
+            target.execute(insert(model), rows)
+    return copied
+
+
+def move_user(user_id: int, target: int, wait: float = PRINCIPAL_CACHE_TTL, batch_size: int = 1000) -> dict:
+    """
+    Move os dados do usuário para o shard `target` (ver o docstring do
+    módulo) e retorna quantas linhas de cada tabela foram copiadas.
+    """
+    if not 0 <= target < len(database.shard_engines):
+        raise ValueError(f"Shard {target} não existe ({len(database.shard_engines)} configurados).")
+    with database.SessionLocal() as db:
+        source = user_shard(db, user_id)
+    if source is None:
+        raise ValueError(f"Usuário {user_id} não existe.")
+    if source == target:
+        raise ValueError(f"Usuário {user_id} já está no shard {target}.")
+
+    source_db, target_db = database.SessionLocal(), database.SessionLocal()
+    database.use_shard(source_db, source)
+    database.use_shard(target_db, target)
+    try:
+        version = _fence(source_db, user_id, target)
+        started = time.perf_counter()
+
+        # Restos de uma tentativa interrompida (ou de quando o usuário morava aqui)
+        _delete_user_rows(target_db, user_id)
+        copied = _copy_library(source_db, target_db, user_id, version + 1, batch_size)
+        target_db.execute(insert(Biblioteca).values(
+            usuario_id=user_id, versao=version + 1, sequencia_compactada=version + 1
+        ))
+        target_db.commit()
+        source_db.rollback()
+
+        with database.SessionLocal() as db:
+            db.execute(
+                update(Usuario).where(Usuario.id == user_id).values(shard=target)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        invalidate_user(user_id)
+        logger.info(
+            "shards: usuário %s copiado do shard %s para o %s em %.1f s (%s)",
+            user_id, source, target, time.perf_counter() - started, copied
+        )
+
+        # Os outros processos usam o shard antigo até o cache de autenticação vencer
+        time.sleep(wait)
+        _delete_user_rows(source_db, user_id, keep_fence=True)
+        source_db.commit()
+    finally:
+        source_db.close()
+        target_db.close()
+    return copied
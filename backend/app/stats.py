@@ -0,0 +1,276 @@
+"""
+Estatísticas por usuário mantidas de forma incremental.
+
+`estatisticas_usuario` guarda os contadores e `atividade_diaria` o número de
+revisões por dia. As funções daqui são chamadas pelo crud dentro das mesmas
+transações que criam/apagam decks e cards e registram revisões, de modo que
+GET /users/stats é só uma leitura por chave primária mais 7 linhas.
+`recount` refaz tudo a partir das tabelas de origem (usado por `rebuild`,
+pelo comando `python -m app.manage rebuild-stats` e pela tarefa
+"recount_stats", e para criar a linha que faltar).
+"""
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict
+
+from sqlalchemy import case, delete, func, insert, update
+from sqlalchemy.orm import Session
+
+from app.database import READ_ONLY
+from app.models import AtividadeDiaria, Deck, EstatisticaUsuario, Flashcard, Progresso, Revisao
+
+# Coluna de contador incrementada por cada avaliação
+RATING_COLUMNS = {
+    "errei": "wrong",
+    "dificil": "needs_review",
+    "facil": "correct",
+    "muito-facil": "correct",
+}
+
+# Iniciais dos dias da semana (segunda = 0), como na tela de estatísticas
+WEEKDAY_LABELS = ["S", "T", "Q", "Q", "S", "S", "D"]
+
+# Quantos dias de atividade olhar para trás ao recalcular a sequência
+MAX_STREAK_SCAN = 3660
+
+
+def _as_date(value) -> date:
+    # func.date() retorna date no MySQL e texto no SQLite
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _streak_ending_at(days) -> int:
+    """Tamanho da sequência de dias consecutivos no início de `days` (ordem decrescente)."""
+    streak, expected = 0, None
+    for day in days:
+        if expected is not None and day != expected:
+            break
+        streak += 1
+        expected = day - timedelta(days=1)
+    return streak
+
+
+def recount(db: Session, user_id: int) -> Dict:
+    """Calcula todos os contadores do zero a partir das tabelas de origem."""
+    total_decks = db.query(func.count(Deck.id)).filter(Deck.usuario_id == user_id).scalar()
+
+    total_cards = db.query(func.count(Flashcard.id)).join(Deck, Flashcard.deck_id == Deck.id).filter(
+        Deck.usuario_id == user_id
+    ).scalar()
+
+    cards_studied = db.query(func.count(Progresso.id)).filter(
+        Progresso.usuario_id == user_id,
+        Progresso.last_reviewed_at.isnot(None)
+    ).scalar()
+
+    counters = {"correct": 0, "needs_review": 0, "wrong": 0}
+    for rating, amount in db.query(Revisao.rating, func.count(Revisao.id)).filter(
+        Revisao.usuario_id == user_id
+    ).group_by(Revisao.rating):
+        counters[RATING_COLUMNS[rating]] += amount
+
+    activity = {
+        _as_date(day): amount for day, amount in db.query(
+            func.date(Revisao.answered_at), func.count(Revisao.id)
+        ).filter(Revisao.usuario_id == user_id).group_by(func.date(Revisao.answered_at))
+    }
+    days = sorted(activity, reverse=True)
+
+    return {
+        "total_decks": total_decks,
+        "total_cards": total_cards,
+        "cards_studied": cards_studied,
+        **counters,
+        "streak_days": _streak_ending_at(days),
+        "last_study_day": days[0] if days else None,
+        "activity": activity,
+    }
+
+
+def rebuild(db: Session, user_id: int) -> bool:
+    """
+    Regrava os contadores e a atividade do usuário com a recontagem, se
+    divergirem dos incrementais. Retorna True se algo foi corrigido (sem commit).
+    """
+    values = recount(db, user_id)
+    activity = values.pop("activity")
+
+    current = db.get(EstatisticaUsuario, user_id)
+    current_activity = {
+        row.dia: row.reviews for row in db.query(AtividadeDiaria.dia, AtividadeDiaria.reviews)
+        .filter(AtividadeDiaria.usuario_id == user_id)
+    }
+    if (
+        current is not None
+        and all(getattr(current, column) == value for column, value in values.items())
+        and current_activity == activity
+    ):
+        return False
+
+    if current is None:
+        current = EstatisticaUsuario(usuario_id=user_id)
+        db.add(current)
+    for column, value in values.items():
+        setattr(current, column, value)
+
+    db.execute(delete(AtividadeDiaria).where(AtividadeDiaria.usuario_id == user_id))
+    if activity:
+        db.execute(insert(AtividadeDiaria), [
+            {"usuario_id": user_id, "dia": day, "reviews": amount}
+            for day, amount in activity.items()
+        ])
+    return True
+
+
+def create_empty(db: Session, user_id: int):
+    """Linha de estatísticas de um usuário recém-criado."""
+    db.add(EstatisticaUsuario(usuario_id=user_id))
+
+
+def _insert_from_recount(db: Session, user_id: int) -> Dict:
+    # Garante que o que já foi adicionado na transação entre na contagem
+    db.flush()
+    values = recount(db, user_id)
+    activity = values.pop("activity")
+    db.execute(insert(EstatisticaUsuario).values(usuario_id=user_id, **values))
+    # A atividade também sai da recontagem (já inclui as revisões desta
+    # transação): linhas antigas podem estar desatualizadas
+    db.execute(delete(AtividadeDiaria).where(AtividadeDiaria.usuario_id == user_id))
+    if activity:
+        db.execute(insert(AtividadeDiaria), [
+            {"usuario_id": user_id, "dia": day, "reviews": amount}
+            for day, amount in activity.items()
+        ])
+    return values
+
+
+def bump(db: Session, user_id: int, **deltas) -> bool:
+    """
+    Soma os deltas aos contadores (UPDATE col = col + :delta).
+    Se o usuário ainda não tem linha (ex.: conta anterior a esta tabela),
+    ela é criada a partir de uma recontagem, que já inclui esta alteração;
+    nesse caso retorna True.
+    """
+    deltas = {column: delta for column, delta in deltas.items() if delta}
+    if not deltas:
+        return False
+
+    result = db.execute(
+        update(EstatisticaUsuario)
+        .where(EstatisticaUsuario.usuario_id == user_id)
+        .values({
+            column: getattr(EstatisticaUsuario, column) + delta
+            for column, delta in deltas.items()
+        })
+    )
+    if result.rowcount == 0:
+        _insert_from_recount(db, user_id)
+        return True
+    return False
+
+
+def record_reviews(db: Session, user_id: int, ratings, answered_days, first_reviews: int):
+    """
+    Atualiza os contadores após registrar revisões (`ratings` e `answered_days`
+    são listas paralelas às revisões gravadas).
+    """
+    if not ratings:
+        return
+
+    counts = Counter(RATING_COLUMNS[rating] for rating in ratings)
+    if bump(db, user_id, cards_studied=first_reviews, **counts):
+        # A recontagem já gravou a atividade e a sequência com estas revisões
+        return
+
+    new_day = False
+    for day, amount in Counter(answered_days).items():
+        result = db.execute(
+            update(AtividadeDiaria)
+            .where(AtividadeDiaria.usuario_id == user_id, AtividadeDiaria.dia == day)
+            .values(reviews=AtividadeDiaria.reviews + amount)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(AtividadeDiaria).values(usuario_id=user_id, dia=day, reviews=amount))
+            new_day = True
+
+    # A sequência só muda quando surge um dia novo de estudo
+    if new_day:
+        days = [
+            row.dia for row in db.query(AtividadeDiaria.dia)
+            .filter(AtividadeDiaria.usuario_id == user_id)
+            .order_by(AtividadeDiaria.dia.desc())
+            .limit(MAX_STREAK_SCAN)
+        ]
+        db.execute(
+            update(EstatisticaUsuario)
+            .where(EstatisticaUsuario.usuario_id == user_id)
+            .values(streak_days=_streak_ending_at(days), last_study_day=days[0])
+        )
+
+
+def deck_totals(db: Session, user_id: int, deck_ids):
+    """(cards, cards já estudados) dos decks, para descontar ao apagá-los."""
+    # O JOIN inclui o usuário para usar o índice único (usuario_id,
+    # flashcard_id); só por flashcard_id não há índice e o custo é quadrático
+    row = db.query(
+        func.count(Flashcard.id),
+        func.coalesce(func.sum(case((Progresso.last_reviewed_at.isnot(None), 1), else_=0)), 0),
+    ).select_from(Flashcard).outerjoin(
+        Progresso, (Progresso.usuario_id == user_id) & (Progresso.flashcard_id == Flashcard.id)
+    ).filter(
+        Flashcard.deck_id.in_(set(deck_ids))
+    ).one()
+    return row[0], int(row[1])
+
+
+def read(db: Session, user_id: int, today: date) -> Dict:
+    """Uma leitura por chave primária + a atividade dos últimos 7 dias."""
+    stats = db.get(EstatisticaUsuario, user_id)
+    activity = None
+    if stats is None and db.info.get(READ_ONLY):
+        # Na réplica não dá para criar a linha: responde com a recontagem e a
+        # linha é criada pelo primário na próxima escrita do usuário
+        values = recount(db, user_id)
+        activity = values.pop("activity")
+        stats = EstatisticaUsuario(usuario_id=user_id, **values)
+    elif stats is None:
+        _insert_from_recount(db, user_id)
+        db.commit()
+        stats = db.get(EstatisticaUsuario, user_id)
+
+    week_start = today - timedelta(days=6)
+    if activity is None:
+        activity = {
+            row.dia: row.reviews for row in db.query(AtividadeDiaria.dia, AtividadeDiaria.reviews).filter(
+                AtividadeDiaria.usuario_id == user_id,
+                AtividadeDiaria.dia >= week_start,
+                AtividadeDiaria.dia <= today,
+            )
+        }
+
+    # A sequência só vale se o último estudo foi hoje ou ontem
+    streak = stats.streak_days
+    if stats.last_study_day is None or stats.last_study_day < today - timedelta(days=1):
+        streak = 0
+
+    total_reviews = stats.correct + stats.needs_review + stats.wrong
+
+    return {
+        "total_decks": stats.total_decks,
+        "total_cards": stats.total_cards,
+        "total_cards_studied": stats.cards_studied,
+        "correct": stats.correct,
+        "needs_review": stats.needs_review,
+        "wrong": stats.wrong,
+        "accuracy_rate": round(stats.correct / total_reviews, 4) if total_reviews else 0.0,
+        "streak_days": streak,
+        "weekly_activity": [
+            {
+                "day": WEEKDAY_LABELS[day.weekday()],
+                "date": day,
+                "count": activity.get(day, 0),
+                "is_today": day == today,
+            }
+            for day in (week_start + timedelta(days=i) for i in range(7))
+        ],
+    }
@@ -0,0 +1,125 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+# Quantidade máxima de tokens já verificados mantidos em memória
+TOKEN_CACHE_MAX_SIZE = 10_000
+
+# Tempo (segundos) que os dados básicos do usuário ficam em cache
+PRINCIPAL_CACHE_TTL = 60
+PRINCIPAL_CACHE_MAX_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Dados mínimos do usuário autenticado (sem o hash da senha)."""
+    id: int
+    nome: Optional[str]
+    email: str
+    criado_em: Optional[datetime]
+    # Shard dos dados do usuário (app/shards.py)
+    shard: int = 0
+
+    @classmethod
+    def from_usuario(cls, usuario) -> "Principal":
+        return cls(
+            id=usuario.id,
+            nome=usuario.nome,
+            email=usuario.email,
+            criado_em=usuario.criado_em,
+            shard=usuario.shard,
+        )
+
+
+def token_digest(token: str) -> str:
+    """Chave do cache: nunca guardamos o token em texto puro."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenCache:
+    """
+    LRU limitado de tokens JWT já verificados.
+    Cada entrada guarda o `sub` do token e vale até o `exp` do próprio token.
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[str]:
+        key = token_digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            subject, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return subject
+
+    def set(self, token: str, subject: str, expires_at: float):
+        key = token_digest(token)
+        with self._lock:
+            self._entries[key] = (subject, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class PrincipalCache:
+    """Cache de curta duração dos dados do usuário, indexado pelo id."""
+
+    def __init__(self, ttl: float = PRINCIPAL_CACHE_TTL, max_size: int = PRINCIPAL_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def set(self, principal: Principal):
+        with self._lock:
+            self._entries[principal.id] = (principal, time.monotonic() + self.ttl)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Instâncias usadas por app.dependencies.get_current_user.
+# Podem ser substituídas (ex.: testes ou outro backend) atribuindo novos objetos.
+token_cache = TokenCache()
+principal_cache = PrincipalCache()
+
+
+def invalidate_user(user_id: int):
+    """Remove o usuário do cache; deve ser chamado sempre que ele for alterado."""
+    principal_cache.invalidate(user_id)
@@ -0,0 +1,47 @@
+"""
+ETags e GET condicional.
+
+As ETags são derivadas de contadores de versão (`Deck.versao` e
+`Biblioteca.versao`), incrementados na mesma transação de cada
+escrita. Assim a rota consegue responder `304 Not Modified` lendo uma única
+linha, sem carregar nem serializar decks ou flashcards.
+
+Os ids só são únicos dentro de um shard e podem ser reaproveitados depois de
+uma remoção, então as ETags de um deck levam também o id do usuário e a
+`Deck.sequencia` (a sequência da biblioteca, que nunca se repete).
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Response, status
+
+# Os clientes podem guardar a resposta, mas devem revalidar sempre
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """ETag forte a partir das partes que identificam a representação."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara o If-None-Match com a ETag atual (comparação fraca, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
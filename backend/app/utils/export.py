@@ -0,0 +1,33 @@
+"""Codificação em streaming (NDJSON, gzip) para a exportação da biblioteca."""
+import json
+import zlib
+from datetime import date, datetime
+from typing import Iterable, Iterator
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def ndjson_chunks(rows: Iterable[dict], lines_per_chunk: int = 500) -> Iterator[bytes]:
+    """Uma linha JSON por registro, agrupadas em blocos para reduzir o overhead por yield."""
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps(row, default=_json_default, ensure_ascii=False))
+        if len(buffer) >= lines_per_chunk:
+            yield ("\n".join(buffer) + "\n").encode("utf-8")
+            buffer.clear()
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Comprime o fluxo em formato gzip sem acumular o conteúdo."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
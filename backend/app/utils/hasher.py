@@ -0,0 +1,91 @@
+"""
+Pool dedicado e limitado para o bcrypt.
+
+O bcrypt leva dezenas/centenas de milissegundos por chamada. Rodando no
+threadpool padrão do Starlette, uma rajada de logins ocupa todos os workers e
+trava as demais rotas. Aqui o hashing tem threads próprias (o bcrypt libera o
+GIL) e um limite de tarefas pendentes: acima dele a chamada falha na hora com
+`PasswordHasherBusy`, que o app converte em 503.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING
+from app.utils import security
+
+
+class PasswordHasherBusy(Exception):
+    """A fila do pool de hashing está cheia."""
+
+
+class PasswordHasher:
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix="password-hasher",
+                    )
+        return self._executor
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHasherBusy()
+            self._pending += 1
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release(None)
+            raise
+
+        # O contador só é liberado quando o bcrypt termina de fato,
+        # mesmo que a requisição seja cancelada antes.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(security.hash_password, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._submit(security.verify_password, password, hashed)
+
+    async def verify_and_update(self, password: str, hashed: str):
+        """Retorna (válida, novo_hash ou None); ver security.verify_and_update_password."""
+        return await self._submit(security.verify_and_update_password, password, hashed)
+
+    async def warmup(self):
+        """
+        Sobe todas as threads do pool e carrega o backend do bcrypt antes do
+        primeiro login (uma tarefa por thread, em paralelo).
+        """
+        await asyncio.gather(*(self._submit(security.hash_password, "warmup") for _ in range(self.workers)))
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+# Instância usada pelas rotas de autenticação
+password_hasher = PasswordHasher()
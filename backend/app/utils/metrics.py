@@ -0,0 +1,333 @@
+"""
+Métricas de latência por rota e de uso do banco, no formato texto do
+Prometheus (servidas em GET /metrics).
+
+- `MetricsMiddleware` mede cada requisição HTTP e rotula pelo template da
+  rota (`/decks/{deck_id}`), nunca pelo caminho concreto;
+- `instrument_engine` liga os eventos do SQLAlchemy: cada comando SQL é
+  contado e cronometrado, e a espera para obter uma conexão do pool também,
+  tudo atribuído à rota da requisição em andamento (via ContextVar, que
+  acompanha o threadpool e o `run_sync` da AsyncSession);
+- comandos acima de `SLOW_QUERY_MS` vão para o logger `app.slow_query`
+  com a rota que os emitiu.
+
+Implementação própria e enxuta (contadores, histogramas e gauges), sem
+depender do prometheus_client.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+from app.config import SLOW_QUERY_MS
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Rótulos usados quando não há rota: 404 e comandos fora de requisições
+# (scripts de manutenção, benchmarks)
+UNMATCHED_ROUTE = "unmatched"
+NO_ROUTE = "none"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+slow_query_logger = logging.getLogger("app.slow_query")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        yield from self._samples()
+
+    def _samples(self):
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # Por combinação de rótulos: [contagem por faixa (não acumulada), soma]
+        self._values: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._values.items())
+        names = self.labelnames + ("le",)
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(names, labels + (_format_value(bound),))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Gauge(Metric):
+    """Valor lido na hora da coleta: `collect()` devolve {rótulos: valor}."""
+    type = "gauge"
+
+    def __init__(self, name, help, labelnames=(), collect: Optional[Callable[[], Dict[Tuple, float]]] = None):
+        super().__init__(name, help, labelnames)
+        self.collect = collect
+
+    def _samples(self):
+        for labels, value in sorted(self.collect().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Registry:
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> bytes:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return ("\n".join(lines) + "\n").encode()
+
+
+REGISTRY = Registry()
+
+# =========================================
+# MÉTRICAS
+# =========================================
+
+http_request_duration = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Duração das requisições HTTP.", ("method", "route", "status"),
+))
+db_query_duration = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "Duração de cada comando SQL.", ("route",), QUERY_BUCKETS,
+))
+db_slow_queries = REGISTRY.register(Counter(
+    "db_slow_queries_total", "Comandos SQL acima de SLOW_QUERY_MS.", ("route",),
+))
+db_request_queries = REGISTRY.register(Histogram(
+    "db_request_queries", "Comandos SQL por requisição.", ("route",), COUNT_BUCKETS,
+))
+db_request_duration = REGISTRY.register(Histogram(
+    "db_request_query_seconds", "Tempo total em comandos SQL por requisição.", ("route",),
+))
+db_pool_wait = REGISTRY.register(Histogram(
+    "db_pool_wait_seconds", "Espera para obter uma conexão do pool (inclui abrir conexões novas).",
+    ("engine", "route"), QUERY_BUCKETS,
+))
+
+_in_progress = 0
+_engines: Dict[str, object] = {}
+
+
+def _pool_stats(method: str):
+    def collect():
+        return {
+            (name,): getattr(engine.pool, method)()
+            for name, engine in _engines.items()
+            if hasattr(engine.pool, method)
+        }
+    return collect
+
+
+REGISTRY.register(Gauge("http_requests_in_progress", "Requisições HTTP em andamento.", collect=lambda: {(): _in_progress}))
+REGISTRY.register(Gauge("db_pool_checked_out", "Conexões em uso.", ("engine",), _pool_stats("checkedout")))
+REGISTRY.register(Gauge("db_pool_size", "Tamanho configurado do pool.", ("engine",), _pool_stats("size")))
+REGISTRY.register(Gauge("db_pool_overflow", "Conexões além do tamanho do pool (negativo: vagas livres).", ("engine",), _pool_stats("overflow")))
+
+# =========================================
+# CONTEXTO DA REQUISIÇÃO
+# =========================================
+
+
+class RequestMetrics:
+    __slots__ = ("scope", "queries", "query_seconds")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.query_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        # O FastAPI grava a rota encontrada no scope antes de chamar o endpoint
+        route = self.scope.get("route")
+        return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def current_route() -> str:
+    request = _current.get()
+    return request.route if request is not None else NO_ROUTE
+
+
+class MetricsMiddleware:
+    """Middleware ASGI: duração por rota/status e totais de SQL por requisição."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global _in_progress
+        request = RequestMetrics(scope)
+        token = _current.set(request)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        _in_progress += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _in_progress -= 1
+            _current.reset(token)
+
+            route = request.route
+            http_request_duration.observe(elapsed, scope["method"], route, str(status))
+            db_request_queries.observe(request.queries, route)
+            db_request_duration.observe(request.query_seconds, route)
+
+# =========================================
+# SQLALCHEMY
+# =========================================
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_query(conn, statement)
+
+
+def _handle_error(exception_context):
+    # `cursor` nem sempre é definido no contexto (ex.: erro de constraint num INSERT do ORM)
+    if exception_context.connection is not None and getattr(exception_context, "cursor", None) is not None:
+        _record_query(exception_context.connection, exception_context.statement or "")
+
+
+def _record_query(conn, statement: str):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    request = _current.get()
+    route = request.route if request is not None else NO_ROUTE
+    if request is not None:
+        request.queries += 1
+        request.query_seconds += elapsed
+
+    db_query_duration.observe(elapsed, route)
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        db_slow_queries.inc(route)
+        slow_query_logger.warning(
+            "consulta lenta (%.1f ms) em %s: %s", elapsed * 1000, route, " ".join(statement.split())[:1000],
+        )
+
+
+_timed_pools = {}
+
+
+def _timed_pool_class(pool_class, engine_name: str):
+    """Subclasse do pool que cronometra `_do_get` (espera na fila + conexão nova)."""
+    key = (pool_class, engine_name)
+    timed = _timed_pools.get(key)
+    if timed is None:
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super(timed, self)._do_get()
+            finally:
+                db_pool_wait.observe(time.perf_counter() - start, engine_name, current_route())
+
+        timed = _timed_pools[key] = type(f"Timed{pool_class.__name__}", (pool_class,), {"_do_get": _do_get})
+    return timed
+
+
+def instrument_engine(engine, name: str):
+    """
+    Liga as métricas num Engine síncrono (para o AsyncEngine, passar
+    `async_engine.sync_engine`). `name` vira o rótulo `engine` do pool.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+    # Trocar a classe (em vez de envolver o método) sobrevive a `pool.recreate()`,
+    # que o `engine.dispose()` usa para criar o pool novo
+    engine.pool.__class__ = _timed_pool_class(type(engine.pool), name)
+    _engines[name] = engine
@@ -0,0 +1,64 @@
+"""
+Paginação por keyset (id crescente) com cursores opacos.
+
+O cursor é o último `id` da página codificado em base64 url-safe; a próxima
+página é `WHERE id > :id ORDER BY id LIMIT :limit`, que continua sendo um
+range scan no índice por maior que seja a tabela (ao contrário de OFFSET).
+"""
+import base64
+import json
+from typing import Iterable, List, Optional
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidPageParams(ValueError):
+    """Cursor ou lista de campos inválidos."""
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["id"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidPageParams("Cursor inválido.") from exc
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> List[str]:
+    """
+    Converte `fields=id,pergunta` na lista de colunas a selecionar.
+    O `id` é sempre incluído porque é a chave do cursor.
+    """
+    allowed = list(allowed)
+    if not fields:
+        return allowed
+
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    invalid = [f for f in requested if f not in allowed]
+    if invalid:
+        raise InvalidPageParams(f"Campos inválidos: {', '.join(invalid)}.")
+
+    return ["id"] + [f for f in requested if f != "id"]
+
+
+def paginate(query, id_column, limit: int, cursor: Optional[str]):
+    """
+    Aplica o keyset a uma query de colunas (não de entidades).
+    Retorna (linhas como dict, próximo cursor ou None).
+    """
+    if cursor:
+        query = query.filter(id_column > decode_cursor(cursor))
+
+    rows = query.order_by(id_column).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = [dict(row._mapping) for row in rows]
+    next_cursor = encode_cursor(items[-1]["id"]) if has_more and items else None
+    return items, next_cursor
@@ -0,0 +1,139 @@
+"""
+Limite de requisições com token buckets.
+
+Cada regra (`Rule`) tem uma capacidade (rajada) e uma taxa de reposição;
+cada chave (IP, email, id do usuário) tem o próprio balde. As rotas chamam
+`rate_limiter.hit(regra, chave)`, que levanta `RateLimitExceeded` quando o
+balde está vazio; o app converte em 429 com Retry-After.
+
+O estado fica num `RateLimitBackend`:
+  - `MemoryBackend` (padrão): por processo, com os baldes divididos em
+    shards, cada um com o próprio lock, para não serializar os workers do
+    threadpool numa trava só. Serve para um único nó (com N workers, o
+    limite efetivo é N vezes o configurado);
+  - para vários nós, RATE_LIMIT_BACKEND="pacote.modulo:fabrica" aponta para
+    uma implementação com armazenamento compartilhado (ex.: Redis com o
+    mesmo algoritmo num script Lua), que só precisa implementar `acquire`.
+"""
+import importlib
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Hashable
+
+from app.config import (
+    RATE_LIMIT_AUTH_EMAIL,
+    RATE_LIMIT_AUTH_IP,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_WRITES,
+)
+
+
+class RateLimitExceeded(Exception):
+    """O balde da chave está vazio; `retry_after` em segundos (inteiro)."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(retry_after)
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    burst: int
+    rate: float  # fichas repostas por segundo
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> "Rule":
+        """"30/60" -> até 30 requisições seguidas, repondo 30 a cada 60 s."""
+        amount, _, seconds = spec.partition("/")
+        burst = int(amount)
+        return cls(name=name, burst=burst, rate=burst / float(seconds or 1))
+
+
+class RateLimitBackend:
+    """Interface dos armazenamentos de baldes."""
+
+    def acquire(self, key: Hashable, rule: Rule) -> float:
+        """
+        Consome uma ficha do balde `key`. Retorna 0 se havia ficha, ou os
+        segundos até a próxima ficha ficar disponível.
+        """
+        raise NotImplementedError
+
+
+class MemoryBackend(RateLimitBackend):
+
+    def __init__(self, shards: int = 64, max_keys_per_shard: int = 10_000):
+        # Quantidade de shards potência de 2: o índice sai de uma máscara
+        self._mask = (1 << max(0, shards - 1).bit_length()) - 1
+        self._locks = [threading.Lock() for _ in range(self._mask + 1)]
+        self._buckets = [{} for _ in range(self._mask + 1)]
+        self.max_keys_per_shard = max_keys_per_shard
+
+    def acquire(self, key, rule):
+        index = hash(key) & self._mask
+        buckets = self._buckets[index]
+        now = time.monotonic()
+
+        with self._locks[index]:
+            bucket = buckets.get(key)
+            if bucket is None:
+                if len(buckets) >= self.max_keys_per_shard:
+                    self._evict(buckets, now)
+                # [fichas, instante da última atualização, regra]
+                buckets[key] = [rule.burst - 1, now, rule]
+                return 0.0
+
+            tokens = min(rule.burst, bucket[0] + (now - bucket[1]) * rule.rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return 0.0
+            bucket[0] = tokens
+            return (1 - tokens) / rule.rate
+
+    def _evict(self, buckets: dict, now: float):
+        # Baldes que já estariam cheios equivalem a não ter balde
+        full = [
+            key for key, (tokens, updated_at, rule) in buckets.items()
+            if tokens + (now - updated_at) * rule.rate >= rule.burst
+        ]
+        for key in full:
+            del buckets[key]
+        # Muitas chaves ativas (ex.: ataque de vários IPs): descarta as mais antigas
+        if len(buckets) >= self.max_keys_per_shard:
+            for key in list(buckets)[:len(buckets) // 2]:
+                del buckets[key]
+
+
+class RateLimiter:
+
+    def __init__(self, backend: RateLimitBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+
+    def hit(self, rule: Rule, identifier: Hashable):
+        if not self.enabled:
+            return
+        wait = self.backend.acquire((rule.name, identifier), rule)
+        if wait > 0:
+            raise RateLimitExceeded(wait)
+
+
+def load_backend(spec: str) -> RateLimitBackend:
+    """"memory" ou "pacote.modulo:fabrica" (chamável sem argumentos)."""
+    if spec == "memory":
+        return MemoryBackend()
+    module_name, _, attribute = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)()
+
+
+# Regras usadas pelas rotas (ver app/config.py)
+AUTH_IP = Rule.parse("auth-ip", RATE_LIMIT_AUTH_IP)
+AUTH_EMAIL = Rule.parse("auth-email", RATE_LIMIT_AUTH_EMAIL)
+WRITES = Rule.parse("writes", RATE_LIMIT_WRITES)
+
+rate_limiter = RateLimiter(load_backend(RATE_LIMIT_BACKEND), enabled=RATE_LIMIT_ENABLED)
@@ -1,38 +1,46 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from jose import jwt
+from typing import Optional
+
+from jose import JWTError, jwt
+
+from app.config import BCRYPT_ROUNDS
 
 SECRET_KEY = "troque_por_uma_chave_secreta_forte"
 ALGORITHM = "HS256"
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7
 
+# Token da sessão de estudo (GET /study/session/{deck_id})
+STUDY_SESSION_TYPE = "study_session"
+STUDY_SESSION_EXPIRE_MINUTES = 60 * 24
+
+# min_rounds faz com que hashes gerados com custo menor sejam
+# marcados para atualização em verify_and_update_password
 pwd_context = CryptContext(
     schemes=["bcrypt"],
-    deprecated="auto"
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
 )
 
-def hash_password(password: str) -> str:
-    """
-    Gera hash seguro usando bcrypt.
-    Mantém truncamento manual de 72 bytes,
-    mas NÃO passa bytes para o Passlib,
-    porque o Passlib já faz isso internamente.
-    """
 
-    # 1 — converter para bytes
+def _truncate(password: str) -> str:
+    """Trunca para os 72 bytes aceitos pelo bcrypt e volta para string."""
     raw_bytes = password.encode("utf-8")
 
-    # 2 — truncar para os 72 bytes permitidos pelo bcrypt
     if len(raw_bytes) > 72:
         raw_bytes = raw_bytes[:72]
 
-    # 3 — converter de volta para string para o Passlib trabalhar corretamente
-    #     (Passlib gera os bytes internamente no backend certo)
-    safe_password = raw_bytes.decode("utf-8", errors="ignore")
+    return raw_bytes.decode("utf-8", errors="ignore")
 
-    # 4 — gerar hash
-    return pwd_context.hash(safe_password)
+def hash_password(password: str) -> str:
+    """
+    Gera hash seguro usando bcrypt.
+    Trunca para 72 bytes (`_truncate`), mas NÃO passa bytes para o
+    Passlib, porque ele gera os bytes internamente no backend certo.
+    """
+    return pwd_context.hash(_truncate(password))
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -41,15 +49,15 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Usamos o mesmo esquema: truncar e passar string normal
     para o Passlib; ele converte internamente.
     """
+    return pwd_context.verify(_truncate(plain_password), hashed_password)
 
-    raw_bytes = plain_password.encode("utf-8")
 
-    if len(raw_bytes) > 72:
-        raw_bytes = raw_bytes[:72]
-
-    safe_password = raw_bytes.decode("utf-8", errors="ignore")
-
-    return pwd_context.verify(safe_password, hashed_password)
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """
+    Verifica a senha e, se o hash usar um custo antigo, gera um novo.
+    Retorna (válida, novo_hash ou None).
+    """
+    return pwd_context.verify_and_update(_truncate(plain_password), hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
@@ -67,5 +75,26 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def create_study_session_token(user_id: int, deck_id: int) -> str:
+    """
+    Token de uma sessão de estudo, devolvido pelo app junto com as respostas
+    (POST /reviews/batch). Não tem `sub`, então não vale como token de acesso.
+    """
+    expire = datetime.utcnow() + timedelta(minutes=STUDY_SESSION_EXPIRE_MINUTES)
+    payload = {"typ": STUDY_SESSION_TYPE, "uid": user_id, "deck": deck_id, "exp": expire}
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def read_study_session_token(token: str, user_id: int) -> Optional[int]:
+    """Deck da sessão, ou None se o token for inválido, expirado ou de outro usuário."""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("typ") != STUDY_SESSION_TYPE or payload.get("uid") != user_id:
+        return None
+    return payload.get("deck")
+
+
 # Compatibilidade
 get_password_hash = hash_password
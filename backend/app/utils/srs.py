@@ -0,0 +1,74 @@
+"""
+Agendamento de revisões no estilo SM-2.
+
+Cada resposta do usuário vira uma nota de qualidade (0–5). Respostas
+corretas aumentam o intervalo multiplicando pelo fator de facilidade
+(`ease`); erros zeram as repetições, contam um lapso e trazem o card de
+volta em poucos minutos.
+"""
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Optional
+
+# Avaliações aceitas (as mesmas usadas pelos botões da tela de estudo)
+RATINGS = {
+    "errei": 1,
+    "dificil": 3,
+    "facil": 4,
+    "muito-facil": 5,
+}
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+# Teto do intervalo entre revisões (evita estourar o limite de datas)
+MAX_INTERVAL_DAYS = 36500.0
+
+# Atraso até rever um card errado
+RELEARN_DELAY = timedelta(minutes=10)
+
+
+@dataclass(frozen=True)
+class ReviewState:
+    ease: float = DEFAULT_EASE
+    interval_days: float = 0.0
+    repetitions: int = 0
+    lapses: int = 0
+    due_at: Optional[datetime] = None
+    last_reviewed_at: Optional[datetime] = None
+
+
+def schedule(state: ReviewState, rating: str, now: datetime) -> ReviewState:
+    """Calcula o novo estado do card após uma resposta."""
+    quality = RATINGS[rating]
+
+    ease = state.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    ease = max(MIN_EASE, round(ease, 4))
+
+    if quality < 3:
+        return replace(
+            state,
+            ease=ease,
+            interval_days=0.0,
+            repetitions=0,
+            lapses=state.lapses + 1,
+            due_at=now + RELEARN_DELAY,
+            last_reviewed_at=now,
+        )
+
+    repetitions = state.repetitions + 1
+    if repetitions == 1:
+        interval = 1.0
+    elif repetitions == 2:
+        interval = 6.0
+    else:
+        interval = min(MAX_INTERVAL_DAYS, round(max(state.interval_days, 1.0) * ease, 2))
+
+    return replace(
+        state,
+        ease=ease,
+        interval_days=interval,
+        repetitions=repetitions,
+        due_at=now + timedelta(days=interval),
+        last_reviewed_at=now,
+    )
@@ -0,0 +1,85 @@
+"""
+Escritas que já devolvem as linhas gravadas, sem SELECT depois do commit.
+
+Com o ORM, criar ou editar um registro custa um `db.add`/`setattr`, o
+flush, o commit e um `db.refresh()` (mais um SELECT só para ler de volta o
+que acabou de ser gravado). Aqui as escritas são comandos Core:
+
+  - `insert_row`: os defaults do Python dos modelos (criado_em, versao, ...)
+    são calculados antes e enviados no INSERT. A chave e os defaults do
+    servidor vêm de INSERT ... RETURNING quando o dialeto suporta (SQLite,
+    PostgreSQL, MariaDB); no MySQL a chave vem de `lastrowid` e o resto é o
+    que foi enviado;
+  - `update_returning`: UPDATE ... WHERE (id e dono, por exemplo) RETURNING,
+    que também serve de verificação de propriedade: None se nenhuma linha
+    casou. No MySQL, o UPDATE e um SELECT pela mesma condição, só quando
+    alguma linha mudou.
+
+As funções não fazem commit.
+"""
+from typing import Optional, Sequence
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+
+def _dialect(db: Session, model):
+    # Pelo modelo: com shards, cada tabela pode estar num banco
+    return db.get_bind(model).dialect
+
+
+def with_python_defaults(table, values: dict) -> dict:
+    """`values` completado com os defaults do Python das colunas ausentes."""
+    row = dict(values)
+    for column in table.columns:
+        default = column.default
+        if column.key in row or default is None or column.primary_key:
+            continue
+        if default.is_scalar:
+            row[column.key] = default.arg
+        elif default.is_callable:
+            row[column.key] = default.arg(None)
+    return row
+
+
+def insert_row(db: Session, model, values: dict) -> dict:
+    """INSERT de uma linha; retorna todas as colunas da tabela."""
+    table = model.__table__
+    row = with_python_defaults(table, values)
+    statement = insert(model).values(row)
+
+    if _dialect(db, model).insert_returning:
+        return dict(db.execute(statement.returning(*table.columns)).mappings().one())
+
+    missing = [
+        column.key for column in table.columns
+        if column.key not in row and not column.primary_key and column.server_default is not None
+    ]
+    if missing:
+        # Sem RETURNING não há como saber os defaults do servidor
+        raise ValueError(f"{table.name}: informe {', '.join(missing)} (só têm default no servidor).")
+    result = db.execute(statement)
+    # Colunas omitidas sem default nenhum ficaram NULL
+    return {
+        **{column.key: None for column in table.columns},
+        **row,
+        **dict(zip(table.primary_key.columns.keys(), result.inserted_primary_key)),
+    }
+
+
+def update_returning(db: Session, model, where: Sequence, values: dict, columns: Optional[Sequence] = None) -> Optional[dict]:
+    """
+    UPDATE das linhas que satisfazem `where`; retorna as `columns` (padrão:
+    todas) da primeira linha alterada, ou None se nenhuma casou. A condição
+    não deve depender das colunas alteradas (no MySQL ela é repetida no SELECT).
+    """
+    columns = list(columns or model.__table__.columns)
+    statement = update(model).where(*where).values(values).execution_options(synchronize_session=False)
+
+    if _dialect(db, model).update_returning:
+        row = db.execute(statement.returning(*columns)).mappings().first()
+        return dict(row) if row is not None else None
+
+    if db.execute(statement).rowcount == 0:
+        return None
+    return dict(db.execute(select(*columns).where(*where)).mappings().first())
@@ -0,0 +1,130 @@
+"""
+Aquecimento de cada worker e estado das sondas de saúde.
+
+No startup (lifespan) cada worker abre as conexões dos pools e sobe as threads
+do bcrypt antes de aceitar tráfego, para que as primeiras requisições não
+paguem a conexão com o banco nem o carregamento do passlib. GET /health/ready
+só responde 200 depois disso.
+
+A verificação do banco da sonda de prontidão fica em cache por
+HEALTH_DB_CHECK_SECONDS: sondas frequentes não viram uma consulta cada.
+"""
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app import database
+from app.config import HEALTH_DB_CHECK_SECONDS
+from app.utils.hasher import password_hasher
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessState:
+
+    def __init__(self, db_check_interval: float = HEALTH_DB_CHECK_SECONDS):
+        self.warmed_up = False
+        self.shutting_down = False
+        self.db_check_interval = db_check_interval
+        self._db_ok = False
+        self._db_checked_at = None
+        self._lock = None
+
+    async def database_ok(self) -> bool:
+        """Resultado do último SELECT 1, refeito quando passar do intervalo."""
+        if self._db_checked_at is not None and time.monotonic() - self._db_checked_at < self.db_check_interval:
+            return self._db_ok
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Outra sonda pode ter verificado enquanto esta esperava
+            if self._db_checked_at is None or time.monotonic() - self._db_checked_at >= self.db_check_interval:
+                self._db_ok = await _ping()
+                self._db_checked_at = time.monotonic()
+        return self._db_ok
+
+
+state = ReadinessState()
+
+
+def _sync_engines():
+    engines = (database.engine, database.read_engine, *database.shard_engines, *database.read_shard_engines)
+    return list(dict.fromkeys(engine for engine in engines if engine is not None))
+
+
+def _async_engines():
+    engines = (
+        database.async_engine, database.async_read_engine,
+        *database.async_shard_engines, *database.async_read_shard_engines,
+    )
+    return list(dict.fromkeys(engine for engine in engines if engine is not None))
+
+
+def _pool_size(engine) -> int:
+    pool = engine.pool
+    return pool.size() if hasattr(pool, "size") else 1
+
+
+def _ping_sync(engine):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+async def _ping() -> bool:
+    """SELECT 1 no primário (o engine usado pelas escritas)."""
+    try:
+        if database.async_engine is not None:
+            async with database.async_engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+        else:
+            await run_in_threadpool(_ping_sync, database.engine)
+        return True
+    except Exception:
+        logger.warning("health: banco indisponível", exc_info=True)
+        return False
+
+
+def _fill_pool_sync(engine):
+    connections = []
+    try:
+        for _ in range(_pool_size(engine)):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        # Devolvidas ao pool, continuam abertas para as próximas requisições
+        for connection in connections:
+            connection.close()
+
+
+async def _fill_pool_async(engine):
+    connections = []
+    try:
+        for _ in range(_pool_size(engine)):
+            connection = await engine.connect()
+            connections.append(connection)
+            await connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            await connection.close()
+
+
+async def warm_up():
+    """Chamado no startup de cada worker, antes de aceitar conexões."""
+    started = time.perf_counter()
+    try:
+        for engine in _sync_engines():
+            await run_in_threadpool(_fill_pool_sync, engine)
+        for engine in _async_engines():
+            await _fill_pool_async(engine)
+    except Exception:
+        # Sobe mesmo assim: /health/ready fica 503 enquanto o banco não responder
+        logger.warning("warmup: falha ao abrir as conexões do pool", exc_info=True)
+
+    await password_hasher.warmup()
+    state.warmed_up = True
+    logger.info("warmup concluído em %.0f ms", (time.perf_counter() - started) * 1000)
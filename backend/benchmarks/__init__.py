@@ -0,0 +1,5 @@
+import os
+
+# Os benchmarks disparam muitas requisições de um mesmo IP/usuário de
+# propósito; o limite de requisições só atrapalharia as medições
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
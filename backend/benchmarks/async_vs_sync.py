@@ -0,0 +1,99 @@
+"""
+Compara a latência (p50/p99) dos routers no modo síncrono e no modo assíncrono
+(DB_ASYNC=1), com concorrência fixa.
+
+Cada modo roda num subprocesso próprio, porque o modo é escolhido na importação
+de app.database. Por padrão usa um SQLite temporário; para MySQL passe
+--database-url mysql+pymysql://... (o modo assíncrono usa aiomysql).
+
+Uso (a partir de backend/):
+    python -m benchmarks.async_vs_sync --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import seed, summarize
+
+
+async def drive(total: int, concurrency: int, cards: int):
+    import httpx
+    from app import database
+    from app.main import app
+
+    token, deck_id, _ = seed(cards)
+    headers = {"Authorization": f"Bearer {token}"}
+    paths = ["/decks/", f"/flashcards/deck/{deck_id}", f"/decks/{deck_id}"]
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(paths[i % len(paths)], headers=headers)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        # Aquecimento (pool de conexões e caches de autenticação)
+        await asyncio.gather(*(one(i) for i in range(concurrency)))
+        latencies.clear()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
+    return {
+        **summarize(latencies, elapsed),
+        "concurrency": concurrency,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+    }
+
+
+def run_mode(mode: str, args) -> dict:
+    env = dict(os.environ, DATABASE_URL=args.database_url, DB_ASYNC="1" if mode == "async" else "0")
+    output = subprocess.check_output(
+        [sys.executable, "-m", "benchmarks.async_vs_sync", "--worker",
+         "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+         "--cards", str(args.cards)],
+        env=env,
+    )
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--cards", type=int, default=100)
+    parser.add_argument("--database-url", default="")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = asyncio.run(drive(args.requests, args.concurrency, args.cards))
+        print(json.dumps(result))
+        return
+
+    if not args.database_url:
+        args.database_url = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+    results = {mode: run_mode(mode, args) for mode in ("sync", "async")}
+    print(json.dumps(results, indent=2))
+    print(f"{'modo':<6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<6} {r['throughput_rps']:>8} {r['p50_ms']:>8} {r['p99_ms']:>8}")
+
+
+if __name__ == "__main__":
+    main()
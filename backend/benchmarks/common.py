@@ -0,0 +1,127 @@
+"""Utilitários compartilhados pelos benchmarks."""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed=None) -> dict:
+    """p50/p95/p99 (ms) e, se `elapsed` for informado, a vazão em req/s."""
+    result = {
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+    if elapsed:
+        result["throughput_rps"] = round(len(latencies) / elapsed, 1)
+    return result
+
+
+class QueryCounter:
+    """Conta os comandos SQL enviados pelo engine usado pela aplicação."""
+
+    def __init__(self):
+        from sqlalchemy import event
+
+        from app import database
+
+        self.count = 0
+        self.engine = database.async_engine.sync_engine if database.async_engine is not None else database.engine
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def take(self) -> int:
+        """Retorna a contagem desde a última chamada e zera."""
+        count, self.count = self.count, 0
+        return count
+
+    def close(self):
+        from sqlalchemy import event
+
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def write_results(path: str, benchmark: str, args, results: dict):
+    """
+    Grava os resultados em JSON com os metadados da execução, para comparar
+    execuções com `python -m benchmarks.compare antes.json depois.json`.
+    """
+    from app import database
+
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    document = {
+        "benchmark": benchmark,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "database": database.engine.dialect.name,
+        "db_async": database.async_engine is not None,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "args": {k: v for k, v in vars(args).items() if k != "output"},
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+
+
+def default_database_url():
+    """SQLite temporário, a menos que DATABASE_URL aponte para outro banco (ex.: MySQL local)."""
+    import tempfile
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+
+SEED_CHUNK = 10_000
+
+
+def default_card(i: int):
+    return f"Pergunta {i}", f"Resposta {i}"
+
+
+def seed(cards: int, senha_hash: str = "x", make_card=default_card):
+    """
+    Cria um usuário com um deck de `cards` flashcards (texto gerado por
+    `make_card(i) -> (pergunta, resposta)`), inserindo em lotes.
+    Retorna (token, deck_id, email).
+    """
+    from app import crud
+    from app.database import Base, SessionLocal, engine
+    from app.models import Deck, Usuario
+    from app.utils.security import create_access_token
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        email = f"bench-{time.time_ns()}@estudeai.dev"
+        user = Usuario(nome="bench", email=email, senha=senha_hash)
+        db.add(user)
+        db.flush()
+        deck = Deck(usuario_id=user.id, titulo="bench")
+        db.add(deck)
+        db.flush()
+        for start in range(0, cards, SEED_CHUNK):
+            rows = []
+            for i in range(start, min(cards, start + SEED_CHUNK)):
+                pergunta, resposta = make_card(i)
+                rows.append({"deck_id": deck.id, "pergunta": pergunta, "resposta": resposta})
+            crud.bulk_insert_flashcards(db, user.id, rows)
+            db.commit()
+        return create_access_token({"sub": str(user.id)}), deck.id, email
+    finally:
+        db.close()
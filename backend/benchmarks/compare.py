@@ -0,0 +1,79 @@
+"""
+Compara dois resultados gravados com `--output` (routes, load, ...).
+
+Mostra, para cada métrica numérica presente nos dois arquivos, o valor
+antigo, o novo e a variação percentual. Latências (`*_ms`) e
+`queries_per_request` são melhores quando caem; `throughput_rps`, quando sobe.
+
+Uso (a partir de backend/):
+    python -m benchmarks.compare antes.json depois.json
+    python -m benchmarks.compare antes.json depois.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+HIGHER_IS_BETTER = ("throughput_rps",)
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    """{"decks": {"p50_ms": 1.2}} -> {"decks.p50_ms": 1.2}"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def regressed(metric: str, change: float, threshold: float) -> bool:
+    if metric.endswith(".requests") or metric == "requests":
+        return False
+    if metric.rsplit(".", 1)[-1] in HIGHER_IS_BETTER:
+        change = -change
+    return change > threshold
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=5.0, help="variação (%%) considerada regressão")
+    args = parser.parse_args()
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    if old.get("benchmark") != new.get("benchmark"):
+        sys.exit(f"Benchmarks diferentes: {old.get('benchmark')} x {new.get('benchmark')}")
+
+    print(f"{old['benchmark']}: {old.get('git_commit')} ({old.get('database')}) -> {new.get('git_commit')} ({new.get('database')})")
+    if old.get("args") != new.get("args"):
+        print("Atenção: parâmetros diferentes entre as execuções")
+
+    old_metrics = flatten(old["results"])
+    new_metrics = flatten(new["results"])
+    regressions = 0
+
+    width = max((len(name) for name in old_metrics), default=0)
+    for name, before in old_metrics.items():
+        if name not in new_metrics:
+            continue
+        after = new_metrics[name]
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ""
+        if regressed(name, change, args.threshold):
+            flag = "  <- regressão"
+            regressions += 1
+        print(f"{name:<{width}}  {before:>10}  {after:>10}  {change:+7.1f}%{flag}")
+
+    # Código de saída != 0 permite usar a comparação como verificação no CI
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
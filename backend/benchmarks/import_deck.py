@@ -0,0 +1,121 @@
+"""
+Importação de um deck grande por POST /decks/import.
+
+Gera um arquivo com `--cards` cards (CSV ou .apkg), envia em streaming para
+a rota dentro do processo e mede o tempo total, cards por segundo e o
+aumento do pico de memória residente (RSS) do processo durante a importação.
+Com o upload em arquivo temporário e a inserção em lotes, o pico não deve
+crescer com o tamanho do arquivo.
+
+Uso (a partir de backend/):
+    python -m benchmarks.import_deck --cards 100000
+    python -m benchmarks.import_deck --cards 100000 --format apkg --output import.json
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import resource
+import sqlite3
+import tempfile
+import time
+import zipfile
+
+from benchmarks.common import default_card, default_database_url, write_results
+from benchmarks.seeder import seed_dataset
+
+UPLOAD_CHUNK = 64 * 1024
+
+
+def write_csv(path: str, cards: int):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["pergunta", "resposta"])
+        for i in range(cards):
+            writer.writerow(default_card(i))
+
+
+def write_apkg(path: str, cards: int):
+    workdir = tempfile.mkdtemp()
+    collection = f"{workdir}/collection.anki2"
+    connection = sqlite3.connect(collection)
+    connection.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, flds TEXT NOT NULL)")
+    connection.executemany(
+        "INSERT INTO notes (id, flds) VALUES (?, ?)",
+        ((i + 1, "\x1f".join(f"<div>{text}</div>" for text in default_card(i))) for i in range(cards)),
+    )
+    connection.commit()
+    connection.close()
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as package:
+        package.write(collection, "collection.anki2")
+        package.writestr("media", "{}")
+
+
+async def file_chunks(path: str):
+    with open(path, "rb") as f:
+        while chunk := f.read(UPLOAD_CHUNK):
+            yield chunk
+
+
+def max_rss_mib() -> float:
+    # ru_maxrss em KiB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run(args, path):
+    import httpx
+    from app import database
+    from app.main import app
+
+    user = seed_dataset(1, 0, 0)[0]
+    headers = {"Authorization": f"Bearer {user['token']}"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        # Aquece imports e conexões com uma importação pequena
+        (await client.post("/decks/import", content=b"a,b\n", headers=headers)).raise_for_status()
+
+        rss_before = max_rss_mib()
+        started = time.perf_counter()
+        response = await client.post(
+            f"/decks/import?format={args.format}", content=file_chunks(path), headers=headers
+        )
+        elapsed = time.perf_counter() - started
+        response.raise_for_status()
+        body = response.json()
+
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
+    return {
+        "imported": body["imported"],
+        "failed": body["failed"],
+        "file_mib": round(os.path.getsize(path) / 2**20, 1),
+        "seconds": round(elapsed, 2),
+        "cards_per_second": round(body["imported"] / elapsed),
+        "peak_rss_growth_mib": round(max_rss_mib() - rss_before, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--format", choices=["csv", "apkg"], default="csv")
+    parser.add_argument("--output", help="arquivo JSON para gravar os resultados")
+    args = parser.parse_args()
+
+    default_database_url()
+    os.environ.setdefault("MAX_IMPORT_BYTES", str(1024 * 1024 * 1024))
+
+    path = f"{tempfile.mkdtemp()}/deck.{args.format}"
+    (write_apkg if args.format == "apkg" else write_csv)(path, args.cards)
+
+    results = asyncio.run(run(args, path))
+    if args.output:
+        write_results(args.output, "import_deck", args, results)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
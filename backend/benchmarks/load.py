@@ -0,0 +1,170 @@
+"""
+Teste de carga: vários usuários sintéticos fazendo uma mistura ponderada de
+leituras e escritas, com concorrência fixa, dentro do processo.
+
+Cada requisição sorteia um usuário e uma operação segundo `MIX` (ou
+`--mix leitura=peso,...`). Reporta vazão, p50/p95/p99 e comandos SQL por
+requisição no total e por operação.
+
+Uso (a partir de backend/):
+    python -m benchmarks.load --users 50 --requests 5000 --concurrency 20
+    python -m benchmarks.load --mix decks=5,deck_flashcards=3,create=1 --output load.json
+    DATABASE_URL=mysql+pymysql://... python -m benchmarks.load
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+
+from benchmarks.common import QueryCounter, default_database_url, summarize, write_results
+from benchmarks.seeder import seed_dataset
+
+# Perfil de uso do app: a maior parte é leitura das telas principais
+MIX = {
+    "decks": 30,
+    "deck_flashcards": 25,
+    "summary": 15,
+    "stats": 10,
+    "create": 10,
+    "update": 5,
+    "delete": 5,
+}
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in MIX:
+            raise argparse.ArgumentTypeError(f"operação desconhecida: {name} (use {', '.join(MIX)})")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+class Operations:
+    """Requisições de cada operação do `MIX` para um usuário semeado."""
+
+    def __init__(self, client, rng):
+        self.client = client
+        self.rng = rng
+
+    async def decks(self, user):
+        return await self.client.get("/decks/", headers=user["headers"])
+
+    async def deck_flashcards(self, user):
+        deck_id = self.rng.choice(user["deck_ids"])
+        return await self.client.get(f"/flashcards/deck/{deck_id}", headers=user["headers"])
+
+    async def summary(self, user):
+        return await self.client.get("/decks/summary", headers=user["headers"])
+
+    async def stats(self, user):
+        return await self.client.get("/users/stats", headers=user["headers"])
+
+    async def create(self, user):
+        response = await self.client.post("/flashcards/", json={
+            "deck_id": self.rng.choice(user["deck_ids"]),
+            "pergunta": "Pergunta de carga",
+            "resposta": "Resposta de carga",
+        }, headers=user["headers"])
+        if response.status_code == 201:
+            user["created"].append(response.json()["id"])
+        return response
+
+    async def update(self, user):
+        if not user["created"]:
+            return await self.create(user)
+        flashcard_id = self.rng.choice(user["created"])
+        return await self.client.put(f"/flashcards/{flashcard_id}", json={"resposta": "Editada"}, headers=user["headers"])
+
+    async def delete(self, user):
+        if not user["created"]:
+            return await self.create(user)
+        flashcard_id = user["created"].pop()
+        return await self.client.delete(f"/flashcards/{flashcard_id}", headers=user["headers"])
+
+
+async def run(args):
+    import httpx
+    from app import database
+    from app.main import app
+
+    users = seed_dataset(args.users, args.decks, args.cards)
+    for user in users:
+        user["headers"] = {"Authorization": f"Bearer {user['token']}"}
+        user["created"] = []
+
+    rng = random.Random(args.seed)
+    names = list(args.mix)
+    plan = rng.choices(names, weights=[args.mix[name] for name in names], k=args.requests)
+
+    latencies = []
+    by_operation = defaultdict(list)
+    errors = defaultdict(int)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    counter = QueryCounter()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        operations = Operations(client, rng)
+
+        async def one(name):
+            async with semaphore:
+                user = rng.choice(users)
+                start = time.perf_counter()
+                response = await getattr(operations, name)(user)
+                elapsed = time.perf_counter() - start
+                if response.status_code >= 400:
+                    errors[name] += 1
+                latencies.append(elapsed)
+                by_operation[name].append(elapsed)
+
+        counter.take()
+        started = time.perf_counter()
+        await asyncio.gather(*(one(name) for name in plan))
+        elapsed = time.perf_counter() - started
+        queries = counter.take()
+
+    counter.close()
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
+    # A contagem de SQL é global (requisições concorrentes se misturam), por
+    # isso só a média geral é reportada
+    return {
+        "total": {
+            **summarize(latencies, elapsed),
+            "queries_per_request": round(queries / len(latencies), 2),
+            "errors": sum(errors.values()),
+        },
+        "operations": {
+            name: {**summarize(values), "errors": errors[name]}
+            for name, values in sorted(by_operation.items())
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--decks", type=int, default=5)
+    parser.add_argument("--cards", type=int, default=100, help="flashcards por deck")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--mix", type=parse_mix, default=MIX, help="ex.: decks=5,create=1")
+    parser.add_argument("--seed", type=int, default=0, help="semente do sorteio das operações")
+    parser.add_argument("--output", help="arquivo JSON para gravar os resultados")
+    args = parser.parse_args()
+
+    default_database_url()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        write_results(args.output, "load", args, results)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Mede a latência das leituras de decks/flashcards durante uma rajada de logins.
+
+Fase 1: só leituras, com concorrência fixa.
+Fase 2: as mesmas leituras enquanto `--logins` clientes fazem login sem parar.
+Com o bcrypt no pool dedicado (app.utils.hasher) o p50/p99 das leituras deve
+ficar praticamente igual nas duas fases; logins além da fila recebem 503.
+
+Uso (a partir de backend/):
+    python -m benchmarks.login_storm --reads 1000 --concurrency 20 --logins 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.common import seed, summarize
+
+SENHA = "senha-benchmark"
+
+
+async def read_phase(client, headers, paths, total, concurrency):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(paths[i % len(paths)], headers=headers)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def login_storm(client, email, clients, stop: asyncio.Event):
+    counts = {"ok": 0, "busy": 0}
+
+    async def worker():
+        while not stop.is_set():
+            response = await client.post("/auth/login", json={"email": email, "senha": SENHA})
+            if response.status_code == 503:
+                counts["busy"] += 1
+                await asyncio.sleep(float(response.headers.get("Retry-After", "1")) / 10)
+            else:
+                response.raise_for_status()
+                counts["ok"] += 1
+
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return counts
+
+
+async def run(args):
+    import httpx
+    from app import database
+    from app.main import app
+    from app.utils.security import hash_password
+
+    token, deck_id, email = seed(args.cards, hash_password(SENHA))
+    headers = {"Authorization": f"Bearer {token}"}
+    paths = ["/decks/", f"/flashcards/deck/{deck_id}"]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        # Aquecimento
+        await read_phase(client, headers, paths, args.concurrency, args.concurrency)
+
+        baseline = await read_phase(client, headers, paths, args.reads, args.concurrency)
+
+        stop = asyncio.Event()
+        storm = asyncio.create_task(login_storm(client, email, args.logins, stop))
+        await asyncio.sleep(0.2)
+        during = await read_phase(client, headers, paths, args.reads, args.concurrency)
+        stop.set()
+        logins = await storm
+
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
+    return {"baseline": baseline, "login_storm": during, "logins": logins}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reads", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=50, help="clientes fazendo login em paralelo")
+    parser.add_argument("--cards", type=int, default=100)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark do caminho de leitura das listagens de flashcards.
+
+Compara, para um deck com `--cards` flashcards:
+  - orm:  objetos Flashcard pelo ORM -> FlashcardOut.model_validate ->
+          validação do response_model -> jsonable_encoder -> json.dumps
+          (o que a rota fazia antes);
+  - fast: só as colunas, em tuplas -> TypeAdapter.dump_json
+          (crud.list_deck_flashcards, ver app/utils/fast_json.py).
+
+Mede tempo de CPU por linha (melhor de `--repeat` execuções) e o pico de
+memória alocada (tracemalloc) numa execução separada.
+
+Uso (a partir de backend/):
+    python -m benchmarks.read_path --cards 10000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+
+def orm_path(db, deck_id, user_id) -> bytes:
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+
+    from app import crud
+    from app.models import Flashcard
+    from app.schemas import FlashcardOut
+
+    crud.check_deck_ownership(db, deck_id, user_id)
+    flashcards = db.query(Flashcard).filter(Flashcard.deck_id == deck_id).all()
+    result = [FlashcardOut.model_validate(f) for f in flashcards]
+    # O FastAPI valida de novo contra o response_model antes de codificar
+    validated = TypeAdapter(List[FlashcardOut]).validate_python(result, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_path(db, deck_id, user_id) -> bytes:
+    from app import crud
+
+    return crud.list_deck_flashcards(db, deck_id, user_id)
+
+
+def measure(fn, args, cards):
+    from app.database import SessionLocal
+
+    best = None
+    for _ in range(args.repeat):
+        db = SessionLocal()
+        try:
+            t0 = time.process_time()
+            body = fn(db, args.deck_id, args.user_id)
+            elapsed = time.process_time() - t0
+        finally:
+            db.close()
+        best = elapsed if best is None else min(best, elapsed)
+
+    db = SessionLocal()
+    try:
+        tracemalloc.start()
+        fn(db, args.deck_id, args.user_id)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        db.close()
+
+    return {
+        "cpu_ms": round(best * 1000, 1),
+        "cpu_us_per_row": round(best / cards * 1e6, 2),
+        "peak_mib": round(peak / 2**20, 2),
+        "bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+    from jose import jwt
+
+    from app.utils.security import ALGORITHM, SECRET_KEY
+    from benchmarks.common import seed
+
+    token, args.deck_id, _ = seed(args.cards)
+    args.user_id = int(jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])["sub"])
+
+    orm = measure(orm_path, args, args.cards)
+    fast = measure(fast_path, args, args.cards)
+    print(json.dumps({
+        "cards": args.cards,
+        "orm": orm,
+        "fast": fast,
+        "cpu_speedup": round(orm["cpu_ms"] / fast["cpu_ms"], 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Teste de carga do envio de respostas de estudo.
+
+Envia `--events` respostas de duas formas e compara a vazão:
+  - lote:      POST /reviews/batch com `--batch-size` eventos por requisição;
+  - unitário:  um POST /study/review por resposta, com `--concurrency` em paralelo.
+
+Uso (a partir de backend/):
+    python -m benchmarks.reviews_load --events 10000 --batch-size 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from benchmarks.common import seed, summarize
+
+RATINGS = ["errei", "dificil", "facil", "muito-facil"]
+
+
+def make_events(total, card_ids):
+    start = datetime.utcnow() - timedelta(days=1)
+    return [
+        {
+            "card_id": random.choice(card_ids),
+            "rating": random.choice(RATINGS),
+            "answered_at": (start + timedelta(seconds=i)).isoformat(),
+            "client_event_id": uuid.uuid4().hex,
+        }
+        for i in range(total)
+    ]
+
+
+async def run_batched(client, headers, events, batch_size):
+    latencies = []
+    started = time.perf_counter()
+    for i in range(0, len(events), batch_size):
+        t0 = time.perf_counter()
+        response = await client.post("/reviews/batch", json={"events": events[i:i + batch_size]}, headers=headers)
+        latencies.append(time.perf_counter() - t0)
+        response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    return {**summarize(latencies), "events": len(events), "events_per_s": round(len(events) / elapsed, 1)}
+
+
+async def run_single(client, headers, events, concurrency):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(event):
+        async with semaphore:
+            t0 = time.perf_counter()
+            response = await client.post("/study/review", json={
+                "flashcard_id": event["card_id"],
+                "rating": event["rating"],
+                "answered_at": event["answered_at"],
+            }, headers=headers)
+            latencies.append(time.perf_counter() - t0)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(e) for e in events))
+    elapsed = time.perf_counter() - started
+    return {**summarize(latencies), "events": len(events), "events_per_s": round(len(events) / elapsed, 1)}
+
+
+async def run(args):
+    import httpx
+    from app import database
+    from app.main import app
+
+    token, deck_id, _ = seed(args.cards)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        cards = (await client.get(f"/flashcards/deck/{deck_id}?fields=id&limit=200", headers=headers)).json()
+        card_ids = [c["id"] for c in cards["items"]]
+
+        batched = await run_batched(client, headers, make_events(args.events, card_ids), args.batch_size)
+        single = await run_single(client, headers, make_events(args.events, card_ids), args.concurrency)
+
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
+    return {"batch": batched, "single": single}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--cards", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark das rotas mais usadas, uma de cada vez, dentro do processo.
+
+Para cada rota faz `--iterations` requisições sequenciais (após aquecer) e
+reporta p50/p95/p99 e a média de comandos SQL por requisição:
+login, GET /decks/, GET /flashcards/deck/{id}, GET /users/stats e
+criação/edição/remoção de flashcard.
+
+Uso (a partir de backend/):
+    python -m benchmarks.routes --iterations 200 --output routes.json
+    DATABASE_URL=mysql+pymysql://... python -m benchmarks.routes
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import QueryCounter, default_database_url, summarize, write_results
+from benchmarks.seeder import SENHA, seed_dataset
+
+WARMUP = 5
+
+
+async def bench(client, counter, iterations, make_request):
+    """
+    `make_request(i)` devolve a corrotina da i-ésima requisição; o aquecimento
+    usa os primeiros índices, então cada índice é usado uma única vez.
+    """
+    for i in range(WARMUP):
+        (await make_request(i)).raise_for_status()
+
+    latencies = []
+    counter.take()
+    for i in range(iterations):
+        start = time.perf_counter()
+        response = await make_request(WARMUP + i)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+
+    return {**summarize(latencies), "queries_per_request": round(counter.take() / iterations, 2)}
+
+
+async def run(args):
+    import httpx
+    from app import database
+    from app.main import app
+
+    user = seed_dataset(1, args.decks, args.cards)[0]
+    headers = {"Authorization": f"Bearer {user['token']}"}
+    deck_id = user["deck_ids"][0]
+    counter = QueryCounter()
+    results = {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        get = lambda path: lambda i: client.get(path, headers=headers)
+
+        # Login usa bcrypt com o custo configurado: poucas iterações bastam
+        results["login"] = await bench(
+            client, counter, max(1, args.iterations // 10),
+            lambda i: client.post("/auth/login", json={"email": user["email"], "senha": SENHA})
+        )
+        results["decks"] = await bench(client, counter, args.iterations, get("/decks/"))
+        results["deck_flashcards"] = await bench(client, counter, args.iterations, get(f"/flashcards/deck/{deck_id}"))
+        results["stats"] = await bench(client, counter, args.iterations, get("/users/stats"))
+
+        created = []
+
+        async def create(i):
+            response = await client.post("/flashcards/", json={
+                "deck_id": deck_id, "pergunta": f"Nova pergunta {i}", "resposta": "Nova resposta"
+            }, headers=headers)
+            if response.status_code == 201:
+                created.append(response.json()["id"])
+            return response
+
+        results["flashcard_create"] = await bench(client, counter, args.iterations, create)
+        results["flashcard_update"] = await bench(
+            client, counter, args.iterations,
+            lambda i: client.put(f"/flashcards/{created[i]}", json={"resposta": f"Editada {i}"}, headers=headers)
+        )
+        results["flashcard_delete"] = await bench(
+            client, counter, args.iterations,
+            lambda i: client.delete(f"/flashcards/{created[i]}", headers=headers)
+        )
+
+    counter.close()
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--decks", type=int, default=10)
+    parser.add_argument("--cards", type=int, default=200, help="flashcards por deck")
+    parser.add_argument("--output", help="arquivo JSON para gravar os resultados")
+    args = parser.parse_args()
+
+    default_database_url()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        write_results(args.output, "routes", args, results)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
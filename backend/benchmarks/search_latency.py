@@ -0,0 +1,108 @@
+"""
+Latência da busca textual (GET /flashcards/search).
+
+Semeia `--cards` flashcards com frases geradas a partir de um vocabulário
+sintético com acentos (frequências de Zipf) e mede p50/p99 de buscas por
+palavra inteira, por prefixo (busca enquanto digita) e por duas palavras,
+sempre digitadas sem acentos.
+
+Uso (a partir de backend/):
+    python -m benchmarks.search_latency --cards 1000000
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import tempfile
+import time
+import unicodedata
+
+from benchmarks.common import seed, summarize
+
+SYLLABLES = [
+    "ca", "fé", "ção", "mi", "tô", "ra", "lu", "pé", "ni", "sá", "bo", "lê",
+    "tri", "gên", "co", "dá", "vi", "nú", "so", "qui", "mé", "ta", "ri", "ú",
+]
+
+
+def build_vocabulary(size: int, rng: random.Random):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+# Vocabulário com frequências de Zipf, como num texto real: poucas palavras
+# muito comuns e uma cauda longa de palavras raras
+VOCABULARY = build_vocabulary(20_000, random.Random(42))
+CUM_WEIGHTS = list(itertools.accumulate(1 / rank for rank in range(1, len(VOCABULARY) + 1)))
+
+
+def strip_accents(word: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFD", word) if unicodedata.category(c) != "Mn")
+
+
+def make_card(i: int):
+    rng = random.Random(i)
+    return (
+        " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=6)) + "?",
+        " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=12)) + ".",
+    )
+
+
+def make_queries(total: int):
+    rng = random.Random(0)
+    pick = lambda: strip_accents(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS)[0])
+    kinds = {
+        "palavra": pick,
+        "prefixo": lambda: pick()[:4],
+        "duas_palavras": lambda: f"{pick()} {pick()}",
+    }
+    return {kind: [make() for _ in range(total)] for kind, make in kinds.items()}
+
+
+async def run(args):
+    import httpx
+    from app import database
+    from app.main import app
+
+    started = time.perf_counter()
+    token, _, _ = seed(args.cards, make_card=make_card)
+    seed_seconds = round(time.perf_counter() - started, 1)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    results = {"cards": args.cards, "seed_s": seed_seconds}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        for kind, queries in make_queries(args.queries).items():
+            latencies, hits = [], 0
+            for q in queries:
+                t0 = time.perf_counter()
+                response = await client.get("/flashcards/search", params={"q": q, "limit": args.limit}, headers=headers)
+                latencies.append(time.perf_counter() - t0)
+                response.raise_for_status()
+                hits += len(response.json()["items"])
+            results[kind] = {**summarize(latencies), "avg_hits": round(hits / len(queries), 1)}
+
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
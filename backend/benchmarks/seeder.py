@@ -0,0 +1,96 @@
+"""
+Gerador de dados sintéticos: `--users` usuários × `--decks` decks ×
+`--cards` flashcards, gravados direto pelos modelos (sem passar pelas rotas).
+
+Cada usuário recebe a senha `SENHA` (um único hash bcrypt reaproveitado), o
+estado de revisão dos cards e a linha de estatísticas já preenchida, como se
+tivesse sido criado pela API.
+
+Uso (a partir de backend/):
+    python -m benchmarks.seeder --users 100 --decks 10 --cards 100
+    DATABASE_URL=mysql+pymysql://... python -m benchmarks.seeder --users 1000
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from benchmarks.common import SEED_CHUNK, default_card, default_database_url
+
+SENHA = "senha-benchmark"
+
+
+def seed_dataset(users: int, decks: int, cards: int, senha: str = SENHA, make_card=default_card) -> List[dict]:
+    """
+    Cria os dados e retorna, por usuário, {id, email, token, deck_ids}.
+    Os emails levam um prefixo único, então várias execuções podem
+    compartilhar o mesmo banco.
+    """
+    from app import crud
+    from app.database import Base, SessionLocal, engine
+    from app.models import Deck, EstatisticaUsuario, Usuario
+    from app.utils.security import create_access_token, hash_password
+
+    Base.metadata.create_all(engine)
+    senha_hash = hash_password(senha)
+    run_id = time.time_ns()
+    created = []
+
+    db = SessionLocal()
+    try:
+        for u in range(users):
+            user = Usuario(nome=f"bench {u}", email=f"bench-{run_id}-{u}@estudeai.dev", senha=senha_hash)
+            db.add(user)
+            db.flush()
+
+            user_decks = [Deck(usuario_id=user.id, titulo=f"Deck {d}") for d in range(decks)]
+            db.add_all(user_decks)
+            db.flush()
+
+            rows = [
+                {"deck_id": deck.id, "pergunta": pergunta, "resposta": resposta}
+                for deck in user_decks
+                for pergunta, resposta in map(make_card, range(cards))
+            ]
+            for start in range(0, len(rows), SEED_CHUNK):
+                crud.bulk_insert_flashcards(db, user.id, rows[start:start + SEED_CHUNK])
+
+            db.add(EstatisticaUsuario(usuario_id=user.id, total_decks=decks, total_cards=decks * cards))
+            db.commit()
+
+            created.append({
+                "id": user.id,
+                "email": user.email,
+                "token": create_access_token({"sub": str(user.id)}),
+                "deck_ids": [deck.id for deck in user_decks],
+            })
+    finally:
+        db.close()
+
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--decks", type=int, default=5)
+    parser.add_argument("--cards", type=int, default=100, help="flashcards por deck")
+    args = parser.parse_args()
+
+    default_database_url()
+
+    from app.database import engine
+
+    started = time.perf_counter()
+    users = seed_dataset(args.users, args.decks, args.cards)
+    print(json.dumps({
+        "database": engine.url.render_as_string(hide_password=True),
+        "users": len(users),
+        "decks": args.users * args.decks,
+        "flashcards": args.users * args.decks * args.cards,
+        "seconds": round(time.perf_counter() - started, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
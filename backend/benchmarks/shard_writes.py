@@ -0,0 +1,152 @@
+"""
+Vazão de escritas conforme o número de shards.
+
+`--writers` processos (como os workers de `python -m app.serve`), cada um
+com um usuário, espalhados igualmente pelos shards, criam decks com
+`--cards` flashcards (uma transação por deck, pelo mesmo `crud.create_deck`
+da rota POST /decks). Cada quantidade de shards roda num subprocesso
+próprio, porque os shards são lidos na importação de app.database.
+
+Cada shard é um arquivo SQLite, que aceita um escritor por vez: com um
+único banco as escritas se enfileiram na trava do arquivo, com N bancos até
+N andam juntas. O ganho só aparece com núcleos livres para os processos;
+numa máquina de um núcleo o limite é a CPU, e só a cauda da latência
+(p99, espera pela trava) melhora.
+
+Uso (a partir de backend/):
+    python -m benchmarks.shard_writes --shards 1 2 4 --writers 8 --writes 200
+    python -m benchmarks.shard_writes --output shards.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import default_card, default_database_url, write_results
+
+
+def seed_users(count: int, shards: int):
+    """Cria `count` usuários, o i-ésimo no shard i % shards; retorna (id, shard)."""
+    from app import crud, database
+    from app.shards import assign_shard
+
+    run_id = time.time_ns()
+    users, candidate = [], 0
+    with database.SessionLocal() as db:
+        for i in range(count):
+            email = f"bench-{run_id}-{candidate}@estudeai.dev"
+            while assign_shard(email) != i % shards:
+                candidate += 1
+                email = f"bench-{run_id}-{candidate}@estudeai.dev"
+            candidate += 1
+            user = crud.create_user(db, "bench", email, "x")
+            users.append((user.id, i % shards))
+    return users
+
+
+def write(user_id: int, shard: int, writes: int, cards: int, start, results):
+    from app import crud, database
+
+    # Processo filho: conexões próprias, não as herdadas do pai
+    for engine in database.shard_engines:
+        engine.dispose(close=False)
+    flashcards = [dict(zip(("pergunta", "resposta"), default_card(i))) for i in range(cards)]
+    latencies, errors = [], 0
+    with database.SessionLocal() as db:
+        database.use_shard(db, shard)
+        start.wait()
+        for i in range(writes):
+            began = time.perf_counter()
+            try:
+                crud.create_deck(db, user_id, {"titulo": f"Deck {i}"}, flashcards)
+            except Exception:
+                db.rollback()
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - began)
+    results.put((latencies, errors))
+
+
+def drive(writers: int, writes: int, cards: int) -> dict:
+    from app import database, manage
+
+    manage.create_tables()
+    shards = len(database.shard_engines)
+    users = seed_users(writers, shards)
+
+    context = multiprocessing.get_context("fork")
+    start = context.Barrier(writers + 1)
+    results = context.Queue()
+    processes = [context.Process(target=write, args=(*user, writes, cards, start, results)) for user in users]
+    for process in processes:
+        process.start()
+    start.wait()
+    started = time.perf_counter()
+    collected = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+
+    latencies = sorted(latency for part, _ in collected for latency in part)
+    return {
+        "shards": shards,
+        "writes": len(latencies),
+        "errors": sum(errors for _, errors in collected),
+        "seconds": round(elapsed, 2),
+        "writes_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+
+def run_shards(count: int, args) -> dict:
+    directory = tempfile.mkdtemp()
+    urls = [f"sqlite:///{directory}/shard{i}.db" for i in range(count)]
+    env = dict(
+        os.environ,
+        DATABASE_URL=urls[0],
+        SHARD_DATABASE_URLS=",".join(urls),
+        JOB_WORKERS="0",
+    )
+    output = subprocess.check_output(
+        [sys.executable, "-m", "benchmarks.shard_writes", "--worker",
+         "--writers", str(args.writers), "--writes", str(args.writes), "--cards", str(args.cards)],
+        env=env,
+    )
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--writers", type=int, default=8, help="processos (usuários) escrevendo ao mesmo tempo")
+    parser.add_argument("--writes", type=int, default=200, help="decks criados por usuário")
+    parser.add_argument("--cards", type=int, default=10, help="flashcards por deck")
+    parser.add_argument("--output", help="arquivo JSON para gravar os resultados")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(drive(args.writers, args.writes, args.cards)))
+        return
+
+    results = {str(count): run_shards(count, args) for count in args.shards}
+    baseline = results[str(args.shards[0])]["writes_per_second"]
+    for result in results.values():
+        result["speedup"] = round(result["writes_per_second"] / baseline, 2)
+
+    if args.output:
+        default_database_url()
+        write_results(args.output, "shard_writes", args, results)
+    print(json.dumps(results, indent=2))
+    print(f"{'shards':>6} {'escritas/s':>11} {'p50 ms':>8} {'p99 ms':>8} {'ganho':>6}")
+    for count, r in results.items():
+        print(f"{count:>6} {r['writes_per_second']:>11} {r['p50_ms']:>8} {r['p99_ms']:>8} {r['speedup']:>6}")
+
+
+if __name__ == "__main__":
+    main()
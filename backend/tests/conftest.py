@@ -0,0 +1,124 @@
+"""
+Configuração dos testes: banco SQLite temporário e limite de requisições
+desligado. As variáveis precisam estar definidas antes de importar o app
+(app/config.py lê o ambiente na importação).
+"""
+import os
+import tempfile
+import threading
+
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/test.db")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+
+@pytest.fixture(scope="session")
+def client():
+    from app import database, models  # noqa: F401 (registra os modelos)
+    from app.main import app
+
+    database.Base.metadata.create_all(database.engine)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def new_user(client):
+    """`new_user()` cria um usuário novo e retorna o cabeçalho com o token dele."""
+    def register():
+        email = f"user{next(_counter)}@teste.com"
+        client.post("/auth/register", json={"nome": "Teste", "email": email, "senha": "senha123"})
+        token = client.post("/auth/login", json={"email": email, "senha": "senha123"}).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    return register
+
+
+@pytest.fixture
+def auth_headers(new_user):
+    """Cria um usuário novo e retorna o cabeçalho com o token dele."""
+    return new_user()
+
+
+@pytest.fixture
+def count_queries(client):
+    """
+    `with count_queries() as statements:` coleta os comandos SQL executados
+    no bloco (nos engines síncronos ou nos assíncronos, conforme DB_ASYNC,
+    do primário e dos shards), fora os dos workers de tarefas em segundo plano.
+    """
+    from app import database
+
+    if database.async_engine is not None:
+        engines = [engine.sync_engine for engine in (database.async_engine, *database.async_shard_engines)]
+    else:
+        engines = [database.engine, *database.shard_engines]
+    engines = list(dict.fromkeys(engines))
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            # A fila de tarefas (app/jobs.py) consulta o banco nas próprias threads
+            if not threading.current_thread().name.startswith("job-worker"):
+                statements.append(statement)
+
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            for engine in engines:
+                event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return counter
+
+
+@pytest.fixture
+def query_plans(client):
+    """
+    `query_plans(crud.funcao, *args)` roda a função numa sessão do primário
+    e retorna, para cada SELECT executado, as linhas do EXPLAIN QUERY PLAN
+    (SQLite) juntas num texto.
+    """
+    from app import database
+
+    def explain(fn, *args):
+        selects = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if threading.current_thread() is caller and statement.lstrip().upper().startswith("SELECT"):
+                selects.append((statement, parameters))
+
+        caller = threading.current_thread()
+        event.listen(database.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            with database.SessionLocal() as db:
+                fn(db, *args)
+        finally:
+            event.remove(database.engine, "before_cursor_execute", before_cursor_execute)
+
+        with database.engine.connect() as conn:
+            return [
+                "\n".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+                for statement, parameters in selects
+            ]
+
+    return explain
+
+
+def _sequence():
+    value = 0
+    while True:
+        value += 1
+        yield value
+
+
+_counter = _sequence()
@@ -0,0 +1,54 @@
+"""
+Modo assíncrono (DB_ASYNC): as rotas usam AsyncSession e o mesmo código de
+app/crud.py via `run_sync`. A suíte inteira roda nos dois modos
+(`DB_ASYNC=true python -m pytest`); estes testes conferem a escolha da sessão
+e requisições simultâneas.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import database
+from app.config import DB_ASYNC
+
+
+def test_to_async_url_keeps_database_and_credentials():
+    assert database.to_async_url("sqlite:////tmp/app.db") == "sqlite+aiosqlite:////tmp/app.db"
+    assert (
+        database.to_async_url("mysql+pymysql://app:segredo@db:3306/estudeai_app")
+        == "mysql+aiomysql://app:segredo@db:3306/estudeai_app"
+    )
+
+
+def test_open_session_follows_configuration(client):
+    async def session_type():
+        async with database.open_session() as db:
+            return type(db)
+
+    if DB_ASYNC:
+        assert database.async_engine is not None
+        assert issubclass(asyncio.run(session_type()), AsyncSession)
+    else:
+        assert database.async_engine is None
+        assert asyncio.run(session_type()) is database.SyncSessionRunner
+
+
+def test_concurrent_requests(client, auth_headers):
+    deck = client.post("/decks/", json={"titulo": "Concorrente"}, headers=auth_headers).json()
+
+    def create(i):
+        card = {"deck_id": deck["id"], "pergunta": f"P{i}", "resposta": f"R{i}"}
+        return client.post("/flashcards/", json=card, headers=auth_headers).status_code
+
+    def read(_):
+        return client.get(f"/flashcards/deck/{deck['id']}", headers=auth_headers).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        writes = list(pool.map(create, range(20)))
+        reads = list(pool.map(read, range(20)))
+
+    assert writes == [201] * 20
+    assert reads == [200] * 20
+    cards = client.get(f"/flashcards/deck/{deck['id']}", headers=auth_headers).json()
+    assert sorted(card["pergunta"] for card in cards) == sorted(f"P{i}" for i in range(20))
@@ -0,0 +1,81 @@
+"""
+Caminho rápido da autenticação: tokens já verificados e dados do usuário
+em cache, sem SQL de autenticação com os caches aquecidos.
+"""
+import time
+
+from app.utils import auth_cache
+from app.utils.auth_cache import Principal, PrincipalCache, TokenCache
+
+
+def auth_statements(statements):
+    return [statement for statement in statements if "usuarios" in statement]
+
+
+def test_warm_cache_runs_no_auth_sql(client, auth_headers, count_queries):
+    client.get("/flashcards/all", headers=auth_headers)
+
+    with count_queries() as statements:
+        assert client.get("/flashcards/all", headers=auth_headers).status_code == 200
+    assert auth_statements(statements) == []
+
+
+def test_cold_principal_cache_loads_user_once(client, auth_headers, count_queries):
+    me = client.get("/users/me", headers=auth_headers).json()
+    auth_cache.invalidate_user(me["id"])
+
+    with count_queries() as cold:
+        client.get("/flashcards/all", headers=auth_headers)
+    with count_queries() as warm:
+        client.get("/flashcards/all", headers=auth_headers)
+    assert len(auth_statements(cold)) == 1
+    assert auth_statements(warm) == []
+
+
+def test_user_change_invalidates_principal(client, auth_headers):
+    from app import database
+    from app.models import Usuario
+
+    me = client.get("/users/me", headers=auth_headers).json()
+    with database.SessionLocal() as db:
+        db.get(Usuario, me["id"]).nome = "Renomeado"
+        db.commit()
+
+    assert client.get("/users/me", headers=auth_headers).json()["nome"] == "Renomeado"
+
+
+def test_invalid_tokens_are_rejected_and_not_cached(client, auth_headers):
+    token = auth_headers["Authorization"].split()[1]
+    tampered = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+
+    for _ in range(2):
+        response = client.get("/flashcards/all", headers={"Authorization": f"Bearer {tampered}"})
+        assert response.status_code == 401
+    assert auth_cache.token_cache.get(tampered) is None
+
+
+def test_token_cache_is_bounded_and_expires():
+    cache = TokenCache(max_size=2)
+    now = time.time()
+    cache.set("a", "1", now + 60)
+    cache.set("b", "2", now + 60)
+    assert cache.get("a") == "1"
+    cache.set("c", "3", now + 60)
+    # "b" era o menos usado
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("1", None, "3")
+
+    cache.set("velho", "4", now - 1)
+    assert cache.get("velho") is None
+
+
+def test_principal_cache_ttl_and_invalidation():
+    cache = PrincipalCache(ttl=60)
+    principal = Principal(id=1, nome="N", email="n@teste.com", criado_em=None)
+    cache.set(principal)
+    assert cache.get(1) == principal
+    cache.invalidate(1)
+    assert cache.get(1) is None
+
+    expired = PrincipalCache(ttl=0)
+    expired.set(principal)
+    assert expired.get(1) is None
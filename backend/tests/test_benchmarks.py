@@ -0,0 +1,99 @@
+"""
+Suíte de benchmarks (backend/benchmarks): o seeder grava dados como se
+viessem da API, os drivers rodam sem erros em miniatura e os resultados
+gravados com `--output` podem ser comparados entre execuções.
+"""
+import argparse
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from app import database, stats
+from app.models import Deck, EstatisticaUsuario, Flashcard
+from benchmarks import compare, load, routes
+from benchmarks.common import percentile, summarize, write_results
+from benchmarks.seeder import SENHA, seed_dataset
+
+
+def test_seeded_users_look_like_api_users(client):
+    users = seed_dataset(2, 3, 4)
+    assert len(users) == 2 and len({user["email"] for user in users}) == 2
+
+    with database.SessionLocal() as db:
+        for user in users:
+            decks = db.scalars(select(Deck.id).where(Deck.usuario_id == user["id"]).order_by(Deck.id)).all()
+            assert decks == user["deck_ids"]
+            cards = db.scalar(select(func.count()).select_from(Flashcard).where(Flashcard.deck_id.in_(decks)))
+            assert cards == 12
+
+            row = db.get(EstatisticaUsuario, user["id"])
+            expected = stats.recount(db, user["id"])
+            assert (row.total_decks, row.total_cards) == (expected["total_decks"], expected["total_cards"])
+
+    user = users[0]
+    headers = {"Authorization": f"Bearer {user['token']}"}
+    assert len(client.get("/decks/", headers=headers).json()) == 3
+    assert client.post("/auth/login", json={"email": user["email"], "senha": SENHA}).status_code == 200
+
+
+def test_route_benchmark_runs(client):
+    args = argparse.Namespace(iterations=3, decks=2, cards=5, output=None)
+    results = asyncio.run(routes.run(args))
+
+    assert set(results) == {
+        "login", "decks", "deck_flashcards", "stats", "flashcard_create", "flashcard_update", "flashcard_delete",
+    }
+    for result in results.values():
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+        assert result["queries_per_request"] > 0
+
+
+def test_load_driver_runs_the_mix(client):
+    args = argparse.Namespace(
+        users=3, decks=2, cards=3, requests=40, concurrency=4, mix=load.MIX, seed=1, output=None,
+    )
+    results = asyncio.run(load.run(args))
+
+    assert results["total"]["requests"] == 40
+    assert results["total"]["errors"] == 0
+    assert results["total"]["throughput_rps"] > 0
+    assert sum(op["requests"] for op in results["operations"].values()) >= 40
+    assert set(results["operations"]) <= set(load.MIX)
+
+
+def test_parse_mix():
+    assert load.parse_mix("decks=5,create") == {"decks": 5, "create": 1}
+    with pytest.raises(argparse.ArgumentTypeError):
+        load.parse_mix("inexistente=1")
+
+
+def test_summarize_percentiles():
+    latencies = [i / 1000 for i in range(1, 101)]
+    assert percentile(latencies, 50) == 0.05
+    assert summarize(latencies, elapsed=2.0) == {
+        "requests": 100, "p50_ms": 50.0, "p95_ms": 95.0, "p99_ms": 99.0, "throughput_rps": 50.0,
+    }
+
+
+def test_results_can_be_compared(client, tmp_path, monkeypatch, capsys):
+    args = argparse.Namespace(iterations=10, output=None)
+    old, same, slower = tmp_path / "antes.json", tmp_path / "igual.json", tmp_path / "depois.json"
+    write_results(str(old), "routes", args, {"decks": {"p50_ms": 10.0, "throughput_rps": 100.0, "requests": 10}})
+    write_results(str(same), "routes", args, {"decks": {"p50_ms": 10.2, "throughput_rps": 101.0, "requests": 10}})
+    write_results(str(slower), "routes", args, {"decks": {"p50_ms": 10.0, "throughput_rps": 80.0, "requests": 20}})
+
+    document = json.loads(old.read_text())
+    assert document["database"] == "sqlite" and document["args"] == {"iterations": 10}
+
+    def run_compare(new):
+        monkeypatch.setattr("sys.argv", ["compare", str(old), str(new), "--threshold", "5"])
+        with pytest.raises(SystemExit) as exit_info:
+            compare.main()
+        return exit_info.value.code
+
+    assert run_compare(same) == 0
+    # Vazão caiu 20%: regressão; `requests` nunca conta
+    assert run_compare(slower) == 1
+    assert "decks.throughput_rps" in capsys.readouterr().out
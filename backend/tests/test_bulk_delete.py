@@ -0,0 +1,108 @@
+"""
+Remoção de decks e flashcards: o banco faz a cascata (ON DELETE CASCADE) e
+a quantidade de comandos SQL não depende de quantos cards são apagados.
+"""
+from sqlalchemy import func, select
+
+from app import database
+from app.models import Flashcard, Progresso, Remocao, Revisao
+
+
+def scalar(statement):
+    with database.SessionLocal() as db:
+        return db.execute(statement).scalar()
+
+
+def create_deck(client, headers, cards: int) -> dict:
+    flashcards = [{"pergunta": f"Pergunta {i}", "resposta": f"Resposta {i}"} for i in range(cards)]
+    response = client.post("/decks/", json={"titulo": "Deck", "flashcards": flashcards}, headers=headers)
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_delete_deck_query_count_does_not_depend_on_size(client, auth_headers, count_queries):
+    small = create_deck(client, auth_headers, 1)
+    large = create_deck(client, auth_headers, 400)
+
+    with count_queries() as small_queries:
+        assert client.delete(f"/decks/{small['id']}", headers=auth_headers).status_code == 204
+    with count_queries() as large_queries:
+        assert client.delete(f"/decks/{large['id']}", headers=auth_headers).status_code == 204
+
+    assert len(large_queries) == len(small_queries)
+    assert scalar(select(func.count()).select_from(Flashcard).where(Flashcard.deck_id == large["id"])) == 0
+    assert scalar(select(func.count()).select_from(Progresso).where(Progresso.deck_id == large["id"])) == 0
+
+
+def test_delete_deck_keeps_review_history(client, auth_headers):
+    deck = create_deck(client, auth_headers, 2)
+    card_id = deck["flashcards"][0]["id"]
+    response = client.post("/study/review", json={"flashcard_id": card_id, "rating": "facil"}, headers=auth_headers)
+    assert response.status_code == 200
+
+    assert client.delete(f"/decks/{deck['id']}", headers=auth_headers).status_code == 204
+
+    assert scalar(select(func.count()).select_from(Revisao).where(Revisao.flashcard_id == card_id)) == 0
+    assert scalar(select(func.count()).select_from(Revisao).where(Revisao.flashcard_id.is_(None))) >= 1
+    stats = client.get("/users/stats", headers=auth_headers).json()
+    assert stats["total_decks"] == 0
+    assert stats["total_cards"] == 0
+    assert stats["total_cards_studied"] == 0
+
+
+def test_bulk_delete_flashcards_query_count_does_not_depend_on_size(client, auth_headers, count_queries):
+    deck = create_deck(client, auth_headers, 301)
+    ids = [card["id"] for card in deck["flashcards"]]
+
+    with count_queries() as one:
+        response = client.delete(f"/flashcards?ids={ids[0]}", headers=auth_headers)
+    assert response.json() == {"deleted": [ids[0]], "not_found": []}
+
+    with count_queries() as many:
+        response = client.delete("/flashcards?ids=" + ",".join(map(str, ids[1:])), headers=auth_headers)
+    assert response.json() == {"deleted": ids[1:], "not_found": []}
+
+    assert len(many) == len(one)
+    assert scalar(select(func.count()).select_from(Flashcard).where(Flashcard.deck_id == deck["id"])) == 0
+    assert scalar(
+        select(func.count()).select_from(Remocao).where(Remocao.entidade == "flashcard", Remocao.entidade_id.in_(ids))
+    ) == len(ids)
+    assert client.get("/users/stats", headers=auth_headers).json()["total_cards"] == 0
+
+
+def test_bulk_delete_flashcards_skips_other_users_cards(client, auth_headers):
+    own = create_deck(client, auth_headers, 1)["flashcards"][0]["id"]
+
+    other_email = "outro-flashcards@teste.com"
+    client.post("/auth/register", json={"nome": "Outro", "email": other_email, "senha": "senha123"})
+    token = client.post("/auth/login", json={"email": other_email, "senha": "senha123"}).json()["access_token"]
+    other = create_deck(client, {"Authorization": f"Bearer {token}"}, 1)["flashcards"][0]["id"]
+
+    response = client.delete(f"/flashcards?ids={own},{other},999999", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {"deleted": [own], "not_found": sorted([other, 999999])}
+    assert scalar(select(func.count()).select_from(Flashcard).where(Flashcard.id == other)) == 1
+
+
+def test_bulk_delete_flashcards_rejects_invalid_ids(client, auth_headers):
+    assert client.delete("/flashcards?ids=1,abc", headers=auth_headers).status_code == 422
+    assert client.delete("/flashcards", headers=auth_headers).status_code == 422
+
+
+def test_bulk_delete_decks_query_count_does_not_depend_on_size(client, auth_headers, count_queries):
+    first = create_deck(client, auth_headers, 1)
+    decks = [create_deck(client, auth_headers, 100) for _ in range(4)]
+
+    with count_queries() as one:
+        response = client.post("/decks/bulk-delete", json={"ids": [first["id"]]}, headers=auth_headers)
+    assert response.json() == {"deleted": [first["id"]], "not_found": []}
+
+    ids = [deck["id"] for deck in decks]
+    with count_queries() as many:
+        response = client.post("/decks/bulk-delete", json={"ids": ids + [999999]}, headers=auth_headers)
+    assert response.json() == {"deleted": ids, "not_found": [999999]}
+
+    assert len(many) == len(one)
+    assert scalar(select(func.count()).select_from(Flashcard).where(Flashcard.deck_id.in_(ids))) == 0
+    stats = client.get("/users/stats", headers=auth_headers).json()
+    assert (stats["total_decks"], stats["total_cards"]) == (0, 0)
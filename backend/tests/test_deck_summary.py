@@ -0,0 +1,67 @@
+"""
+GET /decks/summary: os totais de todos os decks numa única consulta
+agrupada, pelos índices de `progresso` e de `decks` (sem N+1).
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete
+
+from app import crud, database, manage
+from app.models import Progresso
+
+
+@pytest.fixture
+def decks(client, auth_headers):
+    created = []
+    for size in (3, 0, 2, 5):
+        flashcards = [{"pergunta": f"P{i}", "resposta": f"R{i}"} for i in range(size)]
+        created.append(client.post("/decks/", json={"titulo": f"Deck {size}", "flashcards": flashcards}, headers=auth_headers).json())
+    return created
+
+
+def summary(client, headers) -> list:
+    response = client.get("/decks/summary", headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_summary_counts(client, auth_headers, decks):
+    studied = decks[0]["flashcards"][0]["id"]
+    client.post("/study/review", json={"flashcard_id": studied, "rating": "facil"}, headers=auth_headers)
+
+    rows = summary(client, auth_headers)
+    assert [row["id"] for row in rows] == [deck["id"] for deck in decks]
+    assert [row["card_count"] for row in rows] == [3, 0, 2, 5]
+    # Cards novos vencem na criação; o revisado só volta amanhã
+    assert [row["due_count"] for row in rows] == [2, 0, 2, 5]
+    assert rows[0]["last_studied_at"] is not None
+    assert all(row["last_studied_at"] is None for row in rows[1:])
+
+
+def test_summary_is_one_statement(client, auth_headers, decks, count_queries):
+    summary(client, auth_headers)
+
+    with count_queries() as statements:
+        assert len(summary(client, auth_headers)) == 4
+    assert len(statements) == 1
+
+
+def test_summary_plan_uses_covering_indexes(client, auth_headers, decks, query_plans):
+    user_id = client.get("/users/me", headers=auth_headers).json()["id"]
+
+    plan, = query_plans(crud.list_deck_summaries, user_id, datetime.utcnow())
+    assert "SEARCH progresso USING COVERING INDEX ix_progresso_usuario_deck_resumo (usuario_id=?)" in plan
+    assert "SEARCH decks USING INDEX ix_decks_usuario_lista (usuario_id=?)" in plan
+    assert "SCAN" not in plan.replace("SCAN anon_1", "")
+    assert "TEMP B-TREE" not in plan
+
+
+def test_card_count_comes_from_progresso_until_backfill(client, auth_headers, decks):
+    # Cards antigos, sem linha em `progresso`, só entram depois do backfill
+    with database.engine.begin() as conn:
+        conn.execute(delete(Progresso).where(Progresso.deck_id == decks[3]["id"]))
+    assert summary(client, auth_headers)[3]["card_count"] == 0
+
+    manage.backfill_progresso()
+    assert summary(client, auth_headers)[3]["card_count"] == 5
@@ -0,0 +1,90 @@
+"""
+GET condicional: as listagens e o deck respondem 304 com o If-None-Match
+atual lendo só a versão, e a ETag muda a cada alteração do deck ou dos
+seus flashcards (inclusive quando um deck apagado é recriado com o mesmo id).
+"""
+import pytest
+
+
+def get(client, headers, url: str, etag=None):
+    extra = {"If-None-Match": etag} if etag else {}
+    return client.get(url, headers={**headers, **extra})
+
+
+@pytest.fixture
+def deck(client, auth_headers):
+    flashcards = [{"pergunta": f"P{i}", "resposta": f"R{i}"} for i in range(3)]
+    return client.post("/decks/", json={"titulo": "Versões", "flashcards": flashcards}, headers=auth_headers).json()
+
+
+URLS = ["/decks/", "/decks/{id}", "/flashcards/deck/{id}"]
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_unchanged_resource_is_304_without_loading_rows(client, auth_headers, deck, count_queries, url):
+    url = url.format(id=deck["id"])
+    first = get(client, auth_headers, url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    with count_queries() as statements:
+        response = get(client, auth_headers, url, etag)
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    assert len(statements) == 1
+    assert "flashcards" not in statements[0]
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_changes_produce_a_new_etag(client, auth_headers, deck, url):
+    url = url.format(id=deck["id"])
+    card_id = deck["flashcards"][0]["id"]
+    changes = [
+        lambda: client.put(f"/decks/{deck['id']}", json={"titulo": "Novo título"}, headers=auth_headers),
+        lambda: client.post("/flashcards/", json={"deck_id": deck["id"], "pergunta": "P", "resposta": "R"}, headers=auth_headers),
+        lambda: client.put(f"/flashcards/{card_id}", json={"pergunta": "Editada"}, headers=auth_headers),
+        lambda: client.delete(f"/flashcards/{card_id}", headers=auth_headers),
+    ]
+
+    etags = [get(client, auth_headers, url).headers["etag"]]
+    for change in changes:
+        assert change().status_code in (200, 201, 204)
+        response = get(client, auth_headers, url, etags[-1])
+        assert response.status_code == 200
+        etags.append(response.headers["etag"])
+    assert len(set(etags)) == len(etags)
+
+
+def test_recreated_deck_gets_a_new_etag(client, auth_headers):
+    def create():
+        flashcards = [{"pergunta": "Mesma", "resposta": "Mesma"}]
+        return client.post("/decks/", json={"titulo": "Recriado", "flashcards": flashcards}, headers=auth_headers).json()
+
+    old = create()
+    etags = {url: get(client, auth_headers, url.format(id=old["id"])).headers["etag"] for url in URLS[1:]}
+    client.delete(f"/decks/{old['id']}", headers=auth_headers)
+
+    new = create()
+    # SQLite reaproveita o maior id apagado: mesmo id e mesma versão
+    assert new["id"] == old["id"]
+    for url, etag in etags.items():
+        response = get(client, auth_headers, url.format(id=new["id"]), etag)
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()
+
+
+def test_etags_are_per_user(client, auth_headers, new_user, deck):
+    other = new_user()
+    other_deck = client.post("/decks/", json={"titulo": "Versões"}, headers=other).json()
+
+    mine = get(client, auth_headers, "/decks/").headers["etag"]
+    response = get(client, other, "/decks/", mine)
+    assert response.status_code == 200
+    assert [d["id"] for d in response.json()] == [other_deck["id"]]
+
+    # ETag de um deck alheio não serve para revalidar: 404
+    etag = get(client, auth_headers, f"/decks/{deck['id']}").headers["etag"]
+    assert get(client, other, f"/decks/{deck['id']}", etag).status_code == 404
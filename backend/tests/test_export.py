@@ -0,0 +1,65 @@
+"""
+Exportação NDJSON em streaming (GET /users/me/export): decks e depois
+flashcards em ordem de id, retomável com `after_id` e opcionalmente gzip.
+"""
+import gzip
+import json
+
+
+def export(client, headers, query: str = ""):
+    response = client.get(f"/users/me/export{query}", headers=headers)
+    assert response.status_code == 200
+    return response
+
+
+def lines(content: bytes) -> list:
+    return [json.loads(line) for line in content.decode("utf-8").splitlines()]
+
+
+def seed(client, headers):
+    for d in range(2):
+        flashcards = [{"pergunta": f"Pergunta {d}.{i} ção", "resposta": f"R{i}"} for i in range(3)]
+        client.post("/decks/", json={"titulo": f"Deck {d}", "flashcards": flashcards}, headers=headers)
+
+
+def test_export_streams_decks_then_flashcards(client, auth_headers):
+    seed(client, auth_headers)
+
+    response = export(client, auth_headers)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "attachment" in response.headers["content-disposition"]
+    rows = lines(response.content)
+
+    assert [row["type"] for row in rows] == ["deck"] * 2 + ["flashcard"] * 6
+    assert [row["titulo"] for row in rows[:2]] == ["Deck 0", "Deck 1"]
+    card_ids = [row["id"] for row in rows[2:]]
+    assert card_ids == sorted(card_ids)
+    assert rows[2]["pergunta"] == "Pergunta 0.0 ção"
+    assert set(rows[2]) == {"type", "id", "deck_id", "pergunta", "resposta", "criado_em"}
+
+
+def test_export_resumes_after_last_flashcard(client, auth_headers):
+    seed(client, auth_headers)
+    cards = [row for row in lines(export(client, auth_headers).content) if row["type"] == "flashcard"]
+
+    resumed = lines(export(client, auth_headers, f"?after_id={cards[2]['id']}").content)
+    assert resumed == cards[3:]
+    assert lines(export(client, auth_headers, f"?after_id={cards[-1]['id']}").content) == []
+
+
+def test_export_gzip_matches_plain(client, auth_headers):
+    seed(client, auth_headers)
+
+    plain = export(client, auth_headers).content
+    compressed = export(client, auth_headers, "?compress=true")
+    assert compressed.headers["content-type"] == "application/gzip"
+    assert gzip.decompress(compressed.content) == plain
+
+
+def test_export_only_contains_own_library(client, auth_headers, new_user):
+    seed(client, auth_headers)
+    other = new_user()
+    client.post("/decks/", json={"titulo": "Só meu", "flashcards": [{"pergunta": "P", "resposta": "R"}]}, headers=other)
+
+    rows = lines(export(client, other).content)
+    assert [(row["type"], row.get("titulo", row.get("pergunta"))) for row in rows] == [("deck", "Só meu"), ("flashcard", "P")]
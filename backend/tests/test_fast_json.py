@@ -0,0 +1,85 @@
+"""
+Caminho rápido de leitura (app/utils/fast_json.py): as listagens completas
+saem das colunas direto para JSON, byte a byte iguais ao que o
+`response_model` (FlashcardOut / DeckOut / DeckFullOut) geraria a partir
+dos objetos do ORM.
+"""
+from typing import List
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app import database
+from app.models import Deck, Flashcard
+from app.schemas import DeckFullOut, DeckOut, FlashcardOut
+
+
+def schema_body(schema, value) -> bytes:
+    """O corpo que a rota geraria pelo caminho antigo (ORM + response_model)."""
+    return JSONResponse(jsonable_encoder(TypeAdapter(schema).validate_python(value, from_attributes=True))).body
+
+
+@pytest.fixture
+def library(client, auth_headers):
+    decks = [
+        client.post("/decks/", json={
+            "titulo": "Acentuação çãõ", "descricao": "Com \"aspas\" e emoji 🎓",
+            "flashcards": [{"pergunta": f"Pergunta {i} – ü", "resposta": "Linha 1\nLinha 2"} for i in range(3)],
+        }, headers=auth_headers).json(),
+        client.post("/decks/", json={"titulo": "Sem descrição"}, headers=auth_headers).json(),
+    ]
+    return decks
+
+
+def orm_decks(user_id: int) -> List[Deck]:
+    with database.SessionLocal() as db:
+        decks = db.query(Deck).filter(Deck.usuario_id == user_id).order_by(Deck.id).all()
+        for deck in decks:
+            deck.flashcards.sort(key=lambda card: card.id)
+        db.expunge_all()
+        return decks
+
+
+def test_fast_path_matches_schema_output(client, auth_headers, library):
+    decks = orm_decks(library[0]["usuario_id"])
+    cards = [card for deck in decks for card in deck.flashcards]
+
+    expected = {
+        "/decks/": schema_body(List[DeckOut], decks),
+        f"/decks/{decks[0].id}": schema_body(DeckFullOut, decks[0]),
+        f"/decks/{decks[1].id}": schema_body(DeckFullOut, decks[1]),
+        "/flashcards/all": schema_body(List[FlashcardOut], cards),
+        f"/flashcards/deck/{decks[0].id}": schema_body(List[FlashcardOut], decks[0].flashcards),
+    }
+    for url, body in expected.items():
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.content == body, url
+
+
+def test_fast_path_selects_only_schema_columns(client, auth_headers, library, count_queries):
+    deck_id = library[0]["id"]
+
+    with count_queries() as statements:
+        client.get(f"/flashcards/deck/{deck_id}", headers=auth_headers)
+    # Só as colunas do schema, sem carregar o relacionamento `deck`
+    card_query = next(s for s in statements if "FROM flashcards" in s)
+    assert card_query.split("FROM")[0].count(",") == len(FlashcardOut.model_fields) - 1
+
+
+def test_empty_lists(client, new_user):
+    headers = new_user()
+    assert client.get("/decks/", headers=headers).content == b"[]"
+    assert client.get("/flashcards/all", headers=headers).content == b"[]"
+    deck = client.post("/decks/", json={"titulo": "Vazio"}, headers=headers).json()
+    assert client.get(f"/flashcards/deck/{deck['id']}", headers=headers).content == b"[]"
+    assert client.get(f"/decks/{deck['id']}", headers=headers).json()["flashcards"] == []
+
+
+def test_other_users_deck_is_still_404(client, library, new_user):
+    headers = new_user()
+    assert client.get(f"/decks/{library[0]['id']}", headers=headers).status_code == 404
+    assert client.get(f"/flashcards/deck/{library[0]['id']}", headers=headers).status_code == 404
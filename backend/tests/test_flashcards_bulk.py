@@ -0,0 +1,82 @@
+"""
+Criação em lote (POST /flashcards/bulk e POST /decks/ com `flashcards`):
+uma verificação de propriedade e uma transação para o lote inteiro, com os
+itens recusados reportados pelo índice.
+"""
+from app.schemas import MAX_FLASHCARDS_POR_LOTE
+
+
+def create_deck(client, headers, titulo: str = "Deck") -> dict:
+    response = client.post("/decks/", json={"titulo": titulo}, headers=headers)
+    assert response.status_code == 201
+    return response.json()
+
+
+def cards_for(deck_id: int, count: int, start: int = 0) -> list:
+    return [{"deck_id": deck_id, "pergunta": f"Pergunta {i}", "resposta": f"Resposta {i}"} for i in range(start, start + count)]
+
+
+def test_bulk_creates_all_cards(client, auth_headers):
+    deck = create_deck(client, auth_headers)
+
+    response = client.post("/flashcards/bulk", json={"flashcards": cards_for(deck["id"], 3)}, headers=auth_headers)
+    assert response.status_code == 201
+    body = response.json()
+    assert body["errors"] == []
+    assert [card["pergunta"] for card in body["created"]] == ["Pergunta 0", "Pergunta 1", "Pergunta 2"]
+    assert all(card["deck_id"] == deck["id"] and card["id"] for card in body["created"])
+
+    stored = client.get(f"/flashcards/deck/{deck['id']}", headers=auth_headers).json()
+    assert [card["id"] for card in stored] == [card["id"] for card in body["created"]]
+
+
+def test_bulk_reports_foreign_decks_per_item(client, auth_headers, new_user):
+    own = create_deck(client, auth_headers)
+    foreign = create_deck(client, new_user(), "Alheio")
+
+    batch = cards_for(own["id"], 1) + cards_for(foreign["id"], 1, 1) + cards_for(own["id"], 1, 2) + cards_for(999999, 1, 3)
+    response = client.post("/flashcards/bulk", json={"flashcards": batch}, headers=auth_headers)
+    assert response.status_code == 207
+    body = response.json()
+    assert [card["pergunta"] for card in body["created"]] == ["Pergunta 0", "Pergunta 2"]
+    assert [(error["index"], error["deck_id"]) for error in body["errors"]] == [(1, foreign["id"]), (3, 999999)]
+
+    # Nenhum item aceito: 422, com os erros no mesmo formato
+    response = client.post("/flashcards/bulk", json={"flashcards": cards_for(foreign["id"], 2)}, headers=auth_headers)
+    assert response.status_code == 422
+    assert response.json()["created"] == []
+    assert [error["index"] for error in response.json()["errors"]] == [0, 1]
+    assert len(client.get(f"/flashcards/deck/{own['id']}", headers=auth_headers).json()) == 2
+
+
+def test_bulk_validates_whole_batch(client, auth_headers):
+    deck = create_deck(client, auth_headers)
+
+    too_many = cards_for(deck["id"], MAX_FLASHCARDS_POR_LOTE + 1)
+    assert client.post("/flashcards/bulk", json={"flashcards": too_many}, headers=auth_headers).status_code == 422
+    assert client.post("/flashcards/bulk", json={"flashcards": []}, headers=auth_headers).status_code == 422
+
+    # Um item inválido recusa o lote inteiro, sem gravar os outros
+    invalid = cards_for(deck["id"], 2) + [{"deck_id": deck["id"], "pergunta": "x" * 501, "resposta": "R"}]
+    assert client.post("/flashcards/bulk", json={"flashcards": invalid}, headers=auth_headers).status_code == 422
+    assert client.get(f"/flashcards/deck/{deck['id']}", headers=auth_headers).json() == []
+
+
+def test_bulk_query_count_does_not_depend_on_size(client, auth_headers, count_queries):
+    deck = create_deck(client, auth_headers)
+
+    with count_queries() as small:
+        client.post("/flashcards/bulk", json={"flashcards": cards_for(deck["id"], 1)}, headers=auth_headers)
+    with count_queries() as large:
+        client.post("/flashcards/bulk", json={"flashcards": cards_for(deck["id"], 200, 1)}, headers=auth_headers)
+
+    assert len(large) == len(small)
+
+
+def test_create_deck_with_inline_flashcards(client, auth_headers):
+    flashcards = [{"pergunta": f"P{i}", "resposta": f"R{i}"} for i in range(3)]
+    response = client.post("/decks/", json={"titulo": "Com cards", "flashcards": flashcards}, headers=auth_headers)
+    assert response.status_code == 201
+    deck = response.json()
+    assert [card["pergunta"] for card in deck["flashcards"]] == ["P0", "P1", "P2"]
+    assert all(card["deck_id"] == deck["id"] for card in deck["flashcards"])
@@ -0,0 +1,89 @@
+"""
+Sondas de saúde e aquecimento (app/warmup.py, app/routers/health.py):
+/health/live nunca toca o banco, /health/ready reaproveita a última
+verificação por HEALTH_DB_CHECK_SECONDS e o startup enche os pools antes de
+aceitar tráfego.
+"""
+import threading
+
+import pytest
+
+from app import database, serve, warmup
+from app.utils.hasher import PasswordHasher
+
+
+@pytest.fixture
+def readiness(monkeypatch):
+    """Estado novo, já aquecido, sem verificação do banco em cache."""
+    state = warmup.ReadinessState(db_check_interval=60)
+    state.warmed_up = True
+    monkeypatch.setattr(warmup, "state", state)
+    monkeypatch.setattr("app.routers.health.state", state)
+    return state
+
+
+def test_live_never_touches_the_database(client, count_queries):
+    with count_queries() as statements:
+        for _ in range(3):
+            response = client.get("/health/live")
+            assert (response.status_code, response.json()) == (200, {"status": "ok"})
+    assert statements == []
+
+
+def test_ready_checks_the_database_once_per_interval(client, readiness, count_queries):
+    with count_queries() as statements:
+        for _ in range(5):
+            response = client.get("/health/ready")
+            assert (response.status_code, response.json()) == (200, {"status": "ready"})
+    assert statements == ["SELECT 1"]
+
+
+@pytest.mark.parametrize("problem, status", [
+    ("starting", "starting"),
+    ("shutting_down", "shutting_down"),
+    ("database", "database_unavailable"),
+])
+def test_ready_is_503_when_not_ready(client, readiness, monkeypatch, problem, status):
+    if problem == "starting":
+        readiness.warmed_up = False
+    elif problem == "shutting_down":
+        readiness.shutting_down = True
+    else:
+        async def unavailable():
+            return False
+        monkeypatch.setattr(warmup, "_ping", unavailable)
+
+    response = client.get("/health/ready")
+    assert (response.status_code, response.json()) == (503, {"status": status})
+
+
+def test_warm_up_fills_the_pools_and_hasher(client, readiness, monkeypatch):
+    hasher = PasswordHasher(workers=3)
+    monkeypatch.setattr(warmup, "password_hasher", hasher)
+    readiness.warmed_up = False
+    hasher_threads = lambda: sum(thread.name.startswith("password-hasher") for thread in threading.enumerate())
+    before = hasher_threads()
+
+    client.portal.call(warmup.warm_up)
+
+    assert readiness.warmed_up is True
+    engine = database.async_engine.sync_engine if database.async_engine is not None else database.engine
+    assert engine.pool.checkedin() >= engine.pool.size()
+    # Uma tarefa por thread, em paralelo: todas sobem no aquecimento
+    assert hasher_threads() - before == hasher.workers
+    hasher.shutdown()
+
+
+def test_serve_runs_uvicorn_with_workers_and_graceful_shutdown(monkeypatch):
+    calls = []
+    monkeypatch.setattr(serve.uvicorn, "run", lambda app, **options: calls.append((app, options)))
+    monkeypatch.setattr("sys.argv", ["serve", "--workers", "0", "--port", "9000"])
+
+    serve.main()
+
+    (app, options), = calls
+    assert app == "app.main:app"
+    assert (options["workers"], options["port"]) == (1, 9000)
+    assert (options["loop"], options["http"], options["lifespan"]) == ("auto", "auto", "on")
+    assert options["timeout_graceful_shutdown"] == serve.GRACEFUL_TIMEOUT
+    assert options["log_config"]["loggers"]["app"]["level"] == "INFO"
@@ -0,0 +1,162 @@
+"""
+POST /decks/import: CSV/TSV e pacotes .apkg do Anki lidos em streaming,
+validados com os limites de FlashcardCreate (500/1000 caracteres), inseridos
+em lotes num deck novo ou existente e com o relatório de erros por linha.
+"""
+import io
+import sqlite3
+import zipfile
+
+import pytest
+
+from app import crud
+from app.schemas import MAX_ERROS_IMPORTACAO
+
+
+def import_file(client, headers, content: bytes, **params):
+    return client.post("/decks/import", params=params, content=content, headers=headers)
+
+
+def cards(client, headers, deck_id: int) -> list:
+    return [(c["pergunta"], c["resposta"]) for c in client.get(f"/flashcards/deck/{deck_id}", headers=headers).json()]
+
+
+def apkg(notes, member: str = "collection.anki2") -> bytes:
+    """Pacote do Anki mínimo: zip com a coleção SQLite e a tabela `notes`."""
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, flds TEXT)")
+    connection.executemany("INSERT INTO notes (flds) VALUES (?)", [("\x1f".join(fields),) for fields in notes])
+    connection.commit()
+    collection = connection.serialize()
+    connection.close()
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as package:
+        package.writestr(member, collection)
+        package.writestr("media", "{}")
+    return buffer.getvalue()
+
+
+def test_csv_creates_deck_with_per_row_errors(client, auth_headers):
+    body = (
+        "\ufeffPergunta,Resposta\n"
+        "Capital da França?,Paris\n"
+        ",sem pergunta\n"
+        "\n"
+        '"Com vírgula, e aspas ""duplas""","Duas\nlinhas"\n'
+        f"{'p' * 501},longa demais\n"
+        f"Resposta longa,{'r' * 1001}\n"
+        "Só pergunta\n"
+        "2 + 2?,4,coluna extra\n"
+    )
+    response = import_file(client, auth_headers, body.encode(), titulo="Geografia", descricao="CSV")
+    assert response.status_code == 201
+    result = response.json()
+
+    assert (result["deck"]["titulo"], result["deck"]["descricao"]) == ("Geografia", "CSV")
+    assert (result["imported"], result["failed"]) == (3, 4)
+    assert [error["line"] for error in result["errors"]] == [3, 7, 8, 9]
+    assert "pergunta" in result["errors"][1]["detail"] and "resposta" in result["errors"][2]["detail"]
+    assert cards(client, auth_headers, result["deck"]["id"]) == [
+        ("Capital da França?", "Paris"),
+        ('Com vírgula, e aspas "duplas"', "Duas\nlinhas"),
+        ("2 + 2?", "4"),
+    ]
+
+    # Os cards importados entram no resumo e na fila de estudo
+    summary = next(d for d in client.get("/decks/summary", headers=auth_headers).json() if d["id"] == result["deck"]["id"])
+    assert (summary["card_count"], summary["due_count"]) == (3, 3)
+
+
+@pytest.mark.parametrize("body, params", [
+    ("frente\tverso\nUm\tOne\nDois\tTwo\n", {"format": "tsv"}),
+    ("Um\tOne\nDois\tTwo\n", {}),
+    ("question;answer\nUm;One\nDois;Two\n", {}),
+])
+def test_delimiter_and_header_detection(client, auth_headers, body, params):
+    result = import_file(client, auth_headers, body.encode(), **params).json()
+    assert cards(client, auth_headers, result["deck"]["id"]) == [("Um", "One"), ("Dois", "Two")]
+
+
+def test_import_into_existing_deck(client, auth_headers, new_user):
+    deck = client.post("/decks/", json={"titulo": "Existente", "flashcards": [{"pergunta": "A", "resposta": "1"}]}, headers=auth_headers).json()
+
+    result = import_file(client, auth_headers, b"B,2\nC,3\n", deck_id=deck["id"]).json()
+    assert result["deck"]["id"] == deck["id"] and result["imported"] == 2
+    assert cards(client, auth_headers, deck["id"]) == [("A", "1"), ("B", "2"), ("C", "3")]
+
+    # Deck de outro usuário: 404 e nada gravado
+    response = import_file(client, new_user(), b"X,9\n", deck_id=deck["id"])
+    assert response.status_code == 404
+    assert len(cards(client, auth_headers, deck["id"])) == 3
+
+
+def test_anki_package(client, auth_headers):
+    package = apkg([
+        ("<b>Mitocôndria</b>", "Usina de energia<br>da célula"),
+        ("Som[sound:audio.mp3]&nbsp;e&amp;", "<div>Linha 1</div><div>Linha 2</div>", "campo extra"),
+        ("Sem resposta",),
+    ])
+    result = import_file(client, auth_headers, package, titulo="Anki").json()
+
+    assert (result["imported"], result["failed"]) == (2, 1)
+    assert result["errors"][0]["line"] == 3
+    assert cards(client, auth_headers, result["deck"]["id"]) == [
+        ("Mitocôndria", "Usina de energia\nda célula"),
+        ("Som e&", "Linha 1\nLinha 2"),
+    ]
+    # Coleção mais nova (anki21) também é aceita
+    assert import_file(client, auth_headers, apkg([("Nova", "Sim")], "collection.anki21")).json()["imported"] == 1
+
+
+@pytest.mark.parametrize("content, params", [
+    (b"PK\x03\x04 quebrado", {}),
+    (b"nao e zip", {"format": "apkg"}),
+    (apkg([("A", "B")], "outra.db"), {}),
+    (b'"aspas que nunca fecham,x\n' + b"y" * 200_000, {}),
+])
+def test_invalid_files_are_400(client, auth_headers, content, params):
+    before = len(client.get("/decks/", headers=auth_headers).json())
+    response = import_file(client, auth_headers, content, **params)
+    assert response.status_code == 400
+    # Nada fica gravado: nem o deck novo
+    assert len(client.get("/decks/", headers=auth_headers).json()) == before
+
+
+def test_too_large_is_413(client, auth_headers, monkeypatch):
+    monkeypatch.setattr("app.routers.deck.MAX_IMPORT_BYTES", 10)
+    assert import_file(client, auth_headers, b"pergunta,resposta\nA,B\n").status_code == 413
+
+
+def test_anki_collection_too_large_uncompressed_is_413(client, auth_headers, monkeypatch):
+    monkeypatch.setattr("app.importers.MAX_ANKI_COLLECTION_BYTES", 64 * 1024)
+    # 1 MiB de zeros vira um zip de ~1 KiB: passa no limite do upload
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr("collection.anki2", bytes(1024 * 1024))
+    assert len(buffer.getvalue()) < 64 * 1024
+
+    before = len(client.get("/decks/", headers=auth_headers).json())
+    response = import_file(client, auth_headers, buffer.getvalue())
+    assert response.status_code == 413
+    assert "descompactada" in response.json()["detail"]
+    assert len(client.get("/decks/", headers=auth_headers).json()) == before
+
+
+def test_rows_are_inserted_in_chunks(client, auth_headers, monkeypatch, count_queries):
+    monkeypatch.setattr(crud, "IMPORT_CHUNK_SIZE", 2)
+    body = "".join(f"P{i},R{i}\n" for i in range(5)).encode()
+
+    with count_queries() as statements:
+        assert import_file(client, auth_headers, body).json()["imported"] == 5
+    inserts = [s for s in statements if s.startswith("INSERT INTO flashcards")]
+    assert len(inserts) == 3
+    # Um único INSERT ... SELECT cria o estado de revisão de todos
+    assert len([s for s in statements if s.startswith("INSERT INTO progresso")]) == 1
+
+
+def test_error_report_is_capped(client, auth_headers):
+    body = "".join(",vazia\n" for _ in range(MAX_ERROS_IMPORTACAO + 20)).encode()
+    result = import_file(client, auth_headers, body).json()
+    assert result["failed"] == MAX_ERROS_IMPORTACAO + 20
+    assert len(result["errors"]) == MAX_ERROS_IMPORTACAO
@@ -0,0 +1,200 @@
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+
+def wait_for(client, headers, job_id, timeout=10):
+    """Consulta GET /jobs/{id} até a tarefa terminar."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}", headers=headers).json()
+        if job["status"] in ("concluida", "falhou"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"tarefa {job_id} não terminou: {job}")
+
+
+@pytest.fixture
+def stopped_pool(client):
+    """Para os workers do app: o teste executa a fila com `run_once`."""
+    from app import jobs
+
+    jobs.job_pool.shutdown()
+    pool = jobs.JobWorkerPool(workers=0, retry_base=0)
+    try:
+        yield pool
+    finally:
+        jobs.job_pool.start()
+
+
+def test_recount_stats(client, auth_headers):
+    response = client.post("/users/stats/recount", headers=auth_headers)
+    assert response.status_code == 202
+    assert response.headers["location"] == f"/jobs/{response.json()['id']}"
+    assert response.json()["status"] == "pendente"
+
+    job = wait_for(client, auth_headers, response.json()["id"])
+    assert job["status"] == "concluida"
+    assert job["resultado"] == {"corrected": False}
+    assert job["tentativas"] == 1
+
+
+def test_import_in_background(client, auth_headers):
+    body = "pergunta,resposta\nCapital da França?,Paris\n,sem pergunta\n2 + 2?,4\n"
+    response = client.post("/decks/import?background=true&titulo=Fila", content=body.encode(), headers=auth_headers)
+    assert response.status_code == 202
+    upload = _job(response.json()["id"]).parametros["path"]
+
+    job = wait_for(client, auth_headers, response.json()["id"])
+    assert job["status"] == "concluida"
+    assert (job["resultado"]["imported"], job["resultado"]["failed"]) == (2, 1)
+    assert (job["concluidos"], job["total"]) == (3, 3)
+    # O upload é apagado quando a tarefa termina
+    assert not os.path.exists(upload)
+
+    deck = client.get(f"/decks/{job['resultado']['deck']['id']}", headers=auth_headers).json()
+    assert deck["titulo"] == "Fila"
+    assert len(deck["flashcards"]) == 2
+
+
+def test_invalid_file_fails_without_retry(client, auth_headers):
+    response = client.post(
+        "/decks/import?background=true&format=apkg", content=b"PK\x03\x04 quebrado", headers=auth_headers
+    )
+    job = wait_for(client, auth_headers, response.json()["id"])
+    assert job["status"] == "falhou"
+    assert job["tentativas"] == 1
+    assert "apkg" in job["erro"]
+
+
+def test_bulk_delete_in_background(client, auth_headers):
+    deck_id = client.post("/decks/", json={
+        "titulo": "Apagar", "flashcards": [{"pergunta": "P", "resposta": "R"}],
+    }, headers=auth_headers).json()["id"]
+
+    response = client.post("/decks/bulk-delete?background=true", json={"ids": [deck_id, 999999]}, headers=auth_headers)
+    assert response.status_code == 202
+
+    job = wait_for(client, auth_headers, response.json()["id"])
+    assert job["resultado"] == {"deleted": [deck_id], "not_found": [999999]}
+    assert client.get(f"/decks/{deck_id}", headers=auth_headers).status_code == 404
+
+
+def test_export_in_background(client, auth_headers):
+    client.post("/decks/", json={
+        "titulo": "Exportar", "flashcards": [{"pergunta": "P1", "resposta": "R1"}, {"pergunta": "P2", "resposta": "R2"}],
+    }, headers=auth_headers)
+
+    response = client.post("/users/me/export", headers=auth_headers)
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    job = wait_for(client, auth_headers, job_id)
+    assert job["resultado"]["records"] == 3
+
+    download = client.get(f"/jobs/{job_id}/file", headers=auth_headers)
+    assert download.status_code == 200
+    lines = [json.loads(line) for line in gzip.decompress(download.content).splitlines()]
+    assert [line["type"] for line in lines] == ["deck", "flashcard", "flashcard"]
+
+
+def test_other_users_job_is_404(client, auth_headers):
+    job_id = client.post("/users/stats/recount", headers=auth_headers).json()["id"]
+    wait_for(client, auth_headers, job_id)
+
+    client.post("/auth/register", json={"nome": "O", "email": "jobs-outro@teste.com", "senha": "senha123"})
+    token = client.post("/auth/login", json={"email": "jobs-outro@teste.com", "senha": "senha123"}).json()["access_token"]
+    other = {"Authorization": f"Bearer {token}"}
+    assert client.get(f"/jobs/{job_id}", headers=other).status_code == 404
+    assert client.get(f"/jobs/{job_id}/file", headers=other).status_code == 404
+    # Existe, mas não é uma exportação
+    assert client.get(f"/jobs/{job_id}/file", headers=auth_headers).status_code == 409
+
+
+def _user_id(client, headers):
+    return client.get("/users/me", headers=headers).json()["id"]
+
+
+def _enqueue(user_id, kind, **params):
+    from app import database, jobs
+
+    with database.SessionLocal() as db:
+        return jobs.enqueue(db, user_id, kind, params)
+
+
+def _job(job_id):
+    from app import database, jobs
+
+    with database.SessionLocal() as db:
+        return db.get(jobs.Tarefa, job_id)
+
+
+def test_retry_with_backoff(client, auth_headers, stopped_pool, monkeypatch):
+    from app import database, jobs
+
+    calls = []
+
+    def flaky(db, job, fail_times):
+        calls.append(job.attempt)
+        if len(calls) <= fail_times:
+            raise RuntimeError("banco indisponível")
+        return {"attempt": job.attempt}
+
+    monkeypatch.setitem(jobs.HANDLERS, "flaky", jobs.JobType("flaky", flaky, 0, 3))
+    user_id = _user_id(client, auth_headers)
+
+    job_id = _enqueue(user_id, "flaky", fail_times=1).id
+    stopped_pool.retry_base = 60
+    assert stopped_pool.run_once()
+    job = _job(job_id)
+    assert (job.status, job.tentativas) == ("pendente", 1)
+    assert "banco indisponível" in job.erro
+    assert job.executar_apos > datetime.utcnow() + timedelta(seconds=50)
+    # Ainda esperando: nada a executar
+    assert not stopped_pool.run_once()
+
+    stopped_pool.retry_base = 0
+    with database.SessionLocal() as db:
+        db.execute(update(jobs.Tarefa).where(jobs.Tarefa.id == job_id).values(executar_apos=datetime.utcnow()))
+        db.commit()
+    assert stopped_pool.run_once()
+    job = _job(job_id)
+    assert (job.status, job.tentativas, job.resultado) == ("concluida", 2, {"attempt": 2})
+
+    calls.clear()
+    job_id = _enqueue(user_id, "flaky", fail_times=10).id
+    while stopped_pool.run_once():
+        pass
+    job = _job(job_id)
+    assert (job.status, job.tentativas) == ("falhou", 3)
+    assert calls == [1, 2, 3]
+
+
+def test_priority_and_expired_lease(client, auth_headers, stopped_pool, monkeypatch):
+    from app import database, jobs
+
+    order = []
+    monkeypatch.setitem(jobs.HANDLERS, "record", jobs.JobType(
+        "record", lambda db, job, name: order.append(name), 0, 3
+    ))
+    user_id = _user_id(client, auth_headers)
+
+    _enqueue(user_id, "record", name="baixa")
+    with database.SessionLocal() as db:
+        jobs.enqueue(db, user_id, "record", {"name": "alta"}, priority=10)
+    stuck = _enqueue(user_id, "record", name="interrompida").id
+    # Reservada por um processo que caiu: a reserva venceu
+    with database.SessionLocal() as db:
+        db.execute(update(jobs.Tarefa).where(jobs.Tarefa.id == stuck).values(
+            status="executando", tentativas=1, bloqueada_ate=datetime.utcnow() - timedelta(seconds=1)
+        ))
+        db.commit()
+
+    while stopped_pool.run_once():
+        pass
+    assert order == ["alta", "baixa", "interrompida"]
+    assert (_job(stuck).status, _job(stuck).tentativas) == ("concluida", 2)
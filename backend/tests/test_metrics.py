@@ -0,0 +1,104 @@
+"""
+GET /metrics (app/utils/metrics.py): latência por template de rota e
+status, comandos SQL e tempo de banco por requisição, espera no pool e o
+log de consultas lentas com a rota que as emitiu.
+"""
+import logging
+
+import pytest
+
+from app.utils import metrics
+
+
+def scrape(client) -> dict:
+    """Amostras do formato texto do Prometheus: {'nome{rótulos}': valor}."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    samples = {}
+    for line in response.text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+def delta(before: dict, after: dict, name: str) -> float:
+    return after.get(name, 0) - before.get(name, 0)
+
+
+@pytest.fixture
+def deck(client, auth_headers):
+    flashcards = [{"pergunta": f"P{i}", "resposta": f"R{i}"} for i in range(2)]
+    return client.post("/decks/", json={"titulo": "Métricas", "flashcards": flashcards}, headers=auth_headers).json()
+
+
+def test_requests_are_labelled_by_route_template(client, auth_headers, deck, count_queries):
+    before = scrape(client)
+    with count_queries() as statements:
+        client.get(f"/decks/{deck['id']}", headers=auth_headers)
+    client.get("/decks/999999999", headers=auth_headers)
+    client.get("/nao-existe")
+    after = scrape(client)
+
+    route = 'method="GET",route="/decks/{deck_id}"'
+    assert delta(before, after, f'http_request_duration_seconds_count{{{route},status="200"}}') == 1
+    assert delta(before, after, f'http_request_duration_seconds_count{{{route},status="404"}}') == 1
+    assert delta(before, after, 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}') == 1
+    assert not any(f"/decks/{deck['id']}" in name for name in after)
+
+    # Os comandos da requisição são atribuídos à rota
+    queries = 'db_request_queries_sum{route="/decks/{deck_id}"}'
+    assert delta(before, after, queries) >= len(statements) > 0
+    assert delta(before, after, 'db_request_queries_count{route="/decks/{deck_id}"}') == 2
+    assert delta(before, after, 'db_query_duration_seconds_count{route="/decks/{deck_id}"}') == delta(before, after, queries)
+
+
+def test_pool_wait_is_recorded(client, auth_headers, deck):
+    before = scrape(client)
+    client.get("/decks/", headers=auth_headers)
+    after = scrape(client)
+
+    waits = [
+        name for name in after
+        if name.startswith("db_pool_wait_seconds_count") and 'route="/decks/"' in name
+        and delta(before, after, name) > 0
+    ]
+    assert waits
+    assert any(name.startswith("db_pool_size{") for name in after)
+    assert after["http_requests_in_progress"] == 1
+
+
+def test_slow_queries_are_logged_with_route(client, auth_headers, deck, monkeypatch, caplog):
+    monkeypatch.setattr(metrics, "SLOW_QUERY_MS", 0)
+    before = scrape(client)
+    with caplog.at_level(logging.WARNING, logger="app.slow_query"):
+        client.get(f"/flashcards/deck/{deck['id']}", headers=auth_headers)
+    after = scrape(client)
+
+    messages = [record.getMessage() for record in caplog.records if record.name == "app.slow_query"]
+    assert any("/flashcards/deck/{deck_id}" in message and "flashcards" in message for message in messages)
+    assert delta(before, after, 'db_slow_queries_total{route="/flashcards/deck/{deck_id}"}') == len(messages)
+
+
+def test_histogram_rendering():
+    histogram = metrics.Histogram("exemplo_seconds", "Exemplo.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(3, "/a")
+
+    assert list(histogram.render()) == [
+        "# HELP exemplo_seconds Exemplo.",
+        "# TYPE exemplo_seconds histogram",
+        'exemplo_seconds_bucket{route="/a",le="0.1"} 1',
+        'exemplo_seconds_bucket{route="/a",le="1"} 2',
+        'exemplo_seconds_bucket{route="/a",le="+Inf"} 3',
+        'exemplo_seconds_sum{route="/a"} 3.55',
+        'exemplo_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = metrics.Counter("exemplo_total", "Exemplo.", ("route",))
+    counter.inc('/a"b\\c\n')
+    assert list(counter.render())[-1] == 'exemplo_total{route="/a\\"b\\\\c\\n"} 1'
@@ -0,0 +1,78 @@
+"""
+Paginação por keyset (`limit`/`cursor`) e projeção (`fields=`) nas
+listagens de decks e flashcards; sem esses parâmetros, a lista completa.
+"""
+import pytest
+
+
+@pytest.fixture
+def library(client, auth_headers):
+    decks = []
+    for d in range(3):
+        flashcards = [{"pergunta": f"D{d} P{i}", "resposta": f"D{d} R{i}"} for i in range(5)]
+        response = client.post("/decks/", json={"titulo": f"Deck {d}", "flashcards": flashcards}, headers=auth_headers)
+        decks.append(response.json())
+    return decks
+
+
+def walk(client, headers, url: str, limit: int, extra: str = ""):
+    """Percorre todas as páginas; retorna a lista de páginas."""
+    pages, cursor = [], None
+    while True:
+        query = f"?limit={limit}{extra}" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url + query, headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        pages.append(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_flashcard_pages_cover_the_library_once(client, auth_headers, library):
+    full = client.get("/flashcards/all", headers=auth_headers).json()
+    assert isinstance(full, list) and len(full) == 15
+
+    pages = walk(client, auth_headers, "/flashcards/all", 4)
+    assert [len(page) for page in pages] == [4, 4, 4, 3]
+    assert [card["id"] for page in pages for card in page] == sorted(card["id"] for card in full)
+
+
+def test_deck_flashcards_and_decks_paginate(client, auth_headers, library):
+    deck_id = library[1]["id"]
+    pages = walk(client, auth_headers, f"/flashcards/deck/{deck_id}", 2)
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert {card["deck_id"] for page in pages for card in page} == {deck_id}
+
+    pages = walk(client, auth_headers, "/decks/", 2)
+    assert [deck["titulo"] for page in pages for deck in page] == ["Deck 0", "Deck 1", "Deck 2"]
+
+
+def test_exact_multiple_has_no_empty_last_page(client, auth_headers, library):
+    pages = walk(client, auth_headers, "/flashcards/all", 5)
+    assert [len(page) for page in pages] == [5, 5, 5]
+
+
+def test_fields_projection(client, auth_headers, library):
+    page = client.get("/flashcards/all?fields=pergunta&limit=3", headers=auth_headers).json()
+    # O id sempre vem junto: é a chave do cursor
+    assert all(set(card) == {"id", "pergunta"} for card in page["items"])
+
+    decks = client.get("/decks/?fields=titulo", headers=auth_headers).json()
+    assert [set(deck) for deck in decks["items"]] == [{"id", "titulo"}] * 3
+
+
+def test_invalid_params_are_rejected(client, auth_headers, library):
+    assert client.get("/flashcards/all?fields=senha", headers=auth_headers).status_code == 400
+    assert client.get("/flashcards/all?cursor=nao-e-cursor", headers=auth_headers).status_code == 400
+    assert client.get("/flashcards/all?limit=0", headers=auth_headers).status_code == 422
+    assert client.get("/flashcards/all?limit=100000", headers=auth_headers).status_code == 422
+
+
+def test_pages_only_show_own_cards(client, auth_headers, new_user, library):
+    other = new_user()
+    client.post("/decks/", json={"titulo": "Alheio", "flashcards": [{"pergunta": "X", "resposta": "Y"}]}, headers=other)
+
+    pages = walk(client, other, "/flashcards/all", 10)
+    assert [card["pergunta"] for page in pages for card in page] == ["X"]
+    assert client.get(f"/flashcards/deck/{library[0]['id']}?limit=5", headers=other).status_code == 404
@@ -0,0 +1,61 @@
+"""
+bcrypt no pool dedicado (app/utils/hasher.py): truncamento em 72 bytes,
+fila cheia respondendo 503 e rehash de hashes com custo antigo no login.
+"""
+from passlib.hash import bcrypt
+from sqlalchemy import select, update
+
+from app import database
+from app.config import BCRYPT_ROUNDS
+from app.models import Usuario
+from app.utils import security
+from app.utils.hasher import password_hasher
+
+
+def stored_hash(email: str) -> str:
+    with database.SessionLocal() as db:
+        return db.execute(select(Usuario.senha).where(Usuario.email == email)).scalar()
+
+
+def test_passwords_are_truncated_to_72_bytes():
+    # "é" ocupa 2 bytes: o corte no byte 72 não pode quebrar o caractere
+    long_password = "é" * 36 + "resto ignorado"
+    hashed = security.hash_password(long_password)
+    assert security.verify_password("é" * 36, hashed)
+    assert security.verify_and_update_password("é" * 36 + "outro resto", hashed)[0]
+    assert not security.verify_password("é" * 35, hashed)
+
+
+def test_full_hasher_queue_fails_fast_with_503(client, monkeypatch):
+    client.post("/auth/register", json={"nome": "N", "email": "fila@teste.com", "senha": "senha123"})
+
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    response = client.post("/auth/login", json={"email": "fila@teste.com", "senha": "senha123"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_login_rehashes_old_cost(client):
+    email = "custo@teste.com"
+    client.post("/auth/register", json={"nome": "N", "email": email, "senha": "senha123"})
+    old_hash = bcrypt.using(rounds=4).hash("senha123")
+    with database.SessionLocal() as db:
+        db.execute(update(Usuario).where(Usuario.email == email).values(senha=old_hash))
+        db.commit()
+
+    response = client.post("/auth/login", json={"email": email, "senha": "senha123"})
+    assert response.status_code == 200
+    new_hash = stored_hash(email)
+    assert new_hash != old_hash
+    assert bcrypt.from_string(new_hash).rounds == BCRYPT_ROUNDS
+    assert security.verify_password("senha123", new_hash)
+
+    # Já no custo atual: nada é regravado
+    client.post("/auth/login", json={"email": email, "senha": "senha123"})
+    assert stored_hash(email) == new_hash
+
+
+def test_wrong_password_is_rejected(client):
+    client.post("/auth/register", json={"nome": "N", "email": "errada@teste.com", "senha": "senha123"})
+    response = client.post("/auth/login", json={"email": "errada@teste.com", "senha": "outra"})
+    assert response.status_code == 401
@@ -0,0 +1,116 @@
+"""
+Limite de requisições (app/utils/ratelimit.py): login e cadastro por IP e
+por email, escritas por usuário, 429 com Retry-After. Nos testes o limite
+fica desligado (conftest); aqui cada teste liga o limitador com baldes
+novos.
+"""
+import time
+from itertools import count
+
+import pytest
+
+from app.utils import ratelimit
+from app.utils.ratelimit import MemoryBackend, RateLimiter, RateLimitExceeded, Rule, rate_limiter
+
+_emails = count()
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+    monkeypatch.setattr(rate_limiter, "backend", MemoryBackend())
+    return rate_limiter
+
+
+def login(client, email: str, path: str = "/auth/login"):
+    return client.post(path, json={"email": email, "senha": "errada123"})
+
+
+def test_login_is_limited_per_email(client, limiter):
+    email = f"alvo{next(_emails)}@teste.com"
+    for _ in range(ratelimit.AUTH_EMAIL.burst):
+        assert login(client, email).status_code == 401
+
+    # Mesmo email com outra caixa e pela outra rota de login: mesmo balde
+    response = login(client, email.upper(), "/users/login")
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Muitas requisições, tente novamente mais tarde."}
+    retry_after = int(response.headers["retry-after"])
+    assert 1 <= retry_after <= 1 / ratelimit.AUTH_EMAIL.rate + 1
+
+    assert login(client, f"outro{next(_emails)}@teste.com").status_code == 401
+
+
+def test_auth_routes_are_limited_per_ip(client, limiter):
+    for _ in range(ratelimit.AUTH_IP.burst):
+        assert login(client, f"ip{next(_emails)}@teste.com").status_code == 401
+
+    register = client.post("/auth/register", json={"nome": "N", "email": f"ip{next(_emails)}@teste.com", "senha": "senha123"})
+    assert register.status_code == 429
+    assert "retry-after" in register.headers
+
+
+def test_writes_are_limited_per_user(client, new_user, limiter, monkeypatch):
+    headers, other = new_user(), new_user()
+    monkeypatch.setattr("app.dependencies.WRITES", Rule("writes", burst=3, rate=1 / 60))
+
+    for i in range(3):
+        assert client.post("/decks/", json={"titulo": f"Deck {i}"}, headers=headers).status_code == 201
+    response = client.post("/decks/", json={"titulo": "Demais"}, headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) == 60
+
+    # Leituras e escritas de outros usuários continuam
+    assert len(client.get("/decks/", headers=headers).json()) == 3
+    assert client.post("/decks/", json={"titulo": "Outro"}, headers=other).status_code == 201
+
+
+def test_bucket_refills_over_time(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    limiter = RateLimiter(MemoryBackend())
+    rule = Rule.parse("teste", "2/10")
+    assert (rule.burst, rule.rate) == (2, 0.2)
+
+    limiter.hit(rule, "chave")
+    limiter.hit(rule, "chave")
+    with pytest.raises(RateLimitExceeded) as exceeded:
+        limiter.hit(rule, "chave")
+    assert exceeded.value.retry_after == 5
+
+    now[0] += 5
+    limiter.hit(rule, "chave")
+    with pytest.raises(RateLimitExceeded):
+        limiter.hit(rule, "chave")
+    # Chaves e regras diferentes têm baldes próprios
+    limiter.hit(rule, "outra")
+    limiter.hit(Rule("outra-regra", 1, 1), "chave")
+
+
+def test_disabled_limiter_never_raises():
+    limiter = RateLimiter(MemoryBackend(), enabled=False)
+    for _ in range(10):
+        limiter.hit(Rule("teste", 1, 0.001), "chave")
+
+
+def test_full_shard_evicts_keys():
+    backend = MemoryBackend(shards=1, max_keys_per_shard=4)
+    rule = Rule("teste", 5, 0.001)
+    for key in range(20):
+        assert backend.acquire(key, rule) == 0.0
+    assert len(backend._buckets[0]) <= 4
+
+
+def test_backend_is_pluggable():
+    assert isinstance(ratelimit.load_backend("memory"), MemoryBackend)
+    assert isinstance(ratelimit.load_backend("app.utils.ratelimit:MemoryBackend"), MemoryBackend)
+
+
+def test_hit_overhead_is_below_50_microseconds():
+    limiter = RateLimiter(MemoryBackend())
+    rule = Rule("teste", 10**9, 10**9)
+    calls = 20_000
+    started = time.perf_counter()
+    for i in range(calls):
+        limiter.hit(rule, i % 1000)
+    assert (time.perf_counter() - started) / calls < 50e-6
@@ -0,0 +1,130 @@
+"""
+Réplica de leitura: os GETs roteáveis (`get_read_session`) vão para a
+réplica, exceto logo depois de uma escrita do mesmo usuário
+(`recent_writes`), e as escritas ficam sempre no primário. Aqui a réplica é
+um segundo arquivo SQLite que não recebe replicação, então o que cada
+leitura devolve mostra de qual banco ela veio.
+"""
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.models import Deck, EstatisticaUsuario, Usuario
+
+
+@pytest.fixture
+def replica(client, tmp_path, monkeypatch):
+    """Liga uma réplica vazia (mesmo schema) no lugar do primário para as leituras."""
+    url = f"sqlite:///{tmp_path}/replica.db"
+    engine = database._create_engine(url, "replica")
+    database.Base.metadata.create_all(engine)
+
+    options = dict(autoflush=False, expire_on_commit=False, info={database.READ_ONLY: True})
+    monkeypatch.setattr(database, "read_engine", engine)
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(
+        class_=database.ShardedSession, autocommit=False, bind=engine, shard_binds=[engine], **options
+    ))
+    async_engine = None
+    if database.AsyncSessionLocal is not None:
+        async_engine = database._create_async_engine(database.to_async_url(url), "replica-async")
+        monkeypatch.setattr(database, "AsyncReadSessionLocal", async_sessionmaker(
+            async_engine, sync_session_class=database.ShardedSession, shard_binds=[async_engine], **options
+        ))
+    monkeypatch.setattr(database, "recent_writes", database.RecentWrites(window=60))
+
+    yield engine
+    engine.dispose()
+    if async_engine is not None:
+        client.portal.call(async_engine.dispose)
+
+
+def copy_user(replica, headers, client) -> int:
+    """Replica a linha do usuário (as tabelas dos decks têm chave estrangeira para ela)."""
+    user_id = client.get("/users/me", headers=headers).json()["id"]
+    with database.engine.connect() as conn:
+        row = conn.execute(select(Usuario.__table__).where(Usuario.id == user_id)).mappings().one()
+    with replica.begin() as conn:
+        conn.execute(insert(Usuario.__table__).values(**row))
+    return user_id
+
+
+def forget_writes(monkeypatch):
+    """Como se REPLICA_STICKY_SECONDS já tivesse passado."""
+    monkeypatch.setattr(database, "recent_writes", database.RecentWrites(window=60))
+
+
+def titles(client, headers) -> list:
+    return [deck["titulo"] for deck in client.get("/decks/", headers=headers).json()]
+
+
+def test_reads_see_own_writes_then_go_to_replica(client, new_user, replica, monkeypatch):
+    headers = new_user()
+    user_id = copy_user(replica, headers, client)
+    with replica.begin() as conn:
+        conn.execute(insert(Deck.__table__).values(usuario_id=user_id, titulo="Só na réplica"))
+
+    forget_writes(monkeypatch)
+    assert titles(client, headers) == ["Só na réplica"]
+
+    # A escrita vai ao primário e as leituras seguintes do usuário também
+    created = client.post("/decks/", json={"titulo": "No primário"}, headers=headers)
+    assert created.status_code == 201
+    assert titles(client, headers) == ["No primário"]
+    with replica.connect() as conn:
+        assert conn.execute(select(Deck.titulo).where(Deck.usuario_id == user_id)).scalars().all() == ["Só na réplica"]
+
+    forget_writes(monkeypatch)
+    assert titles(client, headers) == ["Só na réplica"]
+
+
+def test_sticky_reads_are_per_user(client, new_user, replica, monkeypatch):
+    writer, reader = new_user(), new_user()
+    copy_user(replica, reader, client)
+    forget_writes(monkeypatch)
+
+    client.post("/decks/", json={"titulo": "Escrita"}, headers=writer)
+    client.post("/decks/", json={"titulo": "Do leitor"}, headers=reader)
+    forget_writes(monkeypatch)
+    client.post("/decks/", json={"titulo": "Outra escrita"}, headers=writer)
+
+    # Só quem escreveu por último fica no primário
+    assert titles(client, writer) == ["Escrita", "Outra escrita"]
+    assert titles(client, reader) == []
+
+
+def test_stats_on_replica_without_row_does_not_write(client, new_user, replica, monkeypatch):
+    headers = new_user()
+    user_id = copy_user(replica, headers, client)
+    forget_writes(monkeypatch)
+
+    response = client.get("/users/stats", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["total_decks"] == 0
+    with replica.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(EstatisticaUsuario)).scalar() == 0
+
+
+def test_recent_writes_window_and_size():
+    writes = database.RecentWrites(window=60, max_size=2)
+    for user_id in (1, 2, 3):
+        writes.mark(user_id)
+    assert [writes.is_recent(user_id) for user_id in (1, 2, 3, 4)] == [False, True, True, False]
+
+    expired = database.RecentWrites(window=0)
+    expired.mark(1)
+    assert not expired.is_recent(1)
+
+
+def test_engine_options_from_settings(monkeypatch):
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(database, "DB_POOL_RECYCLE", 120)
+
+    options = database.engine_options("mysql+pymysql://u:p@db/estudeai")
+    assert (options["pool_size"], options["pool_recycle"]) == (7, 120)
+    assert options["connect_args"] == {"connect_timeout": database.DB_CONNECT_TIMEOUT}
+    # SQLite em memória não aceita os parâmetros de pool
+    assert "pool_size" not in database.engine_options("sqlite://")
+    assert database.engine_options("sqlite:///arquivo.db")["pool_size"] == 7
+    assert database.to_async_url("mysql+pymysql://u:p@db/estudeai") == "mysql+aiomysql://u:p@db/estudeai"
@@ -0,0 +1,116 @@
+"""
+Envio de respostas em lote (POST /reviews/batch): reenvios, inclusive
+simultâneos, não gravam o mesmo `client_event_id` duas vezes.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Barrier
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app import crud, database
+from app.models import Revisao
+
+
+@pytest.fixture
+def cards(client, auth_headers):
+    flashcards = [{"pergunta": f"P{i}", "resposta": f"R{i}"} for i in range(5)]
+    deck = client.post("/decks/", json={"titulo": "Lote", "flashcards": flashcards}, headers=auth_headers).json()
+    return [card["id"] for card in deck["flashcards"]]
+
+
+def make_batch(card_ids, prefix: str) -> dict:
+    start = datetime(2026, 1, 1, 9, 0)
+    return {"events": [
+        {"client_event_id": f"{prefix}-{i}", "card_id": card_id, "rating": "facil",
+         "answered_at": (start + timedelta(minutes=i)).isoformat()}
+        for i, card_id in enumerate(card_ids)
+    ]}
+
+
+def stored_events(user_id: int, prefix: str) -> int:
+    with database.SessionLocal() as db:
+        return db.execute(
+            select(func.count()).select_from(Revisao)
+            .where(Revisao.usuario_id == user_id, Revisao.client_event_id.like(f"{prefix}-%"))
+        ).scalar()
+
+
+def user_id(client, headers) -> int:
+    return client.get("/users/me", headers=headers).json()["id"]
+
+
+def test_resubmitting_a_batch_reports_duplicates(client, auth_headers, cards):
+    batch = make_batch(cards, "repetido")
+
+    first = client.post("/reviews/batch", json=batch, headers=auth_headers).json()
+    assert (first["accepted"], first["duplicates"], first["rejected"]) == (5, [], [])
+    second = client.post("/reviews/batch", json=batch, headers=auth_headers).json()
+    assert second["accepted"] == 0
+    assert sorted(second["duplicates"]) == sorted(event["client_event_id"] for event in batch["events"])
+
+    assert stored_events(user_id(client, auth_headers), "repetido") == 5
+    assert client.get("/users/stats", headers=auth_headers).json()["total_cards_studied"] == 5
+
+
+def test_duplicates_inside_one_batch_and_foreign_cards(client, auth_headers, new_user, cards):
+    batch = make_batch(cards[:2], "interno")
+    batch["events"].append(dict(batch["events"][0]))
+    foreign = client.post("/decks/", json={"titulo": "Alheio", "flashcards": [{"pergunta": "X", "resposta": "Y"}]}, headers=new_user()).json()
+    batch["events"] += make_batch([foreign["flashcards"][0]["id"]], "alheio")["events"]
+
+    result = client.post("/reviews/batch", json=batch, headers=auth_headers).json()
+    assert result["accepted"] == 2
+    assert result["duplicates"] == ["interno-0"]
+    assert [error["client_event_id"] for error in result["rejected"]] == ["alheio-0"]
+
+
+def test_overlapping_submits_write_each_event_once(client, auth_headers, cards):
+    batch = make_batch(cards, "paralelo")
+    start = Barrier(4)
+
+    def submit(_):
+        start.wait()
+        return client.post("/reviews/batch", json=batch, headers=auth_headers)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        responses = list(pool.map(submit, range(4)))
+
+    assert [response.status_code for response in responses] == [200] * 4
+    results = [response.json() for response in responses]
+    assert sum(result["accepted"] for result in results) == 5
+    assert sum(len(result["duplicates"]) for result in results) == 15
+    assert stored_events(user_id(client, auth_headers), "paralelo") == 5
+    assert client.get("/users/stats", headers=auth_headers).json()["total_cards_studied"] == 5
+
+
+def test_unique_violation_is_retried_as_duplicate(client, auth_headers, cards, monkeypatch):
+    owner = user_id(client, auth_headers)
+    batch = make_batch(cards[:2], "corrida")["events"]
+    for event in batch:
+        event["answered_at"] = datetime.fromisoformat(event["answered_at"])
+
+    # Simula o envio concorrente que grava um dos eventos depois da procura
+    # por duplicados (sem a trava da biblioteca, que normalmente o impede)
+    apply_review = crud.apply_review
+    raced = []
+
+    def racing_apply_review(db, progress, rating, answered_at):
+        if not raced:
+            raced.append(True)
+            with database.engine.begin() as conn:
+                conn.execute(insert(Revisao).values(
+                    usuario_id=owner, flashcard_id=cards[0], rating="facil",
+                    answered_at=datetime(2026, 1, 1), client_event_id="corrida-0", criado_em=datetime.utcnow()
+                ))
+        return apply_review(db, progress, rating, answered_at)
+
+    monkeypatch.setattr(crud, "lock_library", lambda db, user_id: None)
+    monkeypatch.setattr(crud, "apply_review", racing_apply_review)
+    with database.SessionLocal() as db:
+        result = crud.record_reviews_batch(db, owner, batch)
+
+    assert result.accepted == 1
+    assert result.duplicates == ["corrida-0"]
+    assert stored_events(owner, "corrida") == 2
@@ -0,0 +1,97 @@
+"""
+Agendamento SM-2 (app/utils/srs.py) e a fila de cards vencidos
+(GET /study/due), que deve continuar sendo um range scan no índice.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import crud
+from app.utils.srs import MIN_EASE, RELEARN_DELAY, ReviewState, schedule
+
+NOW = datetime(2026, 1, 1, 12, 0)
+
+
+def test_correct_answers_grow_the_interval():
+    first = schedule(ReviewState(), "facil", NOW)
+    second = schedule(first, "facil", NOW)
+    third = schedule(second, "facil", NOW)
+
+    assert [s.interval_days for s in (first, second)] == [1.0, 6.0]
+    assert third.interval_days == round(6.0 * third.ease, 2)
+    assert third.repetitions == 3
+    assert third.due_at == NOW + timedelta(days=third.interval_days)
+    # "fácil" (4) mantém o fator; "muito-fácil" (5) aumenta; "difícil" (3) diminui
+    assert first.ease == 2.5
+    assert schedule(ReviewState(), "muito-facil", NOW).ease > 2.5
+    assert schedule(ReviewState(), "dificil", NOW).ease < 2.5
+
+
+def test_wrong_answer_is_a_lapse():
+    learned = schedule(schedule(ReviewState(), "facil", NOW), "facil", NOW)
+    lapsed = schedule(learned, "errei", NOW)
+
+    assert (lapsed.repetitions, lapsed.lapses, lapsed.interval_days) == (0, 1, 0.0)
+    assert lapsed.due_at == NOW + RELEARN_DELAY
+    assert lapsed.ease < learned.ease
+
+
+def test_ease_has_a_floor():
+    state = ReviewState()
+    for _ in range(20):
+        state = schedule(state, "errei", NOW)
+    assert state.ease == MIN_EASE
+
+
+@pytest.fixture
+def deck(client, auth_headers):
+    flashcards = [{"pergunta": f"P{i}", "resposta": f"R{i}"} for i in range(4)]
+    return client.post("/decks/", json={"titulo": "Estudo", "flashcards": flashcards}, headers=auth_headers).json()
+
+
+def review(client, headers, card_id: int, rating: str):
+    response = client.post("/study/review", json={"flashcard_id": card_id, "rating": rating}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def due_ids(client, headers, query: str = ""):
+    response = client.get(f"/study/due{query}", headers=headers)
+    assert response.status_code == 200
+    return [card["id"] for card in response.json()]
+
+
+def test_due_queue_follows_reviews(client, auth_headers, deck):
+    ids = [card["id"] for card in deck["flashcards"]]
+    assert due_ids(client, auth_headers) == ids
+
+    learned = review(client, auth_headers, ids[0], "facil")
+    assert (learned["repetitions"], learned["interval_days"]) == (1, 1.0)
+    lapsed = review(client, auth_headers, ids[1], "errei")
+    assert lapsed["lapses"] == 1
+
+    assert due_ids(client, auth_headers) == ids[2:]
+    assert due_ids(client, auth_headers, "?limit=1") == ids[2:3]
+    assert review(client, auth_headers, ids[0], "facil")["interval_days"] == 6.0
+
+
+def test_due_queue_filters_by_deck_and_owner(client, auth_headers, new_user, deck):
+    other = client.post("/decks/", json={"titulo": "Outro", "flashcards": [{"pergunta": "X", "resposta": "Y"}]}, headers=auth_headers).json()
+
+    assert due_ids(client, auth_headers, f"?deck_id={other['id']}") == [other["flashcards"][0]["id"]]
+    stranger = new_user()
+    assert due_ids(client, stranger) == []
+    response = client.post("/study/review", json={"flashcard_id": deck["flashcards"][0]["id"], "rating": "facil"}, headers=stranger)
+    assert response.status_code == 404
+
+
+def test_due_query_is_an_index_range_scan(client, auth_headers, deck, query_plans):
+    user_id = client.get("/users/me", headers=auth_headers).json()["id"]
+
+    plan, = query_plans(crud.list_due_cards, user_id, None, 20, datetime.utcnow())
+    assert "ix_progresso_usuario_due (usuario_id=? AND due_at<?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+    plan, = query_plans(crud.list_due_cards, user_id, deck["id"], 20, datetime.utcnow())
+    assert "ix_progresso_usuario_deck_resumo (usuario_id=? AND deck_id=? AND due_at<?)" in plan
+    assert "TEMP B-TREE" not in plan
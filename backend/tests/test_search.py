@@ -0,0 +1,150 @@
+"""
+Busca textual (GET /flashcards/search): índice FTS5 mantido pelos triggers,
+sem acentos, prefixo na última palavra, só nos decks do usuário (filtrados
+dentro do próprio MATCH) e LIKE para prefixos curtos demais para o índice.
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import crud, search
+from app.database import Base
+
+
+def search_texts(client, headers, q: str, **params) -> list:
+    response = client.get("/flashcards/search", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200
+    return [hit["pergunta"] for hit in response.json()["items"]]
+
+
+def create_deck(client, headers, cards) -> dict:
+    flashcards = [{"pergunta": pergunta, "resposta": resposta} for pergunta, resposta in cards]
+    return client.post("/decks/", json={"titulo": "Busca", "flashcards": flashcards}, headers=headers).json()
+
+
+@pytest.fixture
+def biology(client, auth_headers):
+    return create_deck(client, auth_headers, [
+        ("O que é fotossíntese?", "Conversão de luz em energia química."),
+        ("Onde ocorre a mitose?", "Nas células somáticas."),
+        ("Função da mitocôndria", "Respiração celular: a usina de energia da célula."),
+        ("Capital do Brasil", "Brasília"),
+        ("Energia", "Energia cinética e energia potencial."),
+    ])
+
+
+def test_accents_prefix_and_ranking(client, auth_headers, biology):
+    assert search_texts(client, auth_headers, "fotossintese") == ["O que é fotossíntese?"]
+    assert search_texts(client, auth_headers, "FOTOSS") == ["O que é fotossíntese?"]
+    assert sorted(search_texts(client, auth_headers, "mito")) == ["Função da mitocôndria", "Onde ocorre a mitose?"]
+    # Todas as palavras são obrigatórias
+    assert search_texts(client, auth_headers, "energia celula") == ["Função da mitocôndria"]
+    # O card com o termo na pergunta e três vezes no total vem primeiro
+    assert search_texts(client, auth_headers, "energia")[0] == "Energia"
+    assert search_texts(client, auth_headers, "inexistente") == []
+
+
+def test_results_are_paginated(client, auth_headers):
+    create_deck(client, auth_headers, [(f"Paginação {i}", "resposta") for i in range(5)])
+
+    first = client.get("/flashcards/search", params={"q": "paginacao", "limit": 3}, headers=auth_headers).json()
+    second = client.get(
+        "/flashcards/search", params={"q": "paginacao", "limit": 3, "cursor": first["next_cursor"]}, headers=auth_headers
+    ).json()
+    assert len(first["items"]) == 3 and len(second["items"]) == 2
+    assert second["next_cursor"] is None
+    assert {hit["id"] for hit in first["items"]}.isdisjoint(hit["id"] for hit in second["items"])
+
+
+def test_search_only_sees_own_decks(client, auth_headers, new_user, biology):
+    other = new_user()
+    create_deck(client, other, [("Fotossíntese alheia", "luz")])
+
+    assert search_texts(client, auth_headers, "fotossintese") == ["O que é fotossíntese?"]
+    assert search_texts(client, other, "fotossintese") == ["Fotossíntese alheia"]
+    # Sem decks e no LIKE dos prefixos curtos: nada de outro usuário
+    assert search_texts(client, new_user(), "fotossintese") == []
+    assert search_texts(client, other, "f") == ["Fotossíntese alheia"]
+
+
+def test_index_follows_updates_and_deletes(client, auth_headers, biology):
+    card_id = biology["flashcards"][3]["id"]
+    client.put(f"/flashcards/{card_id}", json={"pergunta": "Capital da Argentina", "resposta": "Buenos Aires"}, headers=auth_headers)
+    assert search_texts(client, auth_headers, "brasilia") == []
+    assert search_texts(client, auth_headers, "buenos") == ["Capital da Argentina"]
+
+    client.delete(f"/flashcards/{card_id}", headers=auth_headers)
+    assert search_texts(client, auth_headers, "buenos") == []
+    client.delete(f"/decks/{biology['id']}", headers=auth_headers)
+    assert search_texts(client, auth_headers, "mitose") == []
+
+
+def test_short_prefixes_fall_back_to_like(client, auth_headers, biology):
+    # Uma letra: abaixo do menor prefixo indexado, vai para o LIKE
+    assert search_texts(client, auth_headers, "b") == ["Capital do Brasil"]
+    assert search_texts(client, auth_headers, "mitose n") == ["Onde ocorre a mitose?"]
+    assert search_texts(client, auth_headers, "mitose z") == []
+
+
+def test_mysql_terms_shorter_than_token_size_become_like_filters():
+    backend = search.MySQLFulltextBackend()
+    assert backend.split_terms(["ab"]) == ([], None, ["ab"])
+    assert backend.split_terms(["celula", "ab"]) == (["celula"], None, ["ab"])
+    assert backend.split_terms(["de", "celula", "mit"]) == (["celula"], "mit", ["de"])
+
+    sqlite = search.SQLiteFTS5Backend()
+    assert sqlite.split_terms(["a", "celula", "m"]) == (["a", "celula"], None, ["m"])
+    assert sqlite.split_terms(["mi"]) == ([], "mi", [])
+
+
+def test_like_patterns_escape_wildcards():
+    filters, params = search.like_filters(["a_b"], ("pergunta", "resposta"))
+    assert params == {"like_0": "%a!_b%"}
+    assert filters == " AND (pergunta LIKE :like_0 ESCAPE '!' OR resposta LIKE :like_0 ESCAPE '!')"
+
+
+def test_user_filter_is_inside_the_fts_query(client, auth_headers, biology, query_plans):
+    user_id = client.get("/users/me", headers=auth_headers).json()["id"]
+
+    plan, = query_plans(crud.search_flashcards, user_id, "energia", 20, None)
+    assert "SCAN flashcards_fts VIRTUAL TABLE" in plan
+    assert "SEARCH d USING COVERING INDEX ix_decks_usuario_" in plan
+    # O deck de cada card encontrado não é mais consultado depois do MATCH
+    assert "SEARCH d USING INTEGER PRIMARY KEY" not in plan
+
+
+def test_install_upgrades_index_without_deck_column(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/antigo.db")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for trigger in search.SQLiteFTS5Backend.TRIGGERS:
+            conn.exec_driver_sql(f"DROP TRIGGER {trigger}")
+        conn.exec_driver_sql("DROP TABLE flashcards_fts")
+        conn.exec_driver_sql(
+            "CREATE VIRTUAL TABLE flashcards_fts USING fts5(pergunta, resposta, content='flashcards', content_rowid='id')"
+        )
+        conn.exec_driver_sql("INSERT INTO usuarios (id, nome, email, senha, shard) VALUES (1, 'N', 'n@teste.com', 'x', 0)")
+        conn.exec_driver_sql("INSERT INTO decks (id, usuario_id, titulo) VALUES (1, 1, 'Antigo')")
+        conn.exec_driver_sql("INSERT INTO flashcards (id, deck_id, pergunta, resposta) VALUES (1, 1, 'Célula antiga', 'R')")
+
+    backend = search.SQLiteFTS5Backend()
+    with engine.begin() as conn:
+        backend.install(conn)
+    with engine.connect() as conn:
+        columns = [row[1] for row in conn.exec_driver_sql("PRAGMA table_info(flashcards_fts)")]
+        assert columns == ["pergunta", "resposta", "deck_id"]
+
+    with Session(engine) as db:
+        assert [row.pergunta for row in backend.search(db, 1, ["celula"], 10, 0)] == ["Célula antiga"]
+    engine.dispose()
+
+
+def test_candidate_cap_keeps_the_most_relevant(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(search, "MAX_CANDIDATES", 3)
+    create_deck(client, auth_headers, [(f"Pergunta {i}", f"Resposta longa que cita osmose uma vez {i}") for i in range(5)])
+    # O mais relevante tem o maior id: não pode ficar de fora do corte
+    create_deck(client, auth_headers, [("Osmose", "Osmose")])
+
+    hits = search_texts(client, auth_headers, "osmose", limit=10)
+    assert len(hits) == 3
+    assert hits[0] == "Osmose"
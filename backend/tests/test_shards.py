@@ -0,0 +1,205 @@
+"""
+Shards: os dados de cada usuário num banco (aqui, três arquivos SQLite, o
+primeiro sendo o próprio DATABASE_URL) e a mudança de shard com
+`app.shards.move_user`.
+"""
+from itertools import count
+
+import pytest
+from sqlalchemy import delete, func, select, update
+
+from app.models import Biblioteca, Deck, Progresso, Revisao, Usuario
+
+_emails = count()
+
+
+@pytest.fixture(scope="module")
+def three_shards(client, tmp_path_factory):
+    from app import database, shards
+
+    directory = tmp_path_factory.mktemp("shards")
+    for index in (1, 2):
+        assert database.add_shard(f"sqlite:///{directory}/shard{index}.db") == index
+        shards.create_tables(database.shard_engines[index])
+    try:
+        yield
+    finally:
+        for engine in database.shard_engines[1:]:
+            engine.dispose()
+        for engines in (
+            database.shard_engines, database.read_shard_engines,
+            database.async_shard_engines, database.async_read_shard_engines,
+        ):
+            del engines[1:]
+
+
+def register_on(client, shard: int):
+    """Cadastra um usuário cujo email cai no `shard`; retorna (headers, id)."""
+    from app.shards import assign_shard
+
+    email = f"shard{next(_emails)}@teste.com"
+    while assign_shard(email) != shard:
+        email = f"shard{next(_emails)}@teste.com"
+    client.post("/auth/register", json={"nome": "Shard", "email": email, "senha": "senha123"})
+    token = client.post("/auth/login", json={"email": email, "senha": "senha123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    return headers, client.get("/users/me", headers=headers).json()["id"]
+
+
+def rows_on(shard: int, model, user_id: int) -> int:
+    from app import database
+
+    with database.shard_engines[shard].connect() as conn:
+        return conn.execute(select(func.count()).select_from(model).where(model.usuario_id == user_id)).scalar()
+
+
+def create_deck(client, headers, titulo: str, cards: int) -> dict:
+    flashcards = [{"pergunta": f"{titulo} {i}", "resposta": f"R{i}"} for i in range(cards)]
+    response = client.post("/decks/", json={"titulo": titulo, "flashcards": flashcards}, headers=headers)
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_each_user_reads_and_writes_only_on_own_shard(client, three_shards):
+    from app import database
+
+    users = [register_on(client, shard) for shard in (0, 1, 2)]
+    for shard, (headers, user_id) in enumerate(users):
+        create_deck(client, headers, f"Deck do shard {shard}", 2)
+        with database.SessionLocal() as db:
+            assert db.get(Usuario, user_id).shard == shard
+
+    for shard, (headers, user_id) in enumerate(users):
+        assert [deck["titulo"] for deck in client.get("/decks/", headers=headers).json()] == [f"Deck do shard {shard}"]
+        assert [rows_on(other, Deck, user_id) for other in (0, 1, 2)] == [int(other == shard) for other in (0, 1, 2)]
+        assert rows_on(shard, Biblioteca, user_id) == 1
+
+        # Leituras pela "réplica", revisões, busca e estatísticas também vão ao shard do usuário
+        card = client.get("/flashcards/all", headers=headers).json()[0]
+        assert client.post("/study/review", json={"flashcard_id": card["id"], "rating": "facil"}, headers=headers).status_code == 200
+        assert client.get("/flashcards/search?q=shard", headers=headers).json()["items"]
+        stats = client.get("/users/stats", headers=headers).json()
+        assert (stats["total_decks"], stats["total_cards"], stats["total_cards_studied"]) == (1, 2, 1)
+
+
+def test_move_user_copies_library_and_forces_full_sync(client, three_shards):
+    from app import database, shards
+
+    headers, user_id = register_on(client, 1)
+    deck = create_deck(client, headers, "Mudança", 3)
+    card_id = deck["flashcards"][0]["id"]
+    client.post("/study/review", json={"flashcard_id": card_id, "rating": "facil"}, headers=headers)
+    client.delete(f"/flashcards/{deck['flashcards'][2]['id']}", headers=headers)
+    cursor = client.get("/sync", headers=headers).json()["cursor"]
+    stats_before = client.get("/users/stats", headers=headers).json()
+
+    copied = shards.move_user(user_id, 2, wait=0)
+    assert copied == {"decks": 1, "flashcards": 2, "progresso": 2, "revisoes": 1}
+
+    with database.SessionLocal() as db:
+        assert db.get(Usuario, user_id).shard == 2
+    assert [rows_on(1, model, user_id) for model in (Deck, Progresso, Revisao)] == [0, 0, 0]
+    # A marca fica na origem: um processo com o shard antigo em cache não escreve lá
+    assert rows_on(1, Biblioteca, user_id) == 1
+
+    moved = client.get("/decks/", headers=headers).json()
+    assert [d["titulo"] for d in moved] == ["Mudança"]
+    cards = client.get(f"/decks/{moved[0]['id']}", headers=headers).json()["flashcards"]
+    assert [c["pergunta"] for c in cards] == ["Mudança 0", "Mudança 1"]
+    assert client.get("/users/stats", headers=headers).json() == stats_before
+
+    changes = client.get(f"/sync?since={cursor}", headers=headers).json()
+    assert changes["full"] is True
+    assert changes["cursor"] > cursor
+    assert len(changes["flashcards"]) == 2
+
+    # O histórico e o progresso seguem os ids novos
+    review = client.post("/study/review", json={"flashcard_id": cards[0]["id"], "rating": "facil"}, headers=headers)
+    assert review.json()["repetitions"] == 2
+
+    # E de volta, passando pela marca deixada na primeira mudança
+    shards.move_user(user_id, 1, wait=0)
+    assert [d["titulo"] for d in client.get("/decks/", headers=headers).json()] == ["Mudança"]
+    assert rows_on(2, Deck, user_id) == 0
+    assert client.post("/decks/", json={"titulo": "Depois"}, headers=headers).status_code == 201
+
+
+def test_writes_during_a_move_get_503(client, three_shards):
+    from app import database
+
+    headers, user_id = register_on(client, 2)
+    deck = create_deck(client, headers, "Congelado", 1)
+    with database.shard_engines[2].begin() as conn:
+        conn.execute(update(Biblioteca).where(Biblioteca.usuario_id == user_id).values(movida_para=0))
+
+    response = client.post("/decks/", json={"titulo": "Novo"}, headers=headers)
+    assert response.status_code == 503
+    assert response.headers["retry-after"]
+    card_id = deck["flashcards"][0]["id"]
+    assert client.post("/study/review", json={"flashcard_id": card_id, "rating": "facil"}, headers=headers).status_code == 503
+    # Leituras continuam
+    assert client.get(f"/decks/{deck['id']}", headers=headers).status_code == 200
+
+    with database.shard_engines[2].begin() as conn:
+        conn.execute(update(Biblioteca).where(Biblioteca.usuario_id == user_id).values(movida_para=None))
+    assert client.post("/decks/", json={"titulo": "Novo"}, headers=headers).status_code == 201
+
+
+def test_account_without_library_row_continues_legacy_sequence(client, three_shards):
+    from app import database
+
+    headers, user_id = register_on(client, 0)
+    with database.engine.begin() as conn:
+        conn.execute(delete(Biblioteca).where(Biblioteca.usuario_id == user_id))
+        conn.execute(update(Usuario).where(Usuario.id == user_id).values(versao_biblioteca=41, sequencia_compactada=7))
+
+    assert client.get("/sync?since=10", headers=headers).json()["cursor"] == 41
+    create_deck(client, headers, "Antigo", 0)
+    assert client.get("/sync?since=41", headers=headers).json()["cursor"] == 42
+    assert rows_on(0, Biblioteca, user_id) == 1
+
+
+def test_same_deck_id_on_two_shards_gets_different_etags(client, three_shards):
+    # Cada shard numera os decks de forma independente: dois usuários podem
+    # ter decks com o mesmo id, a mesma versão e a mesma sequência
+    (first, _), (second, _) = register_on(client, 1), register_on(client, 2)
+    decks = [create_deck(client, first, "Mesmo id", 1), create_deck(client, second, "Mesmo id", 1)]
+    while decks[0]["id"] != decks[1]["id"]:
+        lower = 0 if decks[0]["id"] < decks[1]["id"] else 1
+        decks[lower] = create_deck(client, (first, second)[lower], "Mesmo id", 1)
+    deck_id = decks[0]["id"]
+
+    for url in (f"/decks/{deck_id}", f"/flashcards/deck/{deck_id}"):
+        etags = [client.get(url, headers=headers).headers["etag"] for headers in (first, second)]
+        assert etags[0] != etags[1]
+        # A ETag de um não revalida o cache do outro
+        response = client.get(url, headers={**second, "If-None-Match": etags[0]})
+        assert response.status_code == 200
+        assert response.json()
+
+
+def test_moved_deck_does_not_revalidate_etags_cached_before_the_move(client, three_shards):
+    from app import shards
+
+    # Prepara o destino para o deck receber lá o mesmo id que tem na origem
+    headers, user_id = register_on(client, 1)
+    other, _ = register_on(client, 2)
+    last_on_target = create_deck(client, other, "Destino", 0)["id"]
+    deck = create_deck(client, headers, "Mudança", 2)
+    while deck["id"] != last_on_target + 1:
+        if deck["id"] > last_on_target + 1:
+            last_on_target = create_deck(client, other, "Destino", 0)["id"]
+        else:
+            previous, deck = deck, create_deck(client, headers, "Mudança", 2)
+            assert client.delete(f"/decks/{previous['id']}", headers=headers).status_code == 204
+    urls = (f"/decks/{deck['id']}", f"/flashcards/deck/{deck['id']}")
+    cached = [client.get(url, headers=headers).headers["etag"] for url in urls]
+
+    shards.move_user(user_id, 2, wait=0)
+    assert [d["id"] for d in client.get("/decks/", headers=headers).json()] == [deck["id"]]
+
+    # Mesmo usuário, mesmo id e mesma versão do deck, mas os flashcards têm ids novos
+    for url, etag in zip(urls, cached):
+        response = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
@@ -0,0 +1,129 @@
+"""
+Estatísticas incrementais (app/stats.py): depois de qualquer sequência de
+escritas, `estatisticas_usuario` e `atividade_diaria` têm de bater com a
+recontagem completa (`stats.recount`).
+"""
+from datetime import datetime, timedelta
+
+from app import database, stats
+from app.models import AtividadeDiaria, EstatisticaUsuario
+
+
+def stored(user_id: int) -> dict:
+    with database.SessionLocal() as db:
+        row = db.get(EstatisticaUsuario, user_id)
+        values = {column: getattr(row, column) for column in (
+            "total_decks", "total_cards", "cards_studied", "correct", "needs_review", "wrong",
+            "streak_days", "last_study_day",
+        )}
+        values["activity"] = {
+            day.dia: day.reviews for day in db.query(AtividadeDiaria).filter(AtividadeDiaria.usuario_id == user_id)
+        }
+        return values
+
+
+def recounted(user_id: int) -> dict:
+    with database.SessionLocal() as db:
+        return stats.recount(db, user_id)
+
+
+def create_deck(client, headers, titulo: str, cards: int) -> dict:
+    flashcards = [{"pergunta": f"{titulo} {i}", "resposta": f"R{i}"} for i in range(cards)]
+    return client.post("/decks/", json={"titulo": titulo, "flashcards": flashcards}, headers=headers).json()
+
+
+def submit(client, headers, events):
+    batch = {"events": [
+        {"client_event_id": f"{card_id}-{answered_at.isoformat()}", "card_id": card_id,
+         "rating": rating, "answered_at": answered_at.isoformat()}
+        for card_id, rating, answered_at in events
+    ]}
+    assert client.post("/reviews/batch", json=batch, headers=headers).json()["accepted"] == len(events)
+
+
+def test_incremental_stats_match_recount(client, auth_headers):
+    user_id = client.get("/users/me", headers=auth_headers).json()["id"]
+    today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+
+    first = create_deck(client, auth_headers, "Primeiro", 4)
+    second = create_deck(client, auth_headers, "Segundo", 3)
+    empty = create_deck(client, auth_headers, "Vazio", 0)
+    single = client.post("/flashcards/", json={"deck_id": empty["id"], "pergunta": "Só", "resposta": "R"}, headers=auth_headers).json()
+    bulk = client.post("/flashcards/bulk", json={"flashcards": [
+        {"deck_id": second["id"], "pergunta": f"Lote {i}", "resposta": "R"} for i in range(3)
+    ]}, headers=auth_headers).json()["created"]
+    imported = client.post(
+        "/decks/import?titulo=Importado&format=csv", content="pergunta,resposta\nA,1\nB,2\nC,3\n".encode(),
+        headers=auth_headers
+    ).json()
+    assert imported["imported"] == 3
+
+    a, b, c, d = (card["id"] for card in first["flashcards"])
+    x, y, z = (card["id"] for card in second["flashcards"])
+    # Dias fora de ordem, vários no mesmo dia, o mesmo card revisado de novo e todas as notas
+    submit(client, auth_headers, [
+        (a, "facil", today - timedelta(days=3)),
+        (b, "errei", today - timedelta(days=2)),
+        (x, "dificil", today - timedelta(days=2, hours=1)),
+        (a, "muito-facil", today - timedelta(days=1)),
+        (y, "facil", today - timedelta(days=6)),
+        (bulk[0]["id"], "errei", today - timedelta(days=1)),
+    ])
+    for card_id, rating in ((c, "facil"), (single["id"], "dificil"), (z, "errei")):
+        client.post("/study/review", json={"flashcard_id": card_id, "rating": rating}, headers=auth_headers)
+
+    # Remoções de cards revisados e não revisados, um a um e em lote
+    client.delete(f"/flashcards/{a}", headers=auth_headers)
+    client.delete(f"/flashcards/{d}", headers=auth_headers)
+    client.delete(f"/flashcards?ids={x},{bulk[1]['id']}", headers=auth_headers)
+    client.delete(f"/decks/{empty['id']}", headers=auth_headers)
+    client.post("/decks/bulk-delete", json={"ids": [imported["deck"]["id"]]}, headers=auth_headers)
+    create_deck(client, auth_headers, "Depois", 2)
+
+    assert stored(user_id) == recounted(user_id)
+
+    stats_out = client.get("/users/stats", headers=auth_headers).json()
+    expected = recounted(user_id)
+    assert (stats_out["total_decks"], stats_out["total_cards"], stats_out["total_cards_studied"]) == (
+        expected["total_decks"], expected["total_cards"], expected["cards_studied"]
+    )
+    assert stats_out["streak_days"] == 4
+
+
+def test_rebuild_fixes_drift(client, auth_headers):
+    user_id = client.get("/users/me", headers=auth_headers).json()["id"]
+    deck = create_deck(client, auth_headers, "Deriva", 2)
+    client.post("/study/review", json={"flashcard_id": deck["flashcards"][0]["id"], "rating": "facil"}, headers=auth_headers)
+
+    with database.SessionLocal() as db:
+        db.get(EstatisticaUsuario, user_id).total_cards = 99
+        db.query(AtividadeDiaria).filter(AtividadeDiaria.usuario_id == user_id).delete()
+        db.commit()
+    assert stored(user_id) != recounted(user_id)
+
+    with database.SessionLocal() as db:
+        assert stats.rebuild(db, user_id) is True
+        db.commit()
+        assert stats.rebuild(db, user_id) is False
+    assert stored(user_id) == recounted(user_id)
+
+
+def test_first_review_without_stats_row_is_counted_once(client, auth_headers):
+    # Conta anterior à tabela de estatísticas: sem linha e sem atividade
+    user_id = client.get("/users/me", headers=auth_headers).json()["id"]
+    deck = create_deck(client, auth_headers, "Legado", 2)
+    yesterday = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    submit(client, auth_headers, [(deck["flashcards"][1]["id"], "facil", yesterday)])
+    with database.SessionLocal() as db:
+        db.query(EstatisticaUsuario).filter(EstatisticaUsuario.usuario_id == user_id).delete()
+        # Atividade desatualizada de ontem: a recontagem também a corrige
+        db.query(AtividadeDiaria).filter(AtividadeDiaria.usuario_id == user_id).update({"reviews": 7})
+        db.commit()
+
+    client.post("/study/review", json={"flashcard_id": deck["flashcards"][0]["id"], "rating": "facil"}, headers=auth_headers)
+
+    assert stored(user_id) == recounted(user_id)
+    assert sorted(stored(user_id)["activity"].values()) == [1, 1]
+    stats_out = client.get("/users/stats", headers=auth_headers).json()
+    assert stats_out["streak_days"] == 2
+    assert stats_out["total_cards_studied"] == 2
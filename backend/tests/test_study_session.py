@@ -0,0 +1,72 @@
+"""GET /study/session/{deck_id}: deck, cards e token numa única requisição."""
+import gzip
+
+
+def create_deck(client, headers, cards: int) -> dict:
+    flashcards = [{"pergunta": f"Pergunta {i}", "resposta": f"Resposta {i}"} for i in range(cards)]
+    return client.post("/decks/", json={"titulo": "Deck", "flashcards": flashcards}, headers=headers).json()
+
+
+def test_session_returns_deck_cards_and_token(client, auth_headers):
+    deck = create_deck(client, auth_headers, 30)
+
+    response = client.get(f"/study/session/{deck['id']}?limit=10", headers=auth_headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["deck"]["id"] == deck["id"]
+    assert (body["deck"]["card_count"], body["deck"]["due_count"]) == (30, 30)
+    assert [card["id"] for card in body["cards"]] == [card["id"] for card in deck["flashcards"][:10]]
+    assert body["session"]
+
+
+def test_session_is_gzipped_above_threshold(client, auth_headers):
+    deck = create_deck(client, auth_headers, 100)
+    url = f"/study/session/{deck['id']}"
+
+    # stream=True não descomprime: confere o corpo como enviado
+    with client.stream("GET", url, headers={**auth_headers, "Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(gzip.decompress(raw)) > len(raw)
+
+    small = client.get(f"{url}?limit=1", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_session_uses_two_queries_whatever_the_deck_size(client, auth_headers, count_queries):
+    small = create_deck(client, auth_headers, 1)
+    large = create_deck(client, auth_headers, 300)
+    client.get("/decks/", headers=auth_headers)  # aquece o cache de autenticação
+
+    counts = []
+    for deck in (small, large):
+        with count_queries() as statements:
+            client.get(f"/study/session/{deck['id']}?limit=500", headers=auth_headers)
+        counts.append(len(statements))
+
+    assert counts == [2, 2]
+
+
+def test_session_token_scopes_reviews_and_is_not_an_access_token(client, auth_headers):
+    deck = create_deck(client, auth_headers, 2)
+    session = client.get(f"/study/session/{deck['id']}", headers=auth_headers).json()["session"]
+
+    assert client.get("/decks/", headers={"Authorization": f"Bearer {session}"}).status_code == 401
+
+    events = [{
+        "card_id": deck["flashcards"][0]["id"],
+        "rating": "facil",
+        "answered_at": "2026-01-01T10:00:00Z",
+        "client_event_id": "sessao-1",
+    }]
+    response = client.post("/reviews/batch", json={"events": events, "session": session}, headers=auth_headers)
+    assert response.json()["accepted"] == 1
+
+
+def test_session_of_other_user_deck_is_404(client, auth_headers):
+    client.post("/auth/register", json={"nome": "Outro", "email": "outro-sessao@teste.com", "senha": "senha123"})
+    token = client.post("/auth/login", json={"email": "outro-sessao@teste.com", "senha": "senha123"}).json()["access_token"]
+    deck = create_deck(client, {"Authorization": f"Bearer {token}"}, 1)
+
+    assert client.get(f"/study/session/{deck['id']}", headers=auth_headers).status_code == 404
@@ -0,0 +1,97 @@
+"""
+GET /sync?since=: alterações e tombstones desde o cursor, e a biblioteca
+completa quando o cursor é anterior à compactação dos tombstones.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app import database, manage
+from app.models import Remocao
+
+
+def sync(client, headers, since=None) -> dict:
+    response = client.get("/sync" + (f"?since={since}" if since is not None else ""), headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def create_deck(client, headers, titulo: str, cards: int) -> dict:
+    flashcards = [{"pergunta": f"{titulo} {i}", "resposta": f"R{i}"} for i in range(cards)]
+    return client.post("/decks/", json={"titulo": titulo, "flashcards": flashcards}, headers=headers).json()
+
+
+def test_first_sync_is_full(client, auth_headers):
+    deck = create_deck(client, auth_headers, "Inteiro", 2)
+
+    changes = sync(client, auth_headers)
+    assert changes["full"] is True
+    assert [d["id"] for d in changes["decks"]] == [deck["id"]]
+    assert [c["id"] for c in changes["flashcards"]] == [c["id"] for c in deck["flashcards"]]
+    assert changes["deleted"] == {"decks": [], "flashcards": []}
+
+
+def test_incremental_sync_returns_only_changes_and_tombstones(client, auth_headers):
+    kept = create_deck(client, auth_headers, "Fica", 3)
+    doomed = create_deck(client, auth_headers, "Sai", 2)
+    untouched = create_deck(client, auth_headers, "Parado", 2)
+    cursor = sync(client, auth_headers)["cursor"]
+
+    edited, removed = kept["flashcards"][0]["id"], kept["flashcards"][1]["id"]
+    client.put(f"/flashcards/{edited}", json={"pergunta": "Editada"}, headers=auth_headers)
+    client.delete(f"/flashcards/{removed}", headers=auth_headers)
+    added = client.post("/flashcards/", json={"deck_id": kept["id"], "pergunta": "Nova", "resposta": "R"}, headers=auth_headers).json()
+    client.delete(f"/decks/{doomed['id']}", headers=auth_headers)
+
+    changes = sync(client, auth_headers, cursor)
+    assert changes["full"] is False
+    assert changes["cursor"] > cursor
+    assert [d["id"] for d in changes["decks"]] == [kept["id"]]
+    assert sorted(c["id"] for c in changes["flashcards"]) == sorted([edited, added["id"]])
+    assert [c["pergunta"] for c in changes["flashcards"] if c["id"] == edited] == ["Editada"]
+    # Cards do deck apagado saem junto com o deck, sem tombstone próprio
+    assert changes["deleted"] == {"decks": [doomed["id"]], "flashcards": [removed]}
+    assert untouched["id"] not in [d["id"] for d in changes["decks"]]
+
+    # Nada mudou: resposta vazia com o mesmo cursor
+    again = sync(client, auth_headers, changes["cursor"])
+    assert (again["cursor"], again["decks"], again["flashcards"]) == (changes["cursor"], [], [])
+    assert again["deleted"] == {"decks": [], "flashcards": []}
+
+
+def test_sync_cost_does_not_depend_on_library_size(client, auth_headers, count_queries):
+    create_deck(client, auth_headers, "Grande", 300)
+    deck = create_deck(client, auth_headers, "Pequeno", 1)
+    cursor = sync(client, auth_headers)["cursor"]
+    client.put(f"/flashcards/{deck['flashcards'][0]['id']}", json={"pergunta": "Mudou"}, headers=auth_headers)
+
+    with count_queries() as statements:
+        changes = sync(client, auth_headers, cursor)
+    assert len(changes["flashcards"]) == 1
+    assert len(statements) <= 4
+
+
+def test_sync_only_sees_own_library(client, auth_headers, new_user):
+    create_deck(client, auth_headers, "Meu", 1)
+    other = new_user()
+    assert sync(client, other)["decks"] == []
+
+
+def test_cursor_before_compaction_gets_full_library(client, auth_headers):
+    deck = create_deck(client, auth_headers, "Compactar", 2)
+    cursor = sync(client, auth_headers)["cursor"]
+    client.delete(f"/flashcards/{deck['flashcards'][0]['id']}", headers=auth_headers)
+    user_id = client.get("/users/me", headers=auth_headers).json()["id"]
+
+    with database.engine.begin() as conn:
+        conn.execute(
+            update(Remocao).where(Remocao.usuario_id == user_id)
+            .values(removido_em=datetime.utcnow() - timedelta(days=3650))
+        )
+    manage.compact_tombstones()
+
+    changes = sync(client, auth_headers, cursor)
+    assert changes["full"] is True
+    assert [c["id"] for c in changes["flashcards"]] == [deck["flashcards"][1]["id"]]
+    # Cursores depois da compactação continuam incrementais
+    assert sync(client, auth_headers, changes["cursor"])["full"] is False
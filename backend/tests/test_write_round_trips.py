@@ -0,0 +1,118 @@
+"""
+Quantidade de comandos SQL de cada escrita (SQLite, com RETURNING).
+
+As escritas devolvem as linhas gravadas sem `db.refresh()`: nenhuma
+resposta relê do banco o que acabou de ser gravado. Os números abaixo são
+o mínimo atual de cada rota; se um deles subir, algo voltou a reler dados.
+"""
+import pytest
+
+# Aumento da sequência da biblioteca (UPDATE ... RETURNING) + as escritas da rota
+WRITES = {
+    # email já existe? + INSERT usuário + INSERT biblioteca + INSERT estatísticas
+    "register": 4,
+    # sequência + INSERT deck + estatísticas
+    "create_deck": 3,
+    # ... + INSERT flashcards + INSERT progresso
+    "create_deck_with_cards": 5,
+    # sequência + UPDATE deck ... WHERE id e dono RETURNING
+    "update_deck": 2,
+    # sequência + UPDATE deck (propriedade) + INSERT flashcard + INSERT progresso + estatísticas
+    "create_flashcard": 5,
+    # decks do usuário + sequência + INSERT flashcards + INSERT progresso + UPDATE decks + estatísticas
+    "create_flashcards_bulk": 6,
+    # sequência + UPDATE flashcard ... WHERE deck do dono RETURNING + UPDATE deck
+    "update_flashcard": 3,
+}
+
+
+@pytest.fixture
+def deck(client, auth_headers):
+    response = client.post("/decks/", json={
+        "titulo": "Deck",
+        "flashcards": [{"pergunta": "Pergunta", "resposta": "Resposta"}],
+    }, headers=auth_headers)
+    # Também aquece o cache de autenticação: as contagens não incluem o usuário
+    return response.json()
+
+
+def test_register(client, count_queries):
+    with count_queries() as statements:
+        response = client.post("/auth/register", json={"nome": "N", "email": "rt@teste.com", "senha": "senha123"})
+    assert response.status_code == 200
+    assert response.json()["criado_em"]
+    assert len(statements) == WRITES["register"]
+
+
+def test_register_duplicate_email_race(client):
+    from app import crud, database
+
+    client.post("/auth/register", json={"nome": "N", "email": "dup@teste.com", "senha": "senha123"})
+    # Simula outro cadastro com o mesmo email que passou pela verificação da rota
+    with database.SessionLocal() as db:
+        assert crud.create_user(db, "N", "dup@teste.com", "hash") is None
+
+
+def test_create_deck(client, auth_headers, deck, count_queries):
+    with count_queries() as statements:
+        response = client.post("/decks/", json={"titulo": "Novo"}, headers=auth_headers)
+    assert response.status_code == 201
+    assert response.json()["titulo"] == "Novo"
+    assert len(statements) == WRITES["create_deck"]
+
+    cards = [{"pergunta": f"P{i}", "resposta": f"R{i}"} for i in range(20)]
+    with count_queries() as statements:
+        response = client.post("/decks/", json={"titulo": "Novo", "flashcards": cards}, headers=auth_headers)
+    assert len(response.json()["flashcards"]) == 20
+    assert len(statements) == WRITES["create_deck_with_cards"]
+
+
+def test_update_deck(client, auth_headers, deck, count_queries):
+    with count_queries() as statements:
+        response = client.put(f"/decks/{deck['id']}", json={"titulo": "Editado"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["titulo"] == "Editado"
+    assert response.json()["criado_em"] == deck["criado_em"]
+    assert len(statements) == WRITES["update_deck"]
+
+
+def test_create_flashcard(client, auth_headers, deck, count_queries):
+    with count_queries() as statements:
+        response = client.post("/flashcards/", json={
+            "deck_id": deck["id"], "pergunta": "P", "resposta": "R",
+        }, headers=auth_headers)
+    assert response.status_code == 201
+    assert response.json()["deck_id"] == deck["id"]
+    assert len(statements) == WRITES["create_flashcard"]
+
+
+def test_create_flashcards_bulk(client, auth_headers, deck, count_queries):
+    cards = [{"deck_id": deck["id"], "pergunta": f"P{i}", "resposta": f"R{i}"} for i in range(10)]
+    with count_queries() as statements:
+        response = client.post("/flashcards/bulk", json={"flashcards": cards}, headers=auth_headers)
+    assert len(response.json()["created"]) == 10
+    assert len(statements) == WRITES["create_flashcards_bulk"]
+
+
+def test_update_flashcard(client, auth_headers, deck, count_queries):
+    card = deck["flashcards"][0]
+    with count_queries() as statements:
+        response = client.put(f"/flashcards/{card['id']}", json={"resposta": "Nova"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert (response.json()["pergunta"], response.json()["resposta"]) == (card["pergunta"], "Nova")
+    assert len(statements) == WRITES["update_flashcard"]
+
+
+def test_writes_to_other_users_records_are_404(client, auth_headers, deck):
+    client.post("/auth/register", json={"nome": "O", "email": "rt-outro@teste.com", "senha": "senha123"})
+    token = client.post("/auth/login", json={"email": "rt-outro@teste.com", "senha": "senha123"}).json()["access_token"]
+    other = {"Authorization": f"Bearer {token}"}
+
+    assert client.put(f"/decks/{deck['id']}", json={"titulo": "X"}, headers=other).status_code == 404
+    assert client.put(f"/flashcards/{deck['flashcards'][0]['id']}", json={"pergunta": "X"}, headers=other).status_code == 404
+    response = client.post("/flashcards/", json={"deck_id": deck["id"], "pergunta": "P", "resposta": "R"}, headers=other)
+    assert response.status_code == 404
+
+    # Nada mudou para o dono, nem a versão da biblioteca do outro usuário
+    assert client.get(f"/decks/{deck['id']}", headers=auth_headers).json()["titulo"] == "Deck"
+    assert client.get("/sync", headers=other).json()["cursor"] == 1
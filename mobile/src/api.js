@@ -14,6 +14,13 @@ export const api = axios.create({
   },
 });
 
+// Última resposta de cada GET com ETag; o backend responde 304 quando nada mudou
+const etagCache = new Map();
+
+function cacheKey(config) {
+  return api.getUri(config);
+}
+
 // Interceptor para adicionar o token a cada requisição
 api.interceptors.request.use(
   async (config) => {
@@ -23,6 +30,12 @@ api.interceptors.request.use(
     } else {
       delete config.headers.Authorization;
     }
+    if ((config.method || 'get').toLowerCase() === 'get') {
+      const cached = etagCache.get(cacheKey(config));
+      if (cached) {
+        config.headers['If-None-Match'] = cached.etag;
+      }
+    }
     return config;
   },
   (error) => Promise.reject(error)
@@ -30,14 +43,29 @@ api.interceptors.request.use(
 
 // Interceptor para tratar erros (ex: token expirado)
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const etag = response.headers?.etag;
+    if (etag && (response.config.method || 'get').toLowerCase() === 'get') {
+      etagCache.set(cacheKey(response.config), { etag, data: response.data });
+    }
+    return response;
+  },
 
   async (error) => {
+    // 304: reaproveita os dados da última resposta para a mesma URL
+    if (error.response && error.response.status === 304) {
+      const cached = etagCache.get(cacheKey(error.config));
+      if (cached) {
+        return { ...error.response, status: 200, data: cached.data };
+      }
+    }
+
     if (error.response && error.response.status === 401) {
       console.error("Token inválido ou expirado (401 Unauthorized). Forçando logout...");
 
       // Remove token automaticamente
       await removeToken();
+      etagCache.clear();
 
       // Emite evento de logout para o AuthProvider
       authEmitter.emit("logout");
@@ -50,6 +50,22 @@ export default function CreateManualFlashCards({ route }) {
         }
     };
 
+    // Resultado parcial do lote: informa quantos foram salvos, lista os
+    // recusados (pelo número do card na tela) e deixa só eles no formulário
+    const showRejected = (sentCards, savedCount, errors) => {
+        const rejectedCards = errors.map((error) => sentCards[error.index]);
+        const lines = errors.map((error, i) => {
+            const position = flashcards.findIndex((card) => card.id === rejectedCards[i].id) + 1;
+            return `• Flashcard ${position}: ${error.detail}`;
+        });
+
+        Alert.alert(
+            savedCount ? 'Salvo parcialmente' : 'Nenhum flashcard salvo',
+            `${savedCount} de ${sentCards.length} flashcard(s) salvo(s). Recusados:\n${lines.join('\n')}`
+        );
+        setFlashcards(rejectedCards);
+    };
+
     // 2. Lógica de Salvar com API
     const handleSave = async () => {
         const filledCards = flashcards.filter(
@@ -65,21 +81,25 @@ export default function CreateManualFlashCards({ route }) {
         console.log(`Tentando salvar ${filledCards.length} flashcard(s) no Deck ID: ${deck_id}`);
 
         try {
-            // Criar um array de promessas para salvar todos os flashcards
-            const savePromises = filledCards.map(card => 
-                api.post('/flashcards/', {
+            // Salva todos os flashcards numa única requisição (uma transação no backend).
+            // 201: todos salvos; 207: só parte; 422 (cai no catch): nenhum.
+            const response = await api.post('/flashcards/bulk', {
+                flashcards: filledCards.map(card => ({
                     deck_id: deck_id, // MANDATÓRIO: Chave estrangeira para o deck
                     pergunta: card.front.trim(),
                     resposta: card.back.trim(),
-                })
-            );
+                })),
+            });
 
-            // Executar todas as promessas em paralelo
-            await Promise.all(savePromises);
+            const { created = [], errors = [] } = response.data;
+            if (errors.length) {
+                showRejected(filledCards, created.length, errors);
+                return;
+            }
 
             Alert.alert(
                 'Sucesso', 
-                `${filledCards.length} flashcard(s) salvo(s) com sucesso no deck '${deckName}'.`
+                `${created.length} flashcard(s) salvo(s) com sucesso no deck '${deckName}'.`
             );
             
             // Navegar para a tela principal (ou lista de decks) após salvar
@@ -87,6 +107,11 @@ export default function CreateManualFlashCards({ route }) {
             
         } catch (error) {
             console.error("Erro ao salvar flashcards:", error);
+            const rejected = error.response?.data?.errors;
+            if (rejected?.length) {
+                showRejected(filledCards, 0, rejected);
+                return;
+            }
             // Tratamento de erro aprimorado
             const errorMessage = error.response?.data?.detail || error.message || 'Erro desconhecido ao salvar os cards. Verifique a conexão com o backend.';
             Alert.alert('Erro ao Salvar', `Não foi possível salvar os flashcards: ${errorMessage}`);
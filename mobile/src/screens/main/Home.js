@@ -37,7 +37,8 @@ export default function Home() {
             
             // --- 1. Busca os Decks do Usuário ---
             // Usamos a URL relativa, o 'api' cuidará do prefixo base e do token
-            const decksResponse = await api.get('/decks/'); 
+            // O resumo já traz card_count/due_count de cada deck numa única consulta
+            const decksResponse = await api.get('/decks/summary'); 
 
             const decksData = decksResponse.data;
             setUserDecks(decksData);
@@ -93,8 +94,7 @@ export default function Home() {
 
     // Dados derivados:
     const totalDecks = userDecks.length;
-    // Garante que 'flashcards' é um array antes de calcular o length
-    const totalCards = userDecks.reduce((sum, deck) => sum + (Array.isArray(deck.flashcards) ? deck.flashcards.length : 0), 0);
+    const totalCards = userDecks.reduce((sum, deck) => sum + (deck.card_count || 0), 0);
     
     const displayUserName = userName || '...';
 
@@ -183,8 +183,7 @@ export default function Home() {
                                         <Text style={styles.deckTitle}>{deck.titulo}</Text>
                                         <View style={styles.deckMetaContainer}>
                                             <View style={styles.cardCount}>
-                                                {/* Adicionando verificação de array antes de usar .length */}
-                                                <Text style={styles.cardCountText}>{Array.isArray(deck.flashcards) ? deck.flashcards.length : 0} cards</Text>
+                                                <Text style={styles.cardCountText}>{deck.card_count || 0} cards</Text>
                                             </View>
                                             {/* Data de criação real do banco de dados */}
                                             <Text style={styles.deckDate}> • {formatDate(deck.criado_em)}</Text>
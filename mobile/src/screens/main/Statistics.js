@@ -86,7 +86,7 @@ export default function Statistics() {
                 { number: String(data.total_cards_studied || 0), label: 'Cards Estudados', color: '#48bb78', icon: 'checkbox-outline' },
                 { number: `${(data.accuracy_rate * 100).toFixed(0) || 0}%`, label: 'Taxa de Acerto', color: '#4299e1', icon: 'stats-chart-outline' },
                 { number: String(data.streak_days || 0), label: 'Dias Seguidos', color: '#ed64a6', icon: 'flame-outline' },
-                { number: String(data.total_decks_created || 0), label: 'Decks Criados', color: '#9f7aea', icon: 'library-outline' }
+                { number: String(data.total_decks || 0), label: 'Decks Criados', color: '#9f7aea', icon: 'library-outline' }
             ];
             setStatsData(mappedStats);
 
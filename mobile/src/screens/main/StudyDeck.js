@@ -13,12 +13,14 @@ import {
 import { Ionicons } from '@expo/vector-icons';
 import * as Progress from 'react-native-progress';
 import api from '../../api'; // Cliente API configurado
+import { enqueueReview, flushReviews } from '../../services/reviewQueue';
 
 export default function StudyDeck({ route }) {
     const navigation = useNavigation();
     const { deckId, deckTitle } = route.params || {};
 
     const [flashcards, setFlashcards] = useState([]);
+    const [session, setSession] = useState(null);
     const [currentIndex, setCurrentIndex] = useState(0);
     const [showAnswer, setShowAnswer] = useState(false);
     const [loading, setLoading] = useState(true);
@@ -39,12 +41,14 @@ export default function StudyDeck({ route }) {
         setLoading(true);
         setError(null);
         try {
-            const response = await api.get(`/flashcards/deck/${deckId}`);
-            const fetchedCards = response.data;
+            // Deck, cards (vencidos primeiro) e token da sessão numa única requisição
+            const response = await api.get(`/study/session/${deckId}`);
+            const fetchedCards = response.data?.cards;
             if (!Array.isArray(fetchedCards) || fetchedCards.length === 0) {
                 setError("Este deck não possui flashcards para estudo.");
             } else {
                 setFlashcards(fetchedCards);
+                setSession(response.data.session);
                 setCurrentIndex(0);
                 setShowAnswer(false);
             }
@@ -62,9 +66,11 @@ export default function StudyDeck({ route }) {
     }, [loadFlashcards]);
 
     const handleAnswer = async (difficulty) => {
-        console.log(`Card ${currentCard.id} avaliado como: ${difficulty}`);
+        await enqueueReview(currentCard.id, difficulty);
 
         if (isLastCard) {
+            // Envia todas as respostas da sessão de uma vez (não bloqueia a tela)
+            flushReviews(session);
             Alert.alert(
                 '🎉 Parabéns!', 
                 `Você completou o estudo de ${totalCards} flashcards no deck ${deckTitle}.`,
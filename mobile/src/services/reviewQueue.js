@@ -0,0 +1,75 @@
+import AsyncStorage from '@react-native-async-storage/async-storage';
+import api from '../api';
+
+const QUEUE_KEY = '@MyApp:pendingReviews';
+const BATCH_SIZE = 1000; // mesmo limite de POST /reviews/batch (MAX_REVISOES_POR_LOTE no backend)
+
+// Cada leitura-alteração-escrita da fila roda depois da anterior: uma
+// resposta guardada enquanto um lote está sendo enviado não é sobrescrita
+let queueLock = Promise.resolve();
+
+// Envios um de cada vez (StudyDeck não espera o flushReviews terminar)
+let flushLock = Promise.resolve();
+
+function newEventId() {
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`;
+}
+
+async function readQueue() {
+    try {
+        const raw = await AsyncStorage.getItem(QUEUE_KEY);
+        return raw ? JSON.parse(raw) : [];
+    } catch (error) {
+        console.error('Erro ao ler respostas pendentes:', error);
+        return [];
+    }
+}
+
+function updateQueue(change) {
+    const run = queueLock.then(async () => {
+        const queue = await readQueue();
+        await AsyncStorage.setItem(QUEUE_KEY, JSON.stringify(change(queue)));
+    });
+    queueLock = run.catch(() => {});
+    return run;
+}
+
+// Guarda a resposta localmente; o envio acontece em lote com flushReviews()
+export function enqueueReview(cardId, rating) {
+    return updateQueue((queue) => [
+        ...queue,
+        {
+            card_id: cardId,
+            rating,
+            answered_at: new Date().toISOString(),
+            client_event_id: newEventId(),
+        },
+    ]);
+}
+
+async function sendPending(session) {
+    while (true) {
+        const batch = (await readQueue()).slice(0, BATCH_SIZE);
+        if (batch.length === 0) {
+            return true;
+        }
+        try {
+            await api.post('/reviews/batch', session ? { events: batch, session } : { events: batch });
+            // Relê a fila: remove só o que foi enviado e mantém o que chegou durante o envio
+            const sent = new Set(batch.map((event) => event.client_event_id));
+            await updateQueue((queue) => queue.filter((event) => !sent.has(event.client_event_id)));
+        } catch (error) {
+            console.error('Falha ao enviar respostas (serão reenviadas depois):', error);
+            return false;
+        }
+    }
+}
+
+// Envia as respostas pendentes. Reenviar é seguro: o backend ignora
+// client_event_id repetidos, então só limpamos a fila após o sucesso.
+// `session` é o token de GET /study/session (opcional).
+export function flushReviews(session = null) {
+    const run = flushLock.then(() => sendPending(session));
+    flushLock = run.catch(() => false);
+    return run;
+}